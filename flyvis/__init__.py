@@ -67,10 +67,109 @@ import datamate
 datamate.set_root_dir(root_dir)
 del datamate
 
-from .utils import *
-from .connectome import *
-from .datasets import *
-from .network import *
-from .task import *
-from .analysis import *
-from .solver import *
+from importlib import import_module
+
+# Public names by subpackage. They are imported on first access so that, e.g.,
+# `from flyvis import Network` only imports the network and connectome stack.
+_subpackage_attrs = {
+    "connectome": (
+        "ConnectomeFromAvgFilters",
+        "ConnectomeView",
+        "ReceptiveFields",
+        "ProjectiveFields",
+        "init_connectome",
+        "get_avgfilt_connectome",
+    ),
+    "datasets": (
+        "SequenceDataset",
+        "StimulusDataset",
+        "MultiTaskDataset",
+        "RenderedFlashes",
+        "Flashes",
+        "render_flash",
+        "RenderedOffsets",
+        "MovingBar",
+        "MovingEdge",
+        "Dots",
+        "CentralImpulses",
+        "SpatialImpulses",
+        "RenderedSintel",
+        "MultiTaskSintel",
+        "AugmentedSintel",
+    ),
+    "network": (
+        "NetworkDir",
+        "EnsembleDir",
+        "Network",
+        "NetworkView",
+        "CheckpointedNetwork",
+        "NetworkDynamics",
+        "PPNeuronIGRSynapses",
+        "Parameter",
+        "RestingPotential",
+        "TimeConstant",
+        "SynapseSign",
+        "SynapseCount",
+        "SynapseCountScaling",
+        "InitialDistribution",
+        "Value",
+        "Normal",
+        "Lognormal",
+        "EnsembleView",
+        "Ensemble",
+        "Stimulus",
+        "CompactStimulus",
+        "SynapticMatrix",
+        "FixedPointResult",
+        "anderson",
+        "ButcherTableau",
+        "integrators",
+        "register_integrator",
+        "rk_step",
+        "adaptive_rk_step",
+        "compare_integrators",
+    ),
+    "task": (
+        "ActivityDecoder",
+        "DecoderGAVP",
+        "init_decoder",
+        "Task",
+        "l2norm",
+        "epe",
+    ),
+    "solver": ("MultiTaskSolver", "Penalty", "HyperParamScheduler"),
+}
+_subpackages = ("utils", "analysis", *_subpackage_attrs)
+
+__all__ = [
+    "device",
+    "package_dir",
+    "repo_dir",
+    "resolve_root_dir",
+    "root_dir",
+    "results_dir",
+    "renderings_dir",
+    "sintel_dir",
+    "connectome_file",
+    "source_dir",
+    "config_dir",
+    "script_dir",
+    "examples_dir",
+    *_subpackages,
+    *(name for names in _subpackage_attrs.values() for name in names),
+]
+
+
+def __getattr__(name):
+    for subpackage, names in _subpackage_attrs.items():
+        if name in names:
+            value = getattr(import_module(f"flyvis.{subpackage}"), name)
+            globals()[name] = value
+            return value
+    if name in _subpackages:
+        return import_module(f"flyvis.{name}")
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
@@ -285,6 +285,196 @@ class GenerateOptimalStimuli:
         art_opt_stim = art_opt_stim.cpu().numpy()
         return GeneratedOptimalStimulus(art_opt_stim, responses, losses)
 
+    def batched_artificial_optimal_stimuli(
+        self,
+        cell_types: list[str],
+        n_restarts: int = 1,
+        t_stim: float = 49 / 200,
+        dt: float = 1 / 100,
+        lr: float = 1e-2,
+        weight_central: float = 1.0,
+        weight_mei: float = 600 * 5,
+        n_iters: int = 200,
+        random_seed: int = 0,
+        last_only: bool = True,
+        batch_size: int | None = None,
+        tol: float | None = None,
+        patience: int = 10,
+    ) -> dict[str, GeneratedOptimalStimulus]:
+        """Generate artificial optimal stimuli for several cell types in batches.
+
+        Optimizes one stimulus per cell type and restart along the batch dimension
+        of the network. The samples have separate losses and the shared steady
+        state of the network. Restart `r` starts from the same noise as
+        `artificial_optimal_stimuli` with `random_seed + r`.
+
+        Args:
+            cell_types: Node types.
+            n_restarts: Number of random initializations per cell type.
+            t_stim: Stimulus duration.
+            dt: Time step.
+            lr: Learning rate.
+            weight_central: Weight for central node optimization.
+            weight_mei: Weight for MEI optimization.
+            n_iters: Maximum number of iterations.
+            random_seed: Random seed for initialization.
+            last_only: If True, optimize only the last frame.
+            batch_size: Number of stimuli optimized jointly. Defaults to all
+                stimuli. Smaller batches need less memory for the gradients.
+            tol: If given, a stimulus stops changing once its loss decreased by
+                less than `tol` over the last `patience` iterations.
+            patience: Number of iterations for the early stopping criterion.
+
+        Returns:
+            GeneratedOptimalStimulus per cell type, with stimuli and responses of
+            all restarts along the first dimension and losses of shape
+            (#iterations, #restarts, 3). Losses after early stopping are NaN.
+        """
+        n_frames = int(t_stim / dt)
+        n_hexals = hex_utils.get_num_hexals(self.network.config.connectome.extent)
+        samples = [
+            (cell_type, restart)
+            for cell_type in cell_types
+            for restart in range(n_restarts)
+        ]
+        batch_size = batch_size or len(samples)
+
+        # Initialize as in artificial_optimal_stimuli, per restart.
+        initial_stims = []
+        for restart in range(n_restarts):
+            torch.manual_seed(random_seed + restart)
+            initial_stims.append(
+                torch.rand(1, n_frames, 1, n_hexals, device=flyvis.device)
+            )
+
+        stimulus = Stimulus(self.network.connectome, batch_size, n_frames)
+        optimize_frames = [range(n_frames)[-1]] if last_only else list(range(n_frames))
+
+        art_opt_stims, losses = [], []
+        for start in range(0, len(samples), batch_size):
+            batch = samples[start : start + batch_size]
+            art_opt_stim, batch_losses = self._optimize_batch(
+                stimulus,
+                torch.cat([initial_stims[restart] for _, restart in batch]),
+                [stimulus.central_cells_index[cell_type] for cell_type, _ in batch],
+                optimize_frames,
+                dt,
+                lr,
+                weight_central,
+                weight_mei,
+                n_iters,
+                tol,
+                patience,
+            )
+            art_opt_stims.append(art_opt_stim)
+            losses.append(batch_losses)
+
+        # Stimulate network with whole sequences.
+        art_opt_stims = torch.cat(art_opt_stims)
+        responses = []
+        with torch.no_grad():
+            for start in range(0, len(samples), batch_size):
+                art_opt_stim = art_opt_stims[start : start + batch_size]
+                stimulus.zero(len(art_opt_stim), n_frames)
+                stimulus.add_input(art_opt_stim)
+                initial_state = self.network.steady_state(1.0, dt, len(art_opt_stim))
+                activity = self.network(stimulus(), dt, state=initial_state)
+                responses.append(activity.cpu().numpy())
+        responses = np.concatenate(responses)
+        art_opt_stims = art_opt_stims.cpu().numpy()
+        n_iters_run = max(len(batch_losses) for batch_losses in losses)
+        losses = np.concatenate(
+            [
+                np.pad(
+                    batch_losses,
+                    ((0, n_iters_run - len(batch_losses)), (0, 0), (0, 0)),
+                    constant_values=np.nan,
+                )
+                for batch_losses in losses
+            ],
+            axis=1,
+        )
+
+        results = {}
+        for i, cell_type in enumerate(cell_types):
+            index = slice(i * n_restarts, (i + 1) * n_restarts)
+            results[cell_type] = GeneratedOptimalStimulus(
+                art_opt_stims[index],
+                responses[index][:, :, stimulus.layer_index[cell_type]],
+                losses[:, index],
+            )
+        return results
+
+    def _optimize_batch(
+        self,
+        stimulus: Stimulus,
+        art_opt_stim: torch.Tensor,
+        central_index: list[int],
+        optimize_frames: list[int],
+        dt: float,
+        lr: float,
+        weight_central: float,
+        weight_mei: float,
+        n_iters: int,
+        tol: float | None,
+        patience: int,
+    ) -> tuple[torch.Tensor, np.ndarray]:
+        """Optimize a batch of stimuli with a loss per sample.
+
+        Each sample contributes its own loss to the summed loss, so its gradient
+        and Adam update are the same as if it was optimized alone. Stopped samples
+        are left out of the forward pass and keep their stimulus.
+
+        Returns:
+            Optimized stimuli and losses of shape (#iterations, #samples, 3).
+        """
+        n_samples, n_frames = art_opt_stim.shape[:2]
+        art_opt_stim = art_opt_stim.clone().clamp_(0, 1)
+        art_opt_stim.requires_grad = True
+        optim = torch.optim.Adam([art_opt_stim], lr=lr)
+        central_index = torch.tensor(central_index, device=art_opt_stim.device)
+
+        active = np.ones(n_samples, dtype=bool)
+        losses = np.full((n_iters, n_samples, 3), np.nan)
+        n_iters_run = 0
+        for i in range(n_iters):
+            index = np.flatnonzero(active)
+            if not len(index):
+                break
+            mei = art_opt_stim[index]
+            stimulus.zero(len(index), n_frames)
+            stimulus.add_input(mei)
+            optim.zero_grad()
+
+            # Stimulate network, from the steady state shared across samples.
+            initial_state = self.network.steady_state(1.0, dt, len(index))
+            activity = self.network(stimulus(), dt, state=initial_state)
+            # (#active samples, #frames)
+            central_activity = activity[torch.arange(len(index)), :, central_index[index]]
+
+            central_loss = -weight_central * torch.exp(
+                central_activity[:, optimize_frames]
+            ).mean(dim=1)
+            mei_loss = weight_mei * ((mei - 0.5) ** 2).flatten(1).mean(dim=1)
+            loss = central_loss + mei_loss
+            loss.sum().backward(retain_graph=True)
+
+            stopped = art_opt_stim.data[~active].clone()
+            optim.step()
+            art_opt_stim.data.clamp_(0, 1)
+            art_opt_stim.data[~active] = stopped
+
+            losses[i, index] = (
+                torch.stack([loss, central_loss, mei_loss], dim=1).detach().cpu().numpy()
+            )
+            n_iters_run = i + 1
+            if tol is not None and i >= patience:
+                converged = losses[i - patience, index, 0] - losses[i, index, 0] < tol
+                active[index[converged]] = False
+
+        art_opt_stim.requires_grad = False
+        return art_opt_stim.detach(), losses[:n_iters_run]
+
 
 @dataclass
 class OptimalStimulus:
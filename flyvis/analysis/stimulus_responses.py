@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Dict, Optional, Union
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
+import torch
 import xarray as xr
+from joblib import Memory, Parallel, delayed
 
 import flyvis
 from flyvis.datasets.datasets import StimulusDataset
@@ -108,6 +112,101 @@ def compute_responses(
     )
 
 
+# network config and instance of a worker process, reused across the models it
+# computes
+_worker_network: Optional[Tuple[Dict, "flyvis.Network"]] = None
+
+
+def _compute_responses_in_worker(
+    memory: Memory,
+    checkpointed_network: "flyvis.network.CheckpointedNetwork",
+    steady_state_dir: Path,
+    compute_args: Tuple,
+    threads_per_worker: int,
+) -> xr.Dataset:
+    """Compute responses in a worker process and store them in the memory cache."""
+    global _worker_network
+    torch.set_num_threads(threads_per_worker)
+
+    if _worker_network is not None and _worker_network[0] == checkpointed_network.config:
+        # avoid reinitializing the network for each model of the worker
+        checkpointed_network.network = _worker_network[1]
+    # store steady states alongside the network directory, as in NetworkView
+    checkpointed_network.init().steady_state_dir = steady_state_dir
+
+    cached_compute_responses_fn = memory.cache(compute_responses, ignore=['batch_size'])
+    result = cached_compute_responses_fn(checkpointed_network, *compute_args)
+    _worker_network = (checkpointed_network.config, checkpointed_network.network)
+    return result
+
+
+def _parallel_compute_responses(
+    network_views: List["flyvis.NetworkView"],
+    compute_args: Tuple,
+    n_workers: int,
+    threads_per_worker: Optional[int] = None,
+) -> Tuple[List[xr.Dataset], List[str]]:
+    """Distribute uncached `compute_responses` calls across worker processes.
+
+    Args:
+        network_views: Network views to compute responses for.
+        compute_args: Arguments to `compute_responses` after the network.
+        n_workers: Number of worker processes.
+        threads_per_worker: Number of torch threads per worker. Defaults to the
+            number of CPUs divided by the number of workers.
+
+    Returns:
+        Tuple of the responses and checkpoints of each network view.
+
+    Note:
+        Results are stored in the memory cache of each network view, so that
+        subsequent calls load them as in the serial case.
+    """
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // n_workers)
+
+    checkpointed_networks = [
+        network_view.network(checkpoint="best", lazy=True)
+        for network_view in network_views
+    ]
+
+    results = [None] * len(network_views)
+    uncached = []
+    for idx, (network_view, checkpointed_network) in enumerate(
+        zip(network_views, checkpointed_networks)
+    ):
+        cached_compute_responses_fn = network_view.memory.cache(
+            compute_responses, ignore=['batch_size']
+        )
+        if cached_compute_responses_fn.check_call_in_cache(
+            checkpointed_network, *compute_args
+        ):
+            results[idx] = cached_compute_responses_fn(
+                checkpointed_network, *compute_args
+            )
+        else:
+            uncached.append(idx)
+
+    if uncached:
+        computed = Parallel(n_jobs=min(n_workers, len(uncached)))(
+            delayed(_compute_responses_in_worker)(
+                network_views[idx].memory,
+                checkpointed_networks[idx],
+                network_views[idx].steady_state_dir,
+                compute_args,
+                threads_per_worker,
+            )
+            for idx in uncached
+        )
+        for idx, result in zip(uncached, computed):
+            results[idx] = result
+
+    checkpoints = [
+        checkpointed_network.checkpoint for checkpointed_network in checkpointed_networks
+    ]
+    return results, checkpoints
+
+
 def generic_responses(
     network_view_or_ensemble: Union["flyvis.NetworkView", "flyvis.network.Ensemble"],
     dataset,
@@ -117,8 +216,34 @@ def generic_responses(
     t_fade_in: float,
     batch_size: int,
     cell_index: Optional[np.ndarray | str] = "central",
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
 ) -> xr.Dataset:
-    """Return responses for a given dataset as an xarray Dataset."""
+    """Return responses for a given dataset as an xarray Dataset.
+
+    Args:
+        network_view_or_ensemble: Network view or ensemble to compute responses for.
+        dataset: Dataset instance. If None, uses `default_dataset_cls` with
+            `dataset_config`.
+        dataset_config: Configuration of the default dataset.
+        default_dataset_cls: Default dataset class.
+        t_pre: Duration of the grey-scale stimulus before the dataset stimuli.
+        t_fade_in: Duration of the fade-in of the initial state.
+        batch_size: Batch size for the simulation.
+        cell_index: Index of the cells to store responses of. "central" for the
+            central cells of each type, None for all cells.
+        n_workers: Number of worker processes computing the responses of
+            different models in parallel. Defaults to 1, i.e., serial computation.
+        threads_per_worker: Number of torch threads per worker process. Defaults
+            to the number of CPUs divided by `n_workers`.
+
+    Returns:
+        Responses of all network views along the network_id dimension.
+
+    Note:
+        Responses are cached per network view. Only calls that are not in the
+        cache are distributed across the worker processes.
+    """
     # Handle both single and multiple NetworkViews
     if isinstance(network_view_or_ensemble, flyvis.NetworkView):
         network_views = [network_view_or_ensemble]
@@ -183,10 +308,18 @@ def generic_responses(
         checkpoints.append(checkpointed_network.checkpoint)
         return checkpointed_network.network
 
-    network = handle_network(0, network_views[0], None)
+    if n_workers > 1 and len(network_views) > 1:
+        results, checkpoints = _parallel_compute_responses(
+            network_views,
+            (dataset_class, dataset_config, batch_size, t_pre, t_fade_in, cell_index),
+            n_workers,
+            threads_per_worker,
+        )
+    else:
+        network = handle_network(0, network_views[0], None)
 
-    for idx, network_view in enumerate(network_views[1:], 1):
-        network = handle_network(idx, network_view, network)
+        for idx, network_view in enumerate(network_views[1:], 1):
+            network = handle_network(idx, network_view, network)
 
     # TODO: as long as the concatenation is not lazy, this pattern might not be
     # the best way to handle the results. See also https://github.com/pydata/xarray/issues/4628.
@@ -266,6 +399,8 @@ def flash_responses(
     radius=(-1, 6),
     dt=1 / 200,
     batch_size=4,
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
 ) -> xr.Dataset:
     default_dataset_config = {
         'dynamic_range': [0, 1],
@@ -283,6 +418,8 @@ def flash_responses(
         t_pre=1.0,
         t_fade_in=0.0,
         batch_size=batch_size,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
     )
 
 
@@ -296,6 +433,8 @@ def moving_edge_responses(
     offsets=(-10, 11),
     dt=1 / 200,
     batch_size=4,
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
 ) -> xr.Dataset:
     default_dataset_config = {
         'offsets': offsets,
@@ -316,6 +455,8 @@ def moving_edge_responses(
         t_pre=1.0,
         t_fade_in=0.0,
         batch_size=batch_size,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
     )
 
 
@@ -327,6 +468,8 @@ def moving_bar_responses(
     dataset: Optional[MovingBar] = None,
     dt=1 / 200,
     batch_size=4,
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
 ) -> xr.Dataset:
     default_dataset_config = {
         'widths': [1, 2, 4],
@@ -348,6 +491,8 @@ def moving_bar_responses(
         t_pre=1.0,
         t_fade_in=0.0,
         batch_size=batch_size,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
     )
 
 
@@ -360,6 +505,8 @@ def naturalistic_stimuli_responses(
     dt=1 / 100,
     batch_size=4,
     indices: Optional[np.ndarray] = None,
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
 ) -> xr.Dataset:
     default_dataset_config = {
         'tasks': ["lum"],
@@ -377,6 +524,8 @@ def naturalistic_stimuli_responses(
         t_pre=0.0,
         t_fade_in=2.0,
         batch_size=batch_size,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
     )
 
 
@@ -391,6 +540,8 @@ def central_impulses_responses(
     impulse_durations=(5e-3, 20e-3, 50e-3, 100e-3, 200e-3, 300e-3),
     dt=1 / 200,
     batch_size=4,
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
 ) -> xr.Dataset:
     default_dataset_config = {
         'impulse_durations': impulse_durations,
@@ -413,6 +564,8 @@ def central_impulses_responses(
         t_pre=4.0,
         t_fade_in=0.0,
         batch_size=batch_size,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
     )
 
 
@@ -428,6 +581,8 @@ def spatial_impulses_responses(
     max_extent=4,
     dt=1 / 200,
     batch_size=4,
+    n_workers: int = 1,
+    threads_per_worker: Optional[int] = None,
 ) -> xr.Dataset:
     default_dataset_config = {
         'impulse_durations': impulse_durations,
@@ -451,6 +606,8 @@ def spatial_impulses_responses(
         t_pre=4.0,
         t_fade_in=0.0,
         batch_size=batch_size,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
     )
 
 
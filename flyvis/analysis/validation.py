@@ -1,20 +1,26 @@
 import inspect
+import json
 import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import torch
+from joblib import Parallel, delayed
 from torch.utils.data import DataLoader
 from tqdm.auto import tqdm
 
 import flyvis
 from flyvis.datasets import MultiTaskDataset
 from flyvis.network import Network, NetworkView
-from flyvis.task.objectives import epe, l2norm
+from flyvis.task.objectives import epe, l2norm, sample_losses
 from flyvis.utils.class_utils import forward_subclass
+from flyvis.utils.dataset_utils import batch_to_device
 
 logging = logging.getLogger(__name__)
 
-__all__ = ["validate", "validate_all_checkpoints"]
+__all__ = ["validate", "validate_batches", "validate_all_checkpoints"]
 
 
 @torch.no_grad()
@@ -28,45 +34,75 @@ def validate(
     loss_kwargs={},
 ):
     """Tests the network and decoder on the dataloader with the given loss functions."""
+    dataset = dataloader.dataset
+    with dataset.augmentation(False):
+        return validate_batches(
+            network, decoder, dataloader, dataset.tasks, loss_fns, dt, t_pre, loss_kwargs
+        )
+
+
+@torch.no_grad()
+def validate_batches(
+    network: Network,
+    decoder,
+    batches: Iterable[Dict[str, torch.Tensor]],
+    tasks: List[str],
+    loss_fns,
+    dt,
+    t_pre=0.0,
+    loss_kwargs={},
+):
+    """Tests the network and decoder on batches of the given tasks.
+
+    Like `validate`, but on any iterable of batches, e.g. batches rendered once
+    with `render_batches` and reused for several checkpoints.
+    """
     network.eval()
 
     for _decoder in decoder.values():
         _decoder.eval()
 
-    dataset = dataloader.dataset
-    steady_state = network.steady_state(
-        t_pre=t_pre,
-        dt=dt,
-        batch_size=dataloader.batch_size,
-        value=0.5,
-        state=None,
-        grad=False,
-    )
-    losses = {task: [] for task in dataset.tasks}  # type: Dict[str, List]
+    losses = {task: [] for task in tasks}  # type: Dict[str, List]
     stimulus = network.stimulus
+    device = next(network.parameters()).device
 
-    with dataset.augmentation(False):
-        for _, data in enumerate(dataloader):
-            # Resets the stimulus buffer (#frames, #samples, #neurons).
-            # The number of frames and samples can change, but the number of nodes is
-            # constant.
-            n_samples, n_frames, _, _ = data["lum"].shape
-            stimulus.zero(n_samples, n_frames)
-
-            # Add batch of hex-videos (#frames, #samples, #hexals) as photorecptor
-            # stimuli.
-            stimulus.add_input(data["lum"])
-
-            # Run stimulus through network.
-            activity = network(stimulus(), dt, state=steady_state)
-
-            # Decode activity and evaluate loss.
-            for task in dataset.tasks:
-                y = data[task]
-                y_est = decoder[task](activity)
-                losses[task].append([
-                    fn(y_est, y, **loss_kwargs).detach().cpu().item() for fn in loss_fns
-                ])
+    for data in batches:
+        data = batch_to_device(data, device)
+        # Resets the stimulus buffer (#frames, #samples, #neurons).
+        # The number of frames and samples can change, but the number of nodes is
+        # constant.
+        n_samples, n_frames, _, _ = data["lum"].shape
+        # Cached and broadcast to the number of samples.
+        steady_state = network.steady_state(
+            t_pre=t_pre,
+            dt=dt,
+            batch_size=n_samples,
+            value=0.5,
+            state=None,
+            grad=False,
+        )
+        stimulus.zero(n_samples, n_frames)
+
+        # Add batch of hex-videos (#frames, #samples, #hexals) as photorecptor
+        # stimuli.
+        stimulus.add_input(data["lum"])
+
+        # Run stimulus through network.
+        activity = network(stimulus(), dt, state=steady_state)
+
+        # Decode activity and evaluate loss.
+        for task in tasks:
+            y = data[task]
+            y_est = decoder[task](activity)
+            # (#samples, #loss_functions), targets of padded frames are NaN
+            losses[task].extend(
+                torch.stack(
+                    [sample_losses(fn, y_est, y, **loss_kwargs) for fn in loss_fns],
+                    dim=1,
+                )
+                .cpu()
+                .tolist()
+            )
 
     summed_loss = 0
     task_loss = {}
@@ -89,50 +125,112 @@ def validate(
     return val_loss, task_loss
 
 
+def render_batches(dataloader) -> List[Dict[str, Any]]:
+    """Renders the batches of the dataloader once, without augmentation.
+
+    Returns:
+        Batches with tensors as numpy arrays, which joblib shares with worker
+        processes through memory-mapped files.
+    """
+    with dataloader.dataset.augmentation(False):
+        return [
+            {
+                key: value.cpu().numpy() if isinstance(value, torch.Tensor) else value
+                for key, value in data.items()
+            }
+            for data in dataloader
+        ]
+
+
 def validate_all_checkpoints(
     network_view: NetworkView,
     loss_fns=None,
     dt=1 / 50,
     t_pre=0.5,
     validation_subdir="validation",
+    batch_size=1,
+    n_workers=1,
+    threads_per_worker=None,
 ):
+    """Validates all checkpoints of a network.
+
+    Args:
+        network_view: Network to validate.
+        loss_fns: Loss functions. Defaults to `l2norm` and `epe`.
+        dt: Integration time step.
+        t_pre: Duration of the grey-scale stimulus before each sequence.
+        validation_subdir: Subdirectory of the network directory to store the
+            losses in.
+        batch_size: Number of validation sequences per batch. Defaults to 1.
+        n_workers: Number of worker processes validating different checkpoints in
+            parallel. Defaults to 1, i.e., serial validation. Workers construct
+            their network view with the same arguments as `network_view`, which
+            must be picklable.
+        threads_per_worker: Number of torch threads per worker process. Defaults
+            to the number of CPUs divided by `n_workers`.
+
+    Returns:
+        Array of losses of shape (#checkpoints, #loss_fns).
+
+    Note:
+        The loss of each checkpoint is recorded in `<validation_subdir>/_chkpts`
+        as soon as it is computed. Checkpoints with a record of the same
+        checkpoint file and validation settings are not validated again, so that
+        interrupted runs resume and new checkpoints are validated incrementally.
+    """
     dataset = forward_subclass(MultiTaskDataset, network_view.dir.config.task.dataset)
     loss_fns = get_loss_fns(loss_fns)
-    network_view.init_network()
-    network_view.init_decoder()
-    _, val_sequences = dataset.original_train_and_validation_indices()
-
-    dataloader = DataLoader(
-        dataset,
-        batch_size=1,
-        num_workers=0,
-        sampler=flyvis.utils.dataset_utils.IndexSampler(val_sequences),
-        drop_last=False,
-    )
+    config = dict(dt=dt, t_pre=t_pre, loss_fns=[fn.__name__ for fn in loss_fns])
+    records_dir = network_view.dir.path / validation_subdir / "_chkpts"
+    checkpoints = network_view.checkpoints
 
-    dataloader.dataset.dt = dt
+    loss = {}
+    pending = []
+    for chkpt, path in zip(checkpoints.indices, checkpoints.paths):
+        record = _read_record(records_dir, chkpt, path, config)
+        if record is None:
+            pending.append((chkpt, path))
+        else:
+            loss[chkpt] = record
 
-    loss = []
-    progress = tqdm(total=len(network_view.dir.chkpt_index))
-    for chkpt in network_view.checkpoints.indices:
-        network = network_view.network(checkpoint=chkpt)
-        decoder = network_view.init_decoder(
-            checkpoint=chkpt, decoder=network_view.decoder
-        )
-        loss.append(
-            validate(
-                network=network.network,
-                decoder=decoder,
-                dataloader=dataloader,
-                loss_fns=loss_fns,
-                dt=dt,
-                t_pre=t_pre,
-            )[0]
+    if pending:
+        _, val_sequences = dataset.original_train_and_validation_indices()
+        dataset.dt = dt
+        dataloader = DataLoader(
+            dataset,
+            batch_size=batch_size,
+            num_workers=0,
+            sampler=flyvis.utils.dataset_utils.IndexSampler(val_sequences),
+            drop_last=False,
+            collate_fn=flyvis.utils.dataset_utils.pad_collate,
         )
-        progress.update(1)
-    progress.close()
+        batches = render_batches(dataloader)
+        validate_args = (batches, dataset.tasks, loss_fns, dt, t_pre, records_dir, config)
 
-    loss = np.array(loss)
+        if n_workers > 1 and len(pending) > 1:
+            if threads_per_worker is None:
+                threads_per_worker = max(1, (os.cpu_count() or 1) // n_workers)
+            computed = Parallel(n_jobs=min(n_workers, len(pending)))(
+                delayed(_validate_checkpoint_in_worker)(
+                    str(network_view.dir.path),
+                    _network_view_kwargs(network_view),
+                    chkpt,
+                    path,
+                    validate_args,
+                    threads_per_worker,
+                )
+                for chkpt, path in pending
+            )
+            loss.update(zip([chkpt for chkpt, _ in pending], computed))
+        else:
+            network_view.init_network()
+            network_view.init_decoder()
+            for chkpt, path in tqdm(pending):
+                loss[chkpt] = _validate_checkpoint(
+                    network_view, chkpt, path, *validate_args
+                )
+
+    loss = np.array([loss[chkpt] for chkpt in checkpoints.indices])
 
     for i, fn in enumerate(loss_fns):
         network_view.dir[validation_subdir][fn.__name__] = loss[:, i]
@@ -148,6 +246,105 @@ def validate_all_checkpoints(
     return loss
 
 
+def _validate_checkpoint(
+    network_view: NetworkView,
+    chkpt: int,
+    path: Path,
+    batches: List[Dict[str, Any]],
+    tasks: List[str],
+    loss_fns,
+    dt,
+    t_pre,
+    records_dir: Path,
+    config: Dict[str, Any],
+) -> List[float]:
+    """Validates a single checkpoint and records its loss."""
+    network = network_view.network(checkpoint=chkpt)
+    decoder = network_view.init_decoder(checkpoint=chkpt, decoder=network_view.decoder)
+    loss = validate_batches(
+        network=network.network,
+        decoder=decoder,
+        batches=batches,
+        tasks=tasks,
+        loss_fns=loss_fns,
+        dt=dt,
+        t_pre=t_pre,
+    )[0].tolist()
+    _write_record(records_dir, chkpt, path, config, loss)
+    return loss
+
+
+def _network_view_kwargs(network_view: NetworkView) -> Dict[str, Any]:
+    """Returns the arguments to construct the network view in a worker process."""
+    return dict(
+        network_class=network_view.network_class,
+        root_dir=network_view.root_dir,
+        connectome_getter=network_view.connectome_getter,
+        checkpoint_mapper=network_view.checkpoint_mapper,
+        best_checkpoint_fn=network_view.best_checkpoint_fn,
+        best_checkpoint_fn_kwargs=network_view.best_checkpoint_fn_kwargs,
+        recover_fn=network_view.recover_fn,
+        checkpoints=network_view.checkpoints,
+    )
+
+
+# network view of a worker process and the arguments it was constructed with,
+# reused across the checkpoints it validates
+_worker_network_view: Optional[Tuple[Tuple[str, Dict[str, Any]], NetworkView]] = None
+
+
+def _validate_checkpoint_in_worker(
+    network_dir: str,
+    view_kwargs: Dict[str, Any],
+    chkpt: int,
+    path: Path,
+    validate_args: Tuple,
+    threads_per_worker: int,
+) -> List[float]:
+    """Validates a single checkpoint in a worker process."""
+    global _worker_network_view
+    torch.set_num_threads(threads_per_worker)
+
+    key = (network_dir, view_kwargs)
+    if _worker_network_view is None or _worker_network_view[0] != key:
+        network_view = NetworkView(network_dir, **view_kwargs)
+        network_view.init_network()
+        network_view.init_decoder()
+        _worker_network_view = (key, network_view)
+    return _validate_checkpoint(_worker_network_view[1], chkpt, path, *validate_args)
+
+
+def _read_record(
+    records_dir: Path, chkpt: int, path: Path, config: Dict[str, Any]
+) -> Optional[List[float]]:
+    """Returns the recorded loss of a checkpoint, if it is up to date."""
+    try:
+        record = json.loads((records_dir / f"chkpt_{chkpt:05}.json").read_text())
+    except (OSError, ValueError):
+        return None
+    if record["mtime"] != Path(path).stat().st_mtime_ns or record["config"] != config:
+        return None
+    return record["loss"]
+
+
+def _write_record(
+    records_dir: Path,
+    chkpt: int,
+    path: Path,
+    config: Dict[str, Any],
+    loss: List[float],
+) -> None:
+    """Records the loss of a checkpoint, keyed by the checkpoint file mtime."""
+    records_dir.mkdir(parents=True, exist_ok=True)
+    record_path = records_dir / f"chkpt_{chkpt:05}.json"
+    # unique temporary files and atomic renames allow concurrent processes
+    tmp_path = record_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(
+        json.dumps(dict(mtime=Path(path).stat().st_mtime_ns, config=config, loss=loss))
+    )
+    os.replace(tmp_path, record_path)
+
+
 def get_loss_fns(loss_fns):
     if loss_fns:
         return loss_fns
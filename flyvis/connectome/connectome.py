@@ -1,11 +1,14 @@
 """Connectome compiler and visualizer."""
 
+import hashlib
 import json
+import os
 from contextlib import suppress
 from dataclasses import dataclass
 from importlib import resources
 from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     Dict,
@@ -18,23 +21,20 @@ from typing import (
     Union,
 )
 
-import matplotlib.path as mp
 import numpy as np
 from datamate import ArrayFile, Directory, Namespace, root
-from matplotlib import colormaps as cm
-from matplotlib.axes import Axes
-from matplotlib.colors import Colormap
-from matplotlib.figure import Figure
 from numpy.typing import NDArray
 from pandas import DataFrame
 from toolz import groupby, valmap
 
 import flyvis
-from flyvis.analysis.visualization import plots, plt_utils
-from flyvis.analysis.visualization.figsize_utils import figsize_from_n_items
-from flyvis.analysis.visualization.network_fig import WholeNetworkFigure
 from flyvis.utils import df_utils, hex_utils, nodes_edges_utils
 
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.colors import Colormap
+    from matplotlib.figure import Figure
+
 __all__ = [
     "ConnectomeFromAvgFilters",
     "ConnectomeView",
@@ -155,6 +155,10 @@ class ConnectomeFromAvgFilters(Directory):
 
         See "data/connectome/fib25-fib19_v2.2.json" for an example.
 
+        The compiled node and edge tables are cached in a `_compiled` directory
+        next to the connectome directory, keyed by the content of the file,
+        `extent`, and `n_syn_fill`.
+
     Example:
         ```python
         config = Namespace(file='fib25-fib19_v2.2.json', extent=15, n_syn_fill=1)
@@ -176,97 +180,74 @@ class ConnectomeFromAvgFilters(Directory):
             raise FileNotFoundError(f"Connectome file {file} not found.")
 
         # Load the connectome spec.
-        spec = json.loads(Path(file).read_text())
-
-        # Store unique cell types and layout variables.
-        self.unique_cell_types = np.bytes_([n["name"] for n in spec["nodes"]])
-        self.input_cell_types = np.bytes_(spec["input_units"])
-        self.output_cell_types = np.bytes_(spec["output_units"])
+        spec_text = Path(file).read_text()
+        spec = json.loads(spec_text)
+
+        # Store unique cell types and layout variables. These are kept in memory
+        # during construction because iterating the stored files reads per item.
+        unique_cell_types = np.bytes_([n["name"] for n in spec["nodes"]])
+        input_cell_types = np.bytes_(spec["input_units"])
+        output_cell_types = np.bytes_(spec["output_units"])
         intermediate_cell_types, _ = nodes_edges_utils.order_node_type_list(
             np.array(
                 list(
-                    set(self.unique_cell_types)
-                    - set(self.input_cell_types)
-                    - set(self.output_cell_types)
+                    set(unique_cell_types)
+                    - set(input_cell_types)
+                    - set(output_cell_types)
                 )
             ).astype(str)
         )
-        self.intermediate_cell_types = np.array(intermediate_cell_types).astype("S")
+        intermediate_cell_types = np.array(intermediate_cell_types).astype("S")
 
         layout = []
         layout.extend(
             list(
                 zip(
-                    self.input_cell_types,
-                    [b"retina" for _ in range(len(self.input_cell_types))],
+                    input_cell_types,
+                    [b"retina" for _ in range(len(input_cell_types))],
                 )
             )
         )
         layout.extend(
             list(
                 zip(
-                    self.intermediate_cell_types,
-                    [b"intermediate" for _ in range(len(self.intermediate_cell_types))],
+                    intermediate_cell_types,
+                    [b"intermediate" for _ in range(len(intermediate_cell_types))],
                 )
             )
         )
         layout.extend(
             list(
                 zip(
-                    self.output_cell_types,
-                    [b"output" for _ in range(len(self.output_cell_types))],
+                    output_cell_types,
+                    [b"output" for _ in range(len(output_cell_types))],
                 )
             )
         )
+        self.unique_cell_types = unique_cell_types
+        self.input_cell_types = input_cell_types
+        self.output_cell_types = output_cell_types
+        self.intermediate_cell_types = intermediate_cell_types
         self.layout = np.bytes_(layout)
 
-        # Construct nodes and edges.
-        nodes: List[Node] = []
-        edges: List[Edge] = []
-        add_nodes(nodes, spec["nodes"], extent)
-        add_edges(edges, nodes, spec["edges"], n_syn_fill)
-
-        # Define node roles (input, intermediate, output).
-        _role = {node: "intermediate" for node in set([n.type for n in nodes])}
-        _role.update({node: "input" for node in _role if node in spec["input_units"]})
-        _role.update({node: "output" for node in _role if node in spec["output_units"]})
-
-        # Store the graph.
-        self.nodes = dict(  # type: ignore
-            index=np.int64([n.id for n in nodes]),
-            type=np.bytes_([n.type for n in nodes]),
-            u=np.int32([n.u for n in nodes]),
-            v=np.int32([n.v for n in nodes]),
-            role=np.bytes_([_role[n.type] for n in nodes]),
+        # Construct nodes and edges, or load them from the compiled cache.
+        nodes, edges = load_compiled_graph(
+            spec_text, extent, n_syn_fill, self.path.parent / "_compiled"
         )
 
-        self.edges = dict(  # type: ignore
-            # [Essential fields]
-            source_index=np.int64([e.source.id for e in edges]),
-            target_index=np.int64([e.target.id for e in edges]),
-            sign=np.float32([e.sign for e in edges]),
-            n_syn=np.float32([e.n_syn for e in edges]),
-            # [Convenience fields]
-            source_type=np.bytes_([e.source.type for e in edges]),
-            target_type=np.bytes_([e.target.type for e in edges]),
-            source_u=np.int32([e.source.u for e in edges]),
-            target_u=np.int32([e.target.u for e in edges]),
-            source_v=np.int32([e.source.v for e in edges]),
-            target_v=np.int32([e.target.v for e in edges]),
-            du=np.int32([e.target.u - e.source.u for e in edges]),
-            dv=np.int32([e.target.v - e.source.v for e in edges]),
-            n_syn_certainty=np.float32([e.n_syn_certainty for e in edges]),
-        )
+        # Store the graph.
+        self.nodes = nodes  # type: ignore
+        self.edges = edges  # type: ignore
 
         # Store central indices.
         self.central_cells_index = np.int64(
-            np.nonzero((self.nodes.u[:] == 0) & (self.nodes.v[:] == 0))[0]
+            np.nonzero((nodes["u"] == 0) & (nodes["v"] == 0))[0]
         )
 
         # Store layer indices.
         layer_index = {}
-        for cell_type in self.unique_cell_types[:]:
-            node_indices = np.nonzero(self.nodes["type"][:] == cell_type)[0]
+        for cell_type in unique_cell_types:
+            node_indices = np.nonzero(nodes["type"] == cell_type)[0]
             layer_index[cell_type.decode()] = np.int64(node_indices)
         self.nodes.layer_index = layer_index
 
@@ -443,6 +424,7 @@ def fill_hull(offsets: List[list], n_syn_fill: float) -> List[list]:
         List of filled offsets.
     """
     # to save time at library import
+    import matplotlib.path as mp
     import scipy.spatial as ss
 
     # Collect the points (column offsets, (du, dv)) reported as edges.
@@ -499,6 +481,191 @@ def add_conv_edges(
                 seq.append(Edge(len(seq), src, tgt, sign, n_syn, n_syn_certainty))
 
 
+# -- Vectorized graph construction ---------------------------------------------
+
+# Bump to invalidate compiled graphs whenever the construction changes.
+COMPILED_GRAPH_VERSION = 1
+
+
+def compile_nodes(spec: dict, extent: int) -> Dict[str, NDArray]:
+    """Construct the node table from the connectome spec.
+
+    Vectorized equivalent of `add_nodes`: selects the strided subsets of the hex
+    coordinates per cell type with boolean masks instead of appending `Node`s.
+
+    Args:
+        spec: Connectome spec with `nodes`, `input_units` and `output_units`.
+        extent: The array radius, in columns.
+
+    Returns:
+        Node columns `index`, `type`, `u`, `v`, and `role`.
+    """
+    hex_u, hex_v = hex_utils.get_hex_coords(extent)
+    types, us, vs = [], [], []
+    for n in spec["nodes"]:
+        typ, (pattern, args) = n["name"], n["pattern"]
+        if pattern == "stride":
+            u_stride, v_stride = args
+        elif pattern == "tile":
+            u_stride = v_stride = args
+        elif pattern == "single":
+            types.append(typ)
+            us.append(np.zeros(1, dtype=int))
+            vs.append(np.zeros(1, dtype=int))
+            continue
+        else:
+            continue
+        mask = (hex_u % u_stride == 0) & (hex_v % v_stride == 0)
+        types.append(typ)
+        us.append(hex_u[mask])
+        vs.append(hex_v[mask])
+
+    counts = [len(u) for u in us]
+    role = {typ: "intermediate" for typ in types}
+    role.update({typ: "input" for typ in role if typ in spec["input_units"]})
+    role.update({typ: "output" for typ in role if typ in spec["output_units"]})
+    return dict(
+        index=np.arange(sum(counts), dtype=np.int64),
+        type=np.repeat(np.bytes_(types), counts),
+        u=np.int32(np.concatenate(us)),
+        v=np.int32(np.concatenate(vs)),
+        role=np.repeat(np.bytes_([role[typ] for typ in types]), counts),
+    )
+
+
+def compile_edges(
+    nodes: Dict[str, NDArray], edge_spec: List[dict], n_syn_fill: float
+) -> Dict[str, NDArray]:
+    """Construct the edge table from the node table and the edge spec.
+
+    Vectorized equivalent of `add_edges`: broadcasts the offsets of each
+    connection set over the coordinates of its source cells and looks up the
+    targets in a dense (type, u, v) grid. Edges are ordered as in `add_edges`,
+    i.e. by connection set, then by offset, then by source cell.
+
+    Args:
+        nodes: Node columns as returned by `compile_nodes`.
+        edge_spec: List of connection sets.
+        n_syn_fill: Number of synapses to assume in data gaps.
+
+    Returns:
+        Edge columns.
+    """
+    node_type, node_u, node_v = nodes["type"], nodes["u"], nodes["v"]
+    types, node_type_id = np.unique(node_type, return_inverse=True)
+    node_type_id = node_type_id.ravel()
+    type_index = {typ.decode(): i for i, typ in enumerate(types)}
+    node_indices = [np.nonzero(node_type_id == i)[0] for i in range(len(types))]
+
+    # lookup[type, u + n, v + n] is the node index, or -1 where there is no node.
+    n = int(max(np.abs(node_u).max(), np.abs(node_v).max()))
+    lookup = np.full((len(types), 2 * n + 1, 2 * n + 1), -1, dtype=np.int64)
+    lookup[node_type_id, node_u + n, node_v + n] = nodes["index"]
+
+    columns = dict(source_index=[], target_index=[], sign=[], n_syn=[], certainty=[])
+    for e in edge_spec:
+        if e["src"] not in type_index or e["tar"] not in type_index:
+            continue
+        offsets = (
+            fill_hull(e["offsets"], n_syn_fill)
+            if n_syn_fill > 0 and len(e["offsets"]) >= 3
+            else e["offsets"]
+        )
+        du, dv = np.array([offset[0] for offset in offsets], dtype=int).reshape(-1, 2).T
+        n_syn = np.array([offset[1] for offset in offsets], dtype=float)
+
+        # (n_offsets, n_sources) target coordinates.
+        source_index = node_indices[type_index[e["src"]]]
+        target_u = node_u[source_index] + du[:, None]
+        target_v = node_v[source_index] + dv[:, None]
+        inside = (np.abs(target_u) <= n) & (np.abs(target_v) <= n)
+        target_index = np.full(target_u.shape, -1, dtype=np.int64)
+        target_index[inside] = lookup[
+            type_index[e["tar"]], target_u[inside] + n, target_v[inside] + n
+        ]
+
+        offset, source = np.nonzero(target_index >= 0)
+        columns["source_index"].append(source_index[source])
+        columns["target_index"].append(target_index[offset, source])
+        columns["sign"].append(np.full(len(offset), e["alpha"], dtype=float))
+        columns["n_syn"].append(n_syn[offset])
+        columns["certainty"].append(np.full(len(offset), e["lambda_mult"], dtype=float))
+
+    columns = valmap(np.concatenate, columns)
+    source_index = np.int64(columns["source_index"])
+    target_index = np.int64(columns["target_index"])
+    return dict(
+        # [Essential fields]
+        source_index=source_index,
+        target_index=target_index,
+        sign=np.float32(columns["sign"]),
+        n_syn=np.float32(columns["n_syn"]),
+        # [Convenience fields]
+        source_type=node_type[source_index],
+        target_type=node_type[target_index],
+        source_u=node_u[source_index],
+        target_u=node_u[target_index],
+        source_v=node_v[source_index],
+        target_v=node_v[target_index],
+        du=node_u[target_index] - node_u[source_index],
+        dv=node_v[target_index] - node_v[source_index],
+        n_syn_certainty=np.float32(columns["certainty"]),
+    )
+
+
+def load_compiled_graph(
+    spec_text: str,
+    extent: int,
+    n_syn_fill: float,
+    cache_dir: Optional[Path] = None,
+) -> Tuple[Dict[str, NDArray], Dict[str, NDArray]]:
+    """Compile the node and edge tables, reusing previously compiled tables.
+
+    Compiled tables are stored in `cache_dir` under a hash of the spec content,
+    `extent`, and `n_syn_fill`, so that identical connectomes are only compiled
+    once, independent of the file name and the directory they are stored in.
+
+    Args:
+        spec_text: Content of the JSON connectome file.
+        extent: The array radius, in columns.
+        n_syn_fill: The number of synapses to assume in data gaps.
+        cache_dir: Directory of compiled tables. No caching if None.
+
+    Returns:
+        Node and edge columns.
+    """
+    if cache_dir is not None:
+        key = hashlib.sha1(
+            repr((COMPILED_GRAPH_VERSION, spec_text, extent, n_syn_fill)).encode()
+        ).hexdigest()
+        path = Path(cache_dir) / f"{key}.npz"
+        with suppress(OSError, ValueError), np.load(path) as compiled:
+            return tuple(
+                {
+                    name.split(".", 1)[1]: compiled[name]
+                    for name in compiled.files
+                    if name.startswith(f"{table}.")
+                }
+                for table in ("nodes", "edges")
+            )
+
+    spec = json.loads(spec_text)
+    nodes = compile_nodes(spec, extent)
+    edges = compile_edges(nodes, spec["edges"], n_syn_fill)
+
+    if cache_dir is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                **{f"nodes.{name}": value for name, value in nodes.items()},
+                **{f"edges.{name}": value for name, value in edges.items()},
+            )
+        os.replace(tmp_path, path)
+    return nodes, edges
+
+
 # -- ConnectomeView ------------------------------------------------------------
 
 
@@ -561,12 +728,12 @@ class ConnectomeView:
         cell_types: Optional[List[str]] = None,
         no_symlog: Optional[bool] = False,
         min_number: Optional[float] = None,
-        cmap: Optional[Colormap] = None,
+        cmap: Optional["Colormap"] = None,
         size_scale: Optional[float] = None,
         title: Optional[str] = None,
         cbar_label: Optional[str] = None,
         **kwargs,
-    ) -> Figure:
+    ) -> "Figure":
         """Plot the connectivity matrix as counts or weights.
 
         Args:
@@ -584,6 +751,11 @@ class ConnectomeView:
         Returns:
             Figure: Matplotlib figure object.
         """
+        # to save time at library import
+        from matplotlib import colormaps as cm
+
+        from flyvis.analysis.visualization import plots
+
         _kwargs = dict(
             n_syn=dict(
                 symlog=1e-5,
@@ -670,7 +842,7 @@ class ConnectomeView:
         self,
         max_extent: int = 5,
         **kwargs,
-    ) -> Figure:
+    ) -> "Figure":
         """Plot retinotopic hexagonal lattice columnar organization of the network.
 
         Args:
@@ -680,6 +852,9 @@ class ConnectomeView:
         Returns:
             Figure: Matplotlib figure object.
         """
+        # to save time at library import
+        from flyvis.analysis.visualization.network_fig import WholeNetworkFigure
+
         backbone = WholeNetworkFigure(self.dir)
         backbone.init_figure(figsize=[7, 3])
         return self.hex_layout_all(
@@ -694,11 +869,11 @@ class ConnectomeView:
         edgewidth: float = 0.5,
         alpha: float = 1,
         fill: bool = False,
-        cmap: Optional[Colormap] = None,
-        fig: Optional[Figure] = None,
-        ax: Optional[Axes] = None,
+        cmap: Optional["Colormap"] = None,
+        fig: Optional["Figure"] = None,
+        ax: Optional["Axes"] = None,
         **kwargs,
-    ) -> Figure:
+    ) -> "Figure":
         """Plot retinotopic hexagonal lattice organization of a cell type.
 
         Args:
@@ -716,6 +891,9 @@ class ConnectomeView:
         Returns:
             Figure: Matplotlib figure object.
         """
+        # to save time at library import
+        from flyvis.analysis.visualization import plots, plt_utils
+
         nodes = self.nodes.to_df()
         node_condition = nodes.type == cell_type
         u, v = nodes.u[node_condition], nodes.v[node_condition]
@@ -759,11 +937,11 @@ class ConnectomeView:
         edgecolor: str = "none",
         alpha: float = 1,
         fill: bool = False,
-        cmap: Optional[Colormap] = None,
-        fig: Optional[Figure] = None,
-        axes: Optional[List[Axes]] = None,
+        cmap: Optional["Colormap"] = None,
+        fig: Optional["Figure"] = None,
+        axes: Optional[List["Axes"]] = None,
         **kwargs,
-    ) -> Figure:
+    ) -> "Figure":
         """Plot retinotopic hexagonal lattice organization of all cell types.
 
         Args:
@@ -780,6 +958,9 @@ class ConnectomeView:
         Returns:
             Figure: Matplotlib figure object.
         """
+        # to save time at library import
+        from flyvis.analysis.visualization import plt_utils
+
         cell_types = self.cell_types_sorted if cell_types is None else cell_types
         if fig is None or axes is None:
             fig, axes, (gw, gh) = plt_utils.get_axis_grid(self.cell_types_sorted)
@@ -847,7 +1028,7 @@ class ConnectomeView:
         vmax: Optional[float] = None,
         title: str = "{source} :→ {target}",
         **kwargs,
-    ) -> Figure:
+    ) -> "Figure":
         """Plot the receptive field of a target cell type from a source cell type.
 
         Args:
@@ -863,6 +1044,9 @@ class ConnectomeView:
         Returns:
             Matplotlib Figure object.
         """
+        # to save time at library import
+        from flyvis.analysis.visualization import plots
+
         if rfs is None:
             rfs = ReceptiveFields(target, self.edges.to_df())
             max_extent = max_extent or rfs.max_extent
@@ -906,15 +1090,15 @@ class ConnectomeView:
         ax_titles: str = "{source} :→ {target}",
         figsize: List[int] = [20, 20],
         max_extent: Optional[int] = None,
-        fig: Optional[Figure] = None,
-        axes: Optional[List[Axes]] = None,
+        fig: Optional["Figure"] = None,
+        axes: Optional[List["Axes"]] = None,
         ignore_sign_error: bool = False,
         max_figure_height_cm: float = 22,
         panel_height_cm: float = 3,
         max_figure_width_cm: float = 18,
         panel_width_cm: float = 3.6,
         **kwargs,
-    ) -> Figure:
+    ) -> "Figure":
         """Plot receptive fields of a target cell type in a grid layout.
 
         Args:
@@ -936,6 +1120,9 @@ class ConnectomeView:
         Returns:
             Matplotlib Figure object.
         """
+        # to save time at library import
+        from flyvis.analysis.visualization import plots
+        from flyvis.analysis.visualization.figsize_utils import figsize_from_n_items
 
         rfs = ReceptiveFields(target, self.edges.to_df())
         max_extent = max_extent or rfs.max_extent
@@ -1011,7 +1198,7 @@ class ConnectomeView:
         vmin: Optional[float] = None,
         vmax: Optional[float] = None,
         **kwargs,
-    ) -> Optional[Figure]:
+    ) -> Optional["Figure"]:
         """Plot the projective field from a source cell type to a target cell type.
 
         Args:
@@ -1027,6 +1214,9 @@ class ConnectomeView:
         Returns:
             Matplotlib Figure object or None if max_extent is None.
         """
+        # to save time at library import
+        from flyvis.analysis.visualization import plots
+
         if prfs is None:
             prfs = ProjectiveFields(source, self.edges.to_df())
             max_extent = max_extent or prfs.max_extent
@@ -1066,8 +1256,8 @@ class ConnectomeView:
         self,
         source: str,
         targets: Optional[Iterable[str]] = None,
-        fig: Optional[Figure] = None,
-        axes: Optional[List[Axes]] = None,
+        fig: Optional["Figure"] = None,
+        axes: Optional[List["Axes"]] = None,
         figsize: List[int] = [20, 20],
         ax_titles: str = "{source} →: {target}",
         max_figure_height_cm: float = 22,
@@ -1078,7 +1268,7 @@ class ConnectomeView:
         sort_alphabetically: bool = False,
         ignore_sign_error: bool = False,
         **kwargs,
-    ) -> Figure:
+    ) -> "Figure":
         """Plot projective fields of a source cell type in a grid layout.
 
         Args:
@@ -1100,6 +1290,10 @@ class ConnectomeView:
         Returns:
             Matplotlib Figure object.
         """
+        # to save time at library import
+        from flyvis.analysis.visualization import plots
+        from flyvis.analysis.visualization.figsize_utils import figsize_from_n_items
+
         prfs = ProjectiveFields(source, self.edges.to_df())
         max_extent = max_extent or prfs.max_extent
         weights = self._weights()
@@ -1,5 +1,26 @@
-from .datasets import *
-from .flashes import *
-from .moving_bar import *
-from .dots import *
-from .sintel import *
+from importlib import import_module
+
+# Public names by submodule. They are imported on first access so that, e.g.,
+# importing the base datasets does not import the rendering stack.
+_submodule_attrs = {
+    "datasets": ("SequenceDataset", "StimulusDataset", "MultiTaskDataset"),
+    "flashes": ("RenderedFlashes", "Flashes", "render_flash"),
+    "moving_bar": ("RenderedOffsets", "MovingBar", "MovingEdge"),
+    "dots": ("Dots", "CentralImpulses", "SpatialImpulses"),
+    "sintel": ("RenderedSintel", "MultiTaskSintel", "AugmentedSintel"),
+}
+
+__all__ = [name for names in _submodule_attrs.values() for name in names]
+
+
+def __getattr__(name):
+    for submodule, names in _submodule_attrs.items():
+        if name in names:
+            value = getattr(import_module(f"{__name__}.{submodule}"), name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
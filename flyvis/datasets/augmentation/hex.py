@@ -1,6 +1,6 @@
 """Transformations and augmentations on hex-lattices."""
 
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Sequence
 
 import numpy as np
 import torch
@@ -19,6 +19,7 @@ __all__ = [
     "ContrastBrightness",
     "PixelNoise",
     "GammaCorrection",
+    "flip_and_rotate",
 ]
 
 
@@ -73,7 +74,7 @@ class HexRotate(Augmentation):
         dims = seq.shape[-2]
         seq = seq[..., self.permutation_indices[self.n_rot]]
         if dims > 1:
-            seq = self.rotation_matrices[self.n_rot][dims - 2] @ seq
+            seq = self.rotation_matrices[self.n_rot][dims - 2].to(seq.device) @ seq
         return seq
 
     def transform(self, seq: torch.Tensor, n_rot: Optional[int] = None) -> torch.Tensor:
@@ -175,7 +176,7 @@ class HexFlip(Augmentation):
         dims = seq.shape[-2]
         seq = seq[..., self.permutation_indices[self.axis]]
         if dims > 1:
-            seq = self.rotation_matrices[self.axis][dims - 2] @ seq
+            seq = self.rotation_matrices[self.axis][dims - 2].to(seq.device) @ seq
         return seq
 
     def transform(self, seq: torch.Tensor, axis: Optional[int] = None) -> torch.Tensor:
@@ -242,20 +243,38 @@ class ContrastBrightness(Augmentation):
         self.brightness_std = brightness_std
         self.set_or_sample(contrast_factor, brightness_factor)
 
-    def transform(self, seq: torch.Tensor) -> torch.Tensor:
+    def transform(
+        self,
+        seq: torch.Tensor,
+        contrast_factor: Optional[Sequence[float]] = None,
+        brightness_factor: Optional[Sequence[float]] = None,
+    ) -> torch.Tensor:
         """Apply the transformation to a sequence.
 
         Args:
             seq: Input sequence.
+            contrast_factor: Contrast factor of each sample of a batch of shape
+                (batch, ...). If None, uses the contrast factor of the instance.
+            brightness_factor: Brightness factor of each sample of the batch.
+                Required if contrast_factor is given.
 
         Returns:
             Transformed sequence.
         """
-        if self.contrast_factor is not None:
+        if contrast_factor is None:
+            contrast_factor = self.contrast_factor
+            brightness_factor = self.brightness_factor
+        else:
+            shape = (-1,) + (1,) * (seq.ndim - 1)
+            contrast_factor = torch.tensor(
+                contrast_factor, dtype=seq.dtype, device=seq.device
+            ).reshape(shape)
+            brightness_factor = torch.tensor(
+                brightness_factor, dtype=seq.dtype, device=seq.device
+            ).reshape(shape)
+        if contrast_factor is not None:
             return (
-                self.contrast_factor * (seq - 0.5)
-                + 0.5
-                + self.contrast_factor * self.brightness_factor
+                contrast_factor * (seq - 0.5) + 0.5 + contrast_factor * brightness_factor
             ).clamp(0)
         return seq
 
@@ -385,3 +404,45 @@ class GammaCorrection(Augmentation):
         if gamma is None:
             gamma = max(0, np.random.normal(1, self.std)) if self.std else 1.0
         self.gamma = gamma
+
+
+def flip_and_rotate(
+    seq: torch.Tensor,
+    flip: HexFlip,
+    rotate: HexRotate,
+    axes: np.ndarray,
+    n_rots: np.ndarray,
+) -> torch.Tensor:
+    """Flip and then rotate each sequence of a batch individually.
+
+    Composes the flip and rotation of each sample into a single permutation of
+    the hexals and, for vector-valued sequences, a single matrix, such that the
+    whole batch is transformed by one gather and one matrix product.
+
+    Args:
+        seq: Sequences of shape (batch, frames, dims, hexals).
+        flip: Provides the permutation indices and matrices of the flips.
+        rotate: Provides the permutation indices and matrices of the rotations.
+        axes: Flipping axis of each sample. 0 corresponds to no flipping.
+        n_rots: Number of 60 degree rotations of each sample.
+
+    Returns:
+        Transformed sequences of the same shape as seq.
+    """
+    batch_size, _, dims, n_hexals = seq.shape
+    identity_index = np.arange(n_hexals)
+    identity_matrix = torch.eye(dims, device="cpu")
+    indices, matrices = [], []
+    for axis, n_rot in zip(axes, n_rots % 6):
+        flip_index = flip.permutation_indices[axis] if axis > 0 else identity_index
+        indices.append(flip_index[rotate.permutation_indices[n_rot]])
+        if dims > 1:
+            flip_matrix = (
+                flip.rotation_matrices[axis][dims - 2] if axis > 0 else identity_matrix
+            )
+            matrices.append(rotate.rotation_matrices[n_rot][dims - 2] @ flip_matrix)
+    index = torch.tensor(np.array(indices), device=seq.device)
+    seq = seq.gather(-1, index[:, None, None].expand(batch_size, *seq.shape[1:]))
+    if dims > 1:
+        seq = torch.einsum("bij,bfjh->bfih", torch.stack(matrices).to(seq), seq)
+    return seq
@@ -61,7 +61,7 @@ class Interpolate(Augmentation):
         Returns:
             torch.Tensor: Indices for piecewise constant interpolation.
         """
-        indices = torch.arange(length, dtype=torch.float)[None, None]
+        indices = torch.arange(length, dtype=torch.float, device="cpu")[None, None]
         return (
             nnf.interpolate(
                 indices,
@@ -183,4 +183,6 @@ def get_temporal_sample_indices(
     if augment:
         last_valid_start = total_seq_length - n_frames or 1
         start = np.random.randint(low=0, high=last_valid_start)
-    return torch.arange(start, start + n_frames - 1e-6, dt * framerate).long()
+    return torch.arange(
+        start, start + n_frames - 1e-6, dt * framerate, device="cpu"
+    ).long()
@@ -24,6 +24,7 @@ def rotation_matrix(angle_in_rad: float, three_d: bool = False) -> torch.Tensor:
                 [0, 0, 1],
             ]),
             dtype=torch.float,
+            device="cpu",
         )
     return torch.tensor(
         np.array([
@@ -31,6 +32,7 @@ def rotation_matrix(angle_in_rad: float, three_d: bool = False) -> torch.Tensor:
             [np.sin(angle_in_rad), np.cos(angle_in_rad)],
         ]),
         dtype=torch.float,
+        device="cpu",
     )
 
 
@@ -98,6 +100,7 @@ def flip_matrix(angle_in_rad: float, three_d: bool = False) -> torch.Tensor:
                 [0, 0, 1],
             ]),
             dtype=torch.float,
+            device="cpu",
         )
     return torch.tensor(
         np.array([
@@ -105,6 +108,7 @@ def flip_matrix(angle_in_rad: float, three_d: bool = False) -> torch.Tensor:
             [np.sin(2 * angle_in_rad), -np.cos(2 * angle_in_rad)],
         ]),
         dtype=torch.float,
+        device="cpu",
     )
 
 
@@ -7,6 +7,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import torch
+from cachetools import LRUCache
 from datamate import Directory, Namespace, root
 from matplotlib.colors import Colormap
 from matplotlib.patches import RegularPolygon
@@ -20,7 +21,7 @@ from flyvis.analysis.visualization.plt_utils import init_plot
 from flyvis.datasets.datasets import StimulusDataset
 
 from .rendering import HexEye
-from .rendering.utils import pad, resample, shuffle
+from .rendering.utils import pad
 
 logging = logging.getLogger(__name__)
 
@@ -109,6 +110,10 @@ class MovingBar(StimulusDataset):
         shuffle_offsets: Shuffle the offsets to remove spatio-temporal correlation.
         seed: Seed for the random state.
         angles: List of angles in degrees.
+        lazy: Compose each sequence on demand from the rendered offsets and the
+            resampling indices instead of storing the resampled and padded
+            sequences of all speeds.
+        cache_size: Number of recently used sequences to keep in lazy mode.
 
     Attributes:
         config (Namespace): Configuration parameters.
@@ -131,6 +136,11 @@ class MovingBar(StimulusDataset):
         device (str): Device for storing stimuli.
         shuffle_offsets (bool): Whether to shuffle offsets.
         randomstate (np.random.RandomState): Random state for shuffling.
+        lazy (bool): Whether sequences are composed on demand.
+        indices (Dict[float, torch.Tensor]): Frame indices into the rendered
+            offsets for each speed.
+        sequences (Dict[float, torch.Tensor]): Resampled and padded sequences
+            for each speed. Only stored if not lazy.
     """
 
     arg_df: pd.DataFrame = None
@@ -152,6 +162,8 @@ class MovingBar(StimulusDataset):
         shuffle_offsets: bool = False,
         seed: int = 0,
         angles: list[int] = [0, 30, 60, 90, 120, 150, 180, 210, 240, 270, 300, 330],
+        lazy: bool = True,
+        cache_size: int = 64,
     ) -> None:
         super().__init__()
         # HexEye parameter
@@ -235,6 +247,9 @@ class MovingBar(StimulusDataset):
 
         self._dt = dt
 
+        self.lazy = lazy
+        self._cache = LRUCache(maxsize=cache_size)
+
         self._built = False
         if build_stim_on_init:
             self._build()
@@ -305,47 +320,62 @@ class MovingBar(StimulusDataset):
         # storage.
         self.sequences = {}
         self.indices = {}
+        self._permutations = {}
+        self._cache.clear()
+        n_groups = len(self._offsets)
         for t, speed in zip(self.t_stim, self.speeds):
-            sequence, indices = resample(
-                self._offsets,
-                t,
-                self.dt,
-                dim=1,
-                device=self.device,
-                return_indices=True,
-            )
-            if self.shuffle_offsets:
-                # breakpoint()
-                sequence = shuffle(sequence, self.randomstate)
-            sequence = pad(
-                sequence,
-                t + self.t_pre,
-                self.dt,
-                mode="start",
-                fill=self.bg_intensity,
-            )
-            sequence = pad(
-                sequence,
-                t + self.t_pre + self.t_post,
-                self.dt,
-                mode="end",
-                pad_mode=self.post_pad_mode,
-                fill=self.bg_intensity,
-            )
-            # Because we fix the distance that the bar moves but vary speeds we
-            # have different stimulation times. To make all sequences equal
-            # length for storing them in a single tensor, we pad them with nans
-            # based on the maximal stimulation time (slowest speed). The nans
-            # can later be removed before processing the traces.
-            sequence = pad(
-                sequence,
-                self.t_stim_max + self.t_pre + self.t_post,
-                self.dt,
-                mode="end",
-                fill=np.nan,
-            )
-            self.sequences[speed] = sequence
+            indices = torch.linspace(
+                0, self._offsets.shape[1] - 1, int(t / self.dt), device=self.device
+            ).long()
             self.indices[speed] = indices
+            if self.shuffle_offsets:
+                # draws the same permutations as shuffling the resampled
+                # sequences of all groups
+                self._permutations[speed] = torch.tensor(
+                    np.array([
+                        self.randomstate.permutation(len(indices))
+                        for _ in range(n_groups)
+                    ]),
+                    device=self.device,
+                )
+            if not self.lazy:
+                self.sequences[speed] = torch.stack([
+                    self._compose(group, t, speed) for group in range(n_groups)
+                ])
+
+    def _compose(self, group: int, t_stim: float, speed: float) -> torch.Tensor:
+        """Compose the resampled and padded sequence of a group and speed."""
+        indices = self.indices[speed]
+        if self.shuffle_offsets:
+            indices = indices[self._permutations[speed][group]]
+        sequence = self._offsets[group].index_select(0, indices)
+        sequence = pad(
+            sequence,
+            t_stim + self.t_pre,
+            self.dt,
+            mode="start",
+            fill=self.bg_intensity,
+        )
+        sequence = pad(
+            sequence[None],
+            t_stim + self.t_pre + self.t_post,
+            self.dt,
+            mode="end",
+            pad_mode=self.post_pad_mode,
+            fill=self.bg_intensity,
+        )[0]
+        # Because we fix the distance that the bar moves but vary speeds we
+        # have different stimulation times. To make all sequences equal
+        # length for storing them in a single tensor, we pad them with nans
+        # based on the maximal stimulation time (slowest speed). The nans
+        # can later be removed before processing the traces.
+        return pad(
+            sequence,
+            self.t_stim_max + self.t_pre + self.t_post,
+            self.dt,
+            mode="end",
+            fill=np.nan,
+        )
 
     def _key(self, angle: float, width: float, intensity: float, speed: float) -> int:
         """Get the key for a specific stimulus configuration."""
@@ -375,7 +405,7 @@ class MovingBar(StimulusDataset):
     def _group_key(self, angle: float, width: float, intensity: float) -> int:
         """Get group key for a specific stimulus configuration."""
         return self.arg_group_df.query(
-            f"angle=={angle}" f" & width=={width}" f" & intensity == {intensity}"
+            f"angle=={angle} & width=={width} & intensity == {intensity}"
         ).index.values.item()
 
     def _group_params(self, key: int) -> np.ndarray:
@@ -391,8 +421,13 @@ class MovingBar(StimulusDataset):
 
     def get_item(self, key: int) -> torch.Tensor:
         """Get stimulus for a specific key."""
-        angle, width, intensity, _, speed = self._params(key)
-        return self.sequences[speed][self._group_key(angle, width, intensity)]
+        angle, width, intensity, t_stim, speed = self._params(key)
+        group = self._group_key(angle, width, intensity)
+        if not self.lazy:
+            return self.sequences[speed][group]
+        if key not in self._cache:
+            self._cache[key] = self._compose(group, t_stim, speed)
+        return self._cache[key]
 
     def mask(
         self,
@@ -653,6 +688,8 @@ class MovingEdge(MovingBar):
         shuffle_offsets: Shuffle the offsets to remove spatio-temporal correlation.
         seed: Seed for the random state.
         angles: List of angles in degrees.
+        lazy: Compose each sequence on demand.
+        cache_size: Number of recently used sequences to keep in lazy mode.
 
     Note:
         This class uses a very wide bar (width=80) under the hood to render an
@@ -674,6 +711,8 @@ class MovingEdge(MovingBar):
         shuffle_offsets: bool = False,
         seed: int = 0,
         angles: list[int] = [0, 30, 60, 90, 120, 150, 180, 210, 240, 270, 300, 330],
+        lazy: bool = True,
+        cache_size: int = 64,
         **kwargs,
     ) -> None:
         super().__init__(
@@ -692,6 +731,8 @@ class MovingEdge(MovingBar):
             shuffle_offsets=shuffle_offsets,
             seed=seed,
             angles=angles,
+            lazy=lazy,
+            cache_size=cache_size,
         )
 
 
@@ -1,3 +1,3 @@
 """Rendering module."""
 
-from .eye import BoxEye, HexEye
+from .eye import BoxEye, HexEye, HexEyeSamplingMap
@@ -8,6 +8,7 @@ import numpy as np
 import torch
 import torch.nn.functional as F
 import torchvision.transforms.functional as ttf
+from datamate import Directory, root
 from torch import nn
 
 import flyvis
@@ -21,7 +22,7 @@ from .utils import (
     render_gratings_cartesian,
 )
 
-__all__ = ["BoxEye", "HexEye"]
+__all__ = ["BoxEye", "HexEye", "HexEyeSamplingMap"]
 
 # ----- BoxEye -----------------------------------------------------------------
 
@@ -143,7 +144,7 @@ class BoxEye:
         elif ftype == "median":
             out = median(sequence, self.kernel_size)
         else:
-            raise ValueError("ftype must be 'sum', 'mean', or 'median." f"Is {ftype}.")
+            raise ValueError(f"ftype must be 'sum', 'mean', or 'median'. Is {ftype}.")
 
         if hex_sample is True:
             return self.hex_render(out).reshape(samples, frames, 1, -1)
@@ -222,6 +223,81 @@ class BoxEye:
 # ----- HexEye (slower, more precise) ----------------------------------------
 
 
+@root(flyvis.renderings_dir)
+class HexEyeSamplingMap(Directory):
+    """Sparse map of monitor pixels to the ommatidia of a HexEye.
+
+    Stores the pairs of pixel and ommatidium for all pixels inside the hexagon
+    of an ommatidium, sorted by ommatidium, so that frames are rendered by a
+    gather of the pixels and a sum over the pairs of each ommatidium instead of
+    a dense (n_pixels, n_ommatidia) mask. The map is computed once per eye
+    geometry and loaded from disk afterwards.
+
+    Args:
+        n_ommatidia: Number of ommatidia in the eye.
+        monitor_height_px: Monitor height in pixels.
+        monitor_width_px: Monitor width in pixels.
+        dtype: Name of the torch data type of the geometric computations.
+        device: Device of the geometric computations.
+
+    Attributes:
+        pixel_index (ArrayFile): Pixel index of each pair.
+        ommatidium_index (ArrayFile): Ommatidium index of each pair.
+    """
+
+    def __init__(
+        self,
+        n_ommatidia: int = 721,
+        monitor_height_px: int = 775,
+        monitor_width_px: int = 775,
+        dtype: str = "float16",
+        device: str = str(flyvis.device),
+    ):
+        dtype = getattr(torch, dtype)
+
+        x_hc, y_hc, (dist_w, dist_h) = hex_center_coordinates(
+            n_ommatidia, monitor_width_px, monitor_height_px
+        )
+
+        x_img, y_img = np.array(
+            list(
+                product(
+                    np.arange(monitor_width_px),
+                    np.arange(monitor_height_px),
+                )
+            )
+        ).T
+
+        dist_to_edge = (dist_w + dist_h) / 4
+
+        pixel_index, ommatidium_index = [], []
+        # chunks of pixels to bound the memory of the dense intermediate mask
+        for start in range(0, len(x_img), 2**16):
+            chunk = slice(start, start + 2**16)
+            _, is_inside = is_inside_hex(
+                torch.tensor(y_img[chunk], dtype=dtype, device=device),
+                torch.tensor(x_img[chunk], dtype=dtype, device=device),
+                torch.tensor(x_hc, dtype=dtype, device=device),
+                torch.tensor(y_hc, dtype=dtype, device=device),
+                torch.tensor(dist_to_edge, dtype=dtype, device=device),
+                torch.tensor(np.radians(0), dtype=dtype, device=device),
+                device=device,
+                dtype=dtype,
+            )
+            pixels, ommatidia = is_inside.nonzero(as_tuple=True)
+            pixel_index.append(pixels + start)
+            ommatidium_index.append(ommatidia)
+
+        pixel_index = torch.cat(pixel_index)
+        ommatidium_index = torch.cat(ommatidium_index)
+        order = torch.argsort(ommatidium_index, stable=True)
+        self.pixel_index = pixel_index[order].cpu().numpy()
+        self.ommatidium_index = ommatidium_index[order].cpu().numpy()
+        # Clean up excessive memory usage.
+        if device != "cpu":
+            torch.cuda.empty_cache()
+
+
 class HexEye:
     """Hexagonal eye model for more precise rendering.
 
@@ -237,7 +313,10 @@ class HexEye:
     Attributes:
         monitor_width_px (int): Monitor width in pixels.
         monitor_height_px (int): Monitor height in pixels.
-        is_inside (torch.Tensor): Boolean mask for pixels inside hexagons.
+        pixel_index (torch.Tensor): Pixel index of each pair of pixel and
+            ommatidium, for pixels inside the hexagon of the ommatidium.
+        ommatidium_index (torch.Tensor): Ommatidium index of each pair, sorted.
+        kernel_sum (torch.Tensor): Number of pixels of each ommatidium.
         n_ommatidia (int): Number of ommatidia in the eye.
         omm_width_rad (float): Ommatidium width in radians.
         omm_height_rad (float): Ommatidium height in radians.
@@ -264,35 +343,18 @@ class HexEye:
         self.monitor_width_px = monitor_width_px or ppo * int(n_hex_circfer)
         self.monitor_height_px = monitor_height_px or ppo * int(n_hex_circfer)
 
-        x_hc, y_hc, (dist_w, dist_h) = hex_center_coordinates(
-            n_ommatidia, self.monitor_width_px, self.monitor_height_px
+        sampling_map = HexEyeSamplingMap(
+            n_ommatidia=n_ommatidia,
+            monitor_height_px=self.monitor_height_px,
+            monitor_width_px=self.monitor_width_px,
+            dtype=str(dtype).split(".")[-1],
+            device=str(device),
         )
-
-        x_img, y_img = np.array(
-            list(
-                product(
-                    np.arange(self.monitor_width_px),
-                    np.arange(self.monitor_height_px),
-                )
-            )
-        ).T
-
-        dist_to_edge = (dist_w + dist_h) / 4
-
-        _, self.is_inside = is_inside_hex(
-            torch.tensor(y_img, dtype=dtype, device=device),
-            torch.tensor(x_img, dtype=dtype, device=device),
-            torch.tensor(x_hc, dtype=dtype, device=device),
-            torch.tensor(y_hc, dtype=dtype, device=device),
-            torch.tensor(dist_to_edge, dtype=dtype, device=device),
-            torch.tensor(np.radians(0), dtype=dtype, device=device),
-            device=device,
-            dtype=dtype,
+        self.pixel_index = torch.tensor(sampling_map.pixel_index[:], device=device)
+        self.ommatidium_index = torch.tensor(
+            sampling_map.ommatidium_index[:], device=device
         )
-        self.kernel_sum = self.is_inside.sum(dim=0)
-        # Clean up excessive memory usage.
-        if device != "cpu":
-            torch.cuda.empty_cache()
+        self.kernel_sum = torch.bincount(self.ommatidium_index, minlength=n_ommatidia)
         self.n_ommatidia = n_ommatidia
         self.omm_width_rad = np.radians(5.8)
         self.omm_height_rad = np.radians(5.8)
@@ -303,6 +365,25 @@ class HexEye:
         self.device = device
         self.dtype = dtype
 
+    @property
+    def is_inside(self) -> torch.Tensor:
+        """Dense boolean mask of shape (n_pixels, n_ommatidia) of pixels inside
+        hexagons."""
+        is_inside = torch.zeros(
+            self.monitor_width_px * self.monitor_height_px,
+            self.n_ommatidia,
+            dtype=torch.bool,
+            device=self.device,
+        )
+        is_inside[self.pixel_index, self.ommatidium_index] = True
+        return is_inside
+
+    def _sum_over_pixels(self, stim: torch.Tensor) -> torch.Tensor:
+        """Sum the pixels (n_frames, n_pixels) inside each hexagon."""
+        return stim.new_zeros(stim.shape[0], self.n_ommatidia).index_add_(
+            1, self.ommatidium_index, stim.index_select(1, self.pixel_index)
+        )
+
     def __call__(
         self,
         stim: torch.Tensor,
@@ -342,9 +423,9 @@ class HexEye:
                     int(np.sqrt(self.ppo)),
                 ).view(-1, n_pixels)
             elif mode == "sum":
-                return (stim[:, :, None] * self.is_inside).sum(dim=1)
+                return self._sum_over_pixels(stim)
             elif mode == "mean":
-                return (stim[:, :, None] * self.is_inside).sum(dim=1) / self.kernel_sum
+                return self._sum_over_pixels(stim) / self.kernel_sum
             else:
                 raise ValueError(f"Invalid mode: {mode}")
 
@@ -1,4 +1,6 @@
+import json
 import logging
+import os
 from contextlib import contextmanager
 from itertools import product
 from pathlib import Path
@@ -19,6 +21,7 @@ from .augmentation.hex import (
     HexFlip,
     HexRotate,
     PixelNoise,
+    flip_and_rotate,
 )
 from .augmentation.temporal import (
     CropFrames,
@@ -63,6 +66,10 @@ class RenderedSintel(Directory):
             Rendered flow data (frames, 2, hexals).
         sequence_<id>_<name>_split_<j>/depth (ArrayFile):
             Rendered depth data (frames, 1, hexals).
+        _consolidated/<key>.npy: All sequences of a key concatenated along the
+            frames, written on first call of `memmap`.
+        _consolidated/<key>_offsets.npy: Start frame of each sequence and the
+            total number of frames.
     """
 
     def __init__(
@@ -178,6 +185,85 @@ class RenderedSintel(Directory):
         data = self[sorted(self)[seq_id]]
         return {key: data[key][:] for key in sorted(data)}
 
+    def consolidate(self) -> Path:
+        """Stores all rendered sequences as one contiguous array per key.
+
+        Only done once, and again for keys whose rendered sequences changed since.
+        Consolidated arrays are private files and not listed as sequences of the
+        directory.
+
+        Returns:
+            Path to the directory of the consolidated arrays.
+        """
+        path = self.path / "_consolidated"
+        names = sorted(self)
+        keys = sorted(self[names[0]]) if names else []
+        stamps = {key: self._rendered_stamp(names, key) for key in keys}
+        keys = [key for key in keys if self._read_stamp(path, key) != stamps[key]]
+        if not keys:
+            return path
+        path.mkdir(exist_ok=True)
+        # unique temporary files and atomic renames allow concurrent processes
+        suffix = f".{os.getpid()}.tmp"
+        for key in tqdm(keys, desc="Consolidating"):
+            arrays = [self[name][key] for name in names]
+            offsets = np.cumsum([0, *(array.shape[0] for array in arrays)])
+            data = np.lib.format.open_memmap(
+                path / f"{key}{suffix}.npy",
+                mode="w+",
+                dtype=np.float32,
+                shape=(int(offsets[-1]), *arrays[0].shape[1:]),
+            )
+            for array, start, stop in zip(arrays, offsets[:-1], offsets[1:]):
+                data[start:stop] = array[:]
+            data.flush()
+            del data
+            os.replace(path / f"{key}{suffix}.npy", path / f"{key}.npy")
+            np.save(path / f"{key}_offsets{suffix}.npy", offsets)
+            os.replace(path / f"{key}_offsets{suffix}.npy", path / f"{key}_offsets.npy")
+            # written last, marks the consolidated arrays as complete
+            (path / f"{key}_stamp{suffix}").write_text(json.dumps(stamps[key]))
+            os.replace(path / f"{key}_stamp{suffix}", path / f"{key}_stamp.json")
+        return path
+
+    def _rendered_stamp(self, names: List[str], key: str) -> Dict[str, List]:
+        """Returns the names and modification times of the rendered sequences."""
+        return dict(
+            names=names,
+            mtimes=[
+                (self.path / name / f"{key}.h5").stat().st_mtime_ns for name in names
+            ],
+        )
+
+    @staticmethod
+    def _read_stamp(path: Path, key: str) -> Optional[Dict[str, List]]:
+        """Returns the stamp of the consolidated arrays of a key, if any."""
+        try:
+            return json.loads((path / f"{key}_stamp.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def memmap(self) -> List[Dict[str, np.ndarray]]:
+        """Returns memory-mapped views of all rendered sequences.
+
+        Processes mapping the same consolidated arrays share their pages. The
+        views are copy-on-write, i.e., in-place changes are private to a process
+        and never written to disk.
+
+        Returns:
+            List of dictionaries containing the rendered data of each sequence.
+        """
+        path = self.consolidate()
+        names = sorted(self)
+        keys = sorted(self[names[0]]) if names else []
+        sequences = [{} for _ in names]
+        for key in keys:
+            data = np.load(path / f"{key}.npy", mmap_mode="c")
+            offsets = np.load(path / f"{key}_offsets.npy")
+            for sequence, start, stop in zip(sequences, offsets[:-1], offsets[1:]):
+                sequence[key] = data[start:stop]
+        return sequences
+
 
 class MultiTaskSintel(MultiTaskDataset):
     """Sintel dataset.
@@ -207,6 +293,8 @@ class MultiTaskSintel(MultiTaskDataset):
         _init_cache: If True, caches the dataset in memory.
         unittest: If True, only renders a single sequence.
         flip_axes: List of axes to flip over.
+        batch_augmentation: If True, DataLoaders augment each batch at once
+            instead of each sample individually. See `apply_batch_augmentation`.
 
     Attributes:
         dt (float): Sampling and integration time constant.
@@ -249,6 +337,7 @@ class MultiTaskSintel(MultiTaskDataset):
         unittest: bool = False,
         flip_axes: List[int] = [0, 1],
         sintel_path: Optional[Union[str, Path]] = None,
+        batch_augmentation: bool = False,
     ):
         def check_tasks(tasks):
             invalid_tasks = [x for x in tasks if x not in self.valid_tasks]
@@ -283,6 +372,7 @@ class MultiTaskSintel(MultiTaskDataset):
         self.random_temporal_crop = random_temporal_crop
         self.flip_axes = flip_axes
         self.fix_augmentation_params = False
+        self.batch_augmentation = batch_augmentation
 
         self.init_augmentation()
         self._augmentations_are_initialized = True
@@ -345,14 +435,22 @@ class MultiTaskSintel(MultiTaskDataset):
             self.init_cache()
 
     def init_cache(self) -> None:
-        """Initialize the cache with preprocessed sequences."""
+        """Initialize the cache with memory-mapped sequences.
+
+        Note:
+            The sequences are zero-copy views of the consolidated rendering, so
+            that DataLoader workers and other processes share their memory.
+            They stay on the CPU, like the augmented samples, independent of
+            flyvis.device. Batches are moved to the device where they are used,
+            e.g., with `flyvis.utils.dataset_utils.batch_to_device`.
+        """
         self.cached_sequences = [
             {
-                key: torch.tensor(val, dtype=torch.float32)
-                for key, val in self.rendered(seq_id).items()
+                key: torch.from_numpy(val)
+                for key, val in sequence.items()
                 if key in self.data_keys
             }
-            for seq_id in range(len(self))
+            for sequence in self.rendered.memmap()
         ]
 
     def __repr__(self) -> str:
@@ -479,6 +577,25 @@ class MultiTaskSintel(MultiTaskDataset):
         """
         return self.apply_augmentation(self.cached_sequences[key])
 
+    def __getitems__(self, keys: List[int]) -> List[Dict[str, torch.Tensor]]:
+        """Return a batch of samples, called by DataLoaders.
+
+        Args:
+            keys: Indices of the samples to retrieve.
+
+        Returns:
+            List of dictionaries containing the augmented sample data.
+        """
+        if (
+            not self.batch_augmentation
+            or not self.temporal_crop.augment
+            or self.temporal_crop.all_frames
+        ):
+            # sequences of different lengths cannot be batched
+            return [self[key] for key in keys]
+        data = self.apply_batch_augmentation([self.cached_sequences[k] for k in keys])
+        return [dict(zip(data, values)) for values in zip(*data.values())]
+
     @contextmanager
     def augmentation(self, abool: bool):
         """Context manager to turn augmentation on or off in a code block.
@@ -604,6 +721,62 @@ class MultiTaskSintel(MultiTaskDataset):
             },
         }
 
+    def apply_batch_augmentation(
+        self, sequences: List[Dict[str, torch.Tensor]]
+    ) -> Dict[str, torch.Tensor]:
+        """Apply augmentation to a batch of samples at once.
+
+        Equivalent to `apply_augmentation` for each sample. Augmentation
+        parameters are sampled for each sample, then the temporally cropped
+        samples are transformed together. Flips and rotations are composed into a
+        single permutation and matrix per sample.
+
+        Args:
+            sequences: Dictionaries containing the sample data.
+
+        Returns:
+            Dictionary containing the augmented data of shape
+            (batch, frames, dims, hexals).
+        """
+        batch_size = len(sequences)
+        cropped, contrast, brightness, axes, n_rots = [], [], [], [], []
+        for sequence in sequences:
+            self.set_augmentation_params(total_sequence_length=sequence["lum"].shape[0])
+            cropped.append({
+                key: self.temporal_crop(sequence[key])
+                for key in ["lum", *self.tasks]
+                if key in ["lum", "flow", "depth"]
+            })
+            contrast.append(self.jitter.contrast_factor)
+            brightness.append(self.jitter.brightness_factor)
+            axes.append(self.flip.axis if self.flip.augment else 0)
+            n_rots.append(self.rotate.n_rot if self.rotate.augment else 0)
+        data = {key: torch.stack([c[key] for c in cropped]) for key in cropped[0]}
+        axes, n_rots = np.array(axes), np.array(n_rots)
+
+        def geometric(seq):
+            if axes.any() or n_rots.any():
+                return flip_and_rotate(seq, self.flip, self.rotate, axes, n_rots)
+            return seq
+
+        def resample(interpolate, seq):
+            # frames to the first dimension and samples to the hexals
+            seq = interpolate(seq.permute(1, 2, 0, 3).flatten(2))
+            return seq.unflatten(2, (batch_size, -1)).permute(2, 0, 1, 3)
+
+        # the contrast factors of all samples are None without contrast jitter
+        if contrast[0] is None:
+            contrast = brightness = None
+        lum = self.jitter(self.noise(data["lum"]), contrast, brightness)
+        data["lum"] = resample(self.piecewise_resample, geometric(lum))
+
+        for target in data.keys() - {"lum"}:
+            data[target] = resample(
+                self.linear_interpolate if self.interpolate else self.piecewise_resample,
+                geometric(data[target]),
+            )
+        return data
+
     def original_sequence_index(self, key: int) -> int:
         """Get the original sequence index from an index of the split.
 
@@ -1,8 +1,50 @@
-from .directories import *
-from .network import *
-from .network_view import *
-from .dynamics import *
-from .initialization import *
-from .ensemble_view import *
-from .ensemble import *
-from .stimulus import *
+from importlib import import_module
+
+# Public names by submodule. They are imported on first access so that, e.g.,
+# importing the Network does not import the ensemble analysis and plotting stack.
+_submodule_attrs = {
+    "directories": ("NetworkDir", "EnsembleDir"),
+    "network": ("Network",),
+    "network_view": ("NetworkView", "CheckpointedNetwork"),
+    "dynamics": ("NetworkDynamics", "PPNeuronIGRSynapses"),
+    "initialization": (
+        "Parameter",
+        "RestingPotential",
+        "TimeConstant",
+        "SynapseSign",
+        "SynapseCount",
+        "SynapseCountScaling",
+        "InitialDistribution",
+        "Value",
+        "Normal",
+        "Lognormal",
+    ),
+    "ensemble_view": ("EnsembleView",),
+    "ensemble": ("Ensemble",),
+    "stimulus": ("Stimulus", "CompactStimulus"),
+    "sparse": ("SynapticMatrix",),
+    "fixed_point": ("FixedPointResult", "anderson"),
+    "integrators": (
+        "ButcherTableau",
+        "integrators",
+        "register_integrator",
+        "rk_step",
+        "adaptive_rk_step",
+        "compare_integrators",
+    ),
+}
+
+__all__ = [name for names in _submodule_attrs.values() for name in names]
+
+
+def __getattr__(name):
+    for submodule, names in _submodule_attrs.items():
+        if name in names:
+            value = getattr(import_module(f"{__name__}.{submodule}"), name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
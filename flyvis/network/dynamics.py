@@ -32,6 +32,10 @@ class NetworkDynamics:
     - write_initial_state
     - write_state_velocity
 
+    Optionally, subclasses can implement `write_state_velocity_sparse` to support
+    the sparse integration backend of the Network, and `write_fixed_point_state`
+    to support the fixed-point steady-state solver of the Network.
+
     Attributes:
         activation (nn.Module): The activation function for the network.
 
@@ -119,6 +123,82 @@ class NetworkDynamics:
         """
         pass
 
+    def write_state_velocity_sparse(
+        self,
+        vel: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, RefTensor]],
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        synaptic_sum: Callable,
+        **kwargs,
+    ) -> None:
+        """
+        Compute dx/dt for each state variable with a fused synaptic sum.
+
+        Args:
+            vel: A directory containing two subdirectories: `nodes` and
+                `edges`. Write dx/dt for node and edge state variables
+                into them, respectively.
+            state: A directory containing two subdirectories: `nodes` and
+                `edges`, containing node and edge state variable values,
+                respectively.
+            params: A directory containing four subdirectories: `nodes`,
+                `edges`, `sources`, and `targets`.
+            synaptic_sum: Maps a `len(nodes)` tensor of presynaptic signals to the
+                sum over all incoming edges of each node, weighted by
+                `params.edges.weight`, yielding a `len(nodes)` tensor.
+            **kwargs: Additional keyword arguments.
+
+        Raises:
+            NotImplementedError: If the dynamics do not support the sparse backend.
+
+        Note:
+            Called by Network._next_state if the integration backend is `sparse`.
+            Must produce the same velocities as `write_state_velocity`.
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support the sparse backend."
+        )
+
+    def write_fixed_point_state(
+        self,
+        next_state: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, RefTensor]],
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        target_sum: Callable,
+        x_t: torch.Tensor,
+        **kwargs,
+    ) -> None:
+        """
+        Compute the state each state variable relaxes to for constant input.
+
+        The steady state is the fixed point of this map, i.e., the state for which
+        all velocities of `write_state_velocity` vanish.
+
+        Args:
+            next_state: A directory containing two subdirectories: `nodes` and
+                `edges`. Write the relaxed node and edge state variables into
+                them, respectively.
+            state: A directory containing two subdirectories: `nodes` and
+                `edges`, containing node and edge state variable values,
+                respectively.
+            params: A directory containing four subdirectories: `nodes`,
+                `edges`, `sources`, and `targets`.
+            target_sum: Sums the entries in a `len(edges)` tensor corresponding to
+                edges with the same target node, yielding a `len(nodes)` tensor.
+            x_t: External input.
+            **kwargs: Additional keyword arguments.
+
+        Raises:
+            NotImplementedError: If the dynamics do not support the fixed-point
+                solver.
+
+        Note:
+            Called by Network.fixed_point_state.
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support the fixed-point solver."
+        )
+
     def currents(
         self,
         state: AutoDeref[str, AutoDeref[str, RefTensor]],
@@ -217,6 +297,68 @@ class PPNeuronIGRSynapses(NetworkDynamics):
             )
         )
 
+    def write_state_velocity_sparse(
+        self,
+        vel: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, RefTensor]],
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        synaptic_sum: Callable,
+        x_t: torch.Tensor,
+        dt: float,
+        **kwargs,
+    ) -> None:
+        """
+        Calculate velocity as in `write_state_velocity` with a sparse synaptic sum.
+
+        Args:
+            vel: A directory to write the calculated velocity.
+            state: A directory containing current state values.
+            params: A directory containing node and edge parameters.
+            synaptic_sum: Function to sum weighted source node values for each
+                target node.
+            x_t: External input at time t.
+            dt: Time step.
+            **kwargs: Additional keyword arguments.
+        """
+        vel.nodes.activity = (
+            1
+            / torch.max(params.nodes.time_const, torch.tensor(dt).float())
+            * (
+                -state.nodes.activity
+                + params.nodes.bias
+                + synaptic_sum(
+                    self.activation(state.nodes.activity)
+                )  # internal chemical current
+                + x_t
+            )
+        )
+
+    def write_fixed_point_state(
+        self,
+        next_state: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, RefTensor]],
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        target_sum: Callable,
+        x_t: torch.Tensor,
+        **kwargs,
+    ) -> None:
+        """
+        Calculate the voltage at which the velocity vanishes for the current inputs.
+
+        Args:
+            next_state: A directory to write the relaxed state.
+            state: A directory containing current state values.
+            params: A directory containing node and edge parameters.
+            target_sum: Function to sum edge values for each target node.
+            x_t: External input.
+            **kwargs: Additional keyword arguments.
+        """
+        next_state.nodes.activity = (
+            params.nodes.bias
+            + target_sum(params.edges.weight * self.activation(state.sources.activity))
+            + x_t
+        )
+
     def currents(
         self,
         state: AutoDeref[str, AutoDeref[str, RefTensor]],
@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 import os
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from copy import deepcopy
 from dataclasses import dataclass
@@ -26,6 +27,8 @@ import numpy as np
 import torch
 import xarray as xr
 from cachetools import FIFOCache
+from datamate import Namespace
+from datamate import context as datamate_context
 from matplotlib import colormaps as cm
 from matplotlib.cm import ScalarMappable
 from matplotlib.colors import Colormap, Normalize
@@ -42,7 +45,7 @@ from flyvis.analysis.clustering import (
 )
 from flyvis.analysis.visualization import plots
 from flyvis.connectome import get_avgfilt_connectome
-from flyvis.utils.cache_utils import context_aware_cache
+from flyvis.utils.cache_utils import context_aware_cache, make_hashable
 from flyvis.utils.chkpt_utils import (
     best_checkpoint_default_fn,
     recover_network,
@@ -77,6 +80,10 @@ class Ensemble(dict):
         best_checkpoint_fn_kwargs: Kwargs for best_checkpoint_fn.
         recover_fn: Function to recover network.
         try_sort: Whether to try to sort the ensemble by validation error.
+        n_workers: Number of threads to scan the model directories with.
+        persist_index: Whether to store the scanned model directories in an index
+            file in the ensemble directory and reuse entries whose model
+            directories have not been modified since.
 
     Attributes:
         names (List[str]): List of model names.
@@ -100,6 +107,8 @@ class Ensemble(dict):
         ```python
         ensemble[0:2]
         ```
+        Networks are loaded on first access. Networks with the same connectome
+        configuration share one connectome view.
     """
 
     def __init__(
@@ -116,6 +125,8 @@ class Ensemble(dict):
         },
         recover_fn: Callable = recover_network,
         try_sort: bool = False,
+        n_workers: int = 8,
+        persist_index: bool = False,
     ):
         if isinstance(path, EnsembleDir):
             path = path.path
@@ -141,25 +152,22 @@ class Ensemble(dict):
 
         self._names = []
         self.model_index = []
-        # Initialize pointers to model directories.
-        for i, name in tqdm(
-            enumerate(self.names), desc="Loading ensemble", total=len(self.names)
-        ):
-            try:
-                with all_logging_disabled():
-                    self[name] = NetworkView(
-                        NetworkDir(self.model_paths[i]),
-                        network_class=network_class,
-                        root_dir=root_dir,
-                        connectome_getter=connectome_getter,
-                        checkpoint_mapper=checkpoint_mapper,
-                        best_checkpoint_fn=best_checkpoint_fn,
-                        best_checkpoint_fn_kwargs=best_checkpoint_fn_kwargs,
-                        recover_fn=recover_fn,
-                    )
-                    self._names.append(name)
-            except AttributeError as e:
-                logging.warning(f"Failed to load {name}: {e}")
+        self._view_kwargs = dict(
+            network_class=network_class,
+            root_dir=root_dir,
+            checkpoint_mapper=checkpoint_mapper,
+            best_checkpoint_fn=best_checkpoint_fn,
+            best_checkpoint_fn_kwargs=best_checkpoint_fn_kwargs,
+            recover_fn=recover_fn,
+        )
+        self._connectome_getter = connectome_getter
+        self._connectome_views = {}
+        # Scan model directories. NetworkViews are created on first access.
+        self._index = self._scan(n_workers, persist_index)
+        for name in self.names:
+            if name in self._index:
+                dict.__setitem__(self, name, None)
+                self._names.append(name)
         self._broken = list(set(self.names) - set(self._names))
         self.names = self._names
         self.model_index = np.arange(len(self.names))
@@ -178,6 +186,8 @@ class Ensemble(dict):
             best_checkpoint_fn_kwargs,
             recover_fn,
             try_sort,
+            n_workers,
+            persist_index,
         )
         self.connectome = self[next(iter(self))].connectome
         self.cache = FIFOCache(maxsize=3)
@@ -198,16 +208,123 @@ class Ensemble(dict):
             ValueError: If the key is invalid.
         """
         if isinstance(key, (int, np.integer)):
-            return dict.__getitem__(self, self.names[key])
+            return self._network_view(self.names[key])
         elif isinstance(key, slice):
             return self.__class__(self.names[key])
         elif isinstance(key, (np.ndarray, list)):
             return self.__class__(np.array(self.names)[key])
         elif key in self.names:
-            return dict.__getitem__(self, key)
+            return self._network_view(key)
         else:
             raise ValueError(f"{key}")
 
+    def _network_view(self, name: str) -> NetworkView:
+        """Return the NetworkView of a model, creating it on first access."""
+        network_view = dict.__getitem__(self, name)
+        if network_view is None:
+            entry = self._index[name]
+            key = make_hashable(entry["connectome"])
+            with all_logging_disabled():
+                if key not in self._connectome_views:
+                    self._connectome_views[key] = self._connectome_getter(
+                        Namespace(entry["connectome"])
+                    )
+                network_view = NetworkView(
+                    NetworkDir(entry["path"]),
+                    connectome_getter=self._connectome_getter,
+                    connectome_view=self._connectome_views[key],
+                    checkpoints=entry["checkpoints"],
+                    best_checkpoint=entry["best_checkpoint"],
+                    **self._view_kwargs,
+                )
+            dict.__setitem__(self, name, network_view)
+        return network_view
+
+    def _scan(self, n_workers: int, persist_index: bool) -> Dict[str, dict]:
+        """Scan the model directories in parallel.
+
+        Args:
+            n_workers: Number of threads.
+            persist_index: Whether to reuse and update the index file.
+
+        Returns:
+            Dictionary of index entries by model name. Models that fail to load are
+            skipped.
+
+        Note:
+            Index entries are reused if the modification time of the model
+            directory, its checkpoint directory, and the files in its validation
+            directory are unchanged.
+        """
+        kwargs = self._view_kwargs
+        index_path = self.path / "_index.pkl"
+        # Entries are only valid for the same functions to resolve checkpoints.
+        index_key = (
+            _qualname(kwargs["checkpoint_mapper"]),
+            _qualname(kwargs["best_checkpoint_fn"]),
+            make_hashable(kwargs["best_checkpoint_fn_kwargs"]),
+        )
+        validation_subdir = kwargs["best_checkpoint_fn_kwargs"].get(
+            "validation_subdir", "validation"
+        )
+
+        index = {}
+        if persist_index and index_path.exists():
+            with open(index_path, "rb") as f:
+                stored = pickle.load(f)
+            if stored["key"] == index_key:
+                index = stored["models"]
+
+        def scan(name, path):
+            mtime = _model_mtime(path, validation_subdir)
+            entry = index.get(name)
+            if entry is not None and entry["path"] == path and entry["mtime"] == mtime:
+                return entry
+            try:
+                return _scan_model(
+                    path,
+                    mtime,
+                    kwargs["checkpoint_mapper"],
+                    kwargs["best_checkpoint_fn"],
+                    kwargs["best_checkpoint_fn_kwargs"],
+                )
+            except AttributeError as e:
+                return e
+
+        # Workers inherit the datamate context, e.g., the root directory.
+        pool = ThreadPoolExecutor(
+            max(n_workers, 1),
+            initializer=_set_datamate_context,
+            initargs=(vars(datamate_context.context).copy(),),
+        )
+        with all_logging_disabled(), pool:
+            entries = list(
+                tqdm(
+                    pool.map(scan, self.names, self.model_paths),
+                    desc="Loading ensemble",
+                    total=len(self.names),
+                )
+            )
+
+        updated = {}
+        for name, entry in zip(self.names, entries):
+            if isinstance(entry, Exception):
+                logging.warning(f"Failed to load {name}: {entry}")
+            else:
+                updated[name] = entry
+
+        if persist_index and any(
+            entry is not index.get(name) for name, entry in updated.items()
+        ):
+            index.update(updated)
+            # Write to a temporary file first to not corrupt the index for
+            # concurrent readers.
+            tmp_path = index_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(dict(key=index_key, models=index), f)
+            os.replace(tmp_path, index_path)
+        return updated
+
     def __repr__(self) -> str:
         """Return a string representation of the Ensemble."""
         return f"{self.__class__.__name__}({self.path})"
@@ -284,8 +401,51 @@ class Ensemble(dict):
         for network_view in self.values():
             yield network_view.init_decoder(decoder=decoder)
 
+    def _state_dicts(self) -> Tuple[Network, List[Dict[str, torch.Tensor]]]:
+        """Return the shared network instance and the state dicts of all networks.
+
+        Returns:
+            Tuple of the network holding the parameters of the last model and the
+            state dicts of all models.
+        """
+        network = None
+        state_dicts = []
+        for network in self.yield_networks():
+            state_dicts.append({
+                key: value.detach().clone() for key, value in network.state_dict().items()
+            })
+        return network, state_dicts
+
+    @contextmanager
+    def vectorized_network(self) -> Generator[Network, None, None]:
+        """Context manager yielding one network that integrates all models at once.
+
+        The parameters of all models are stacked along a leading model dimension
+        (see `Network.stacked_parameters`), so that the networks, which share the
+        connectome, are simulated in one vectorized pass instead of one after the
+        other. Responses gain a leading model dimension.
+
+        Yields:
+            Network: Network with stacked parameters of all models.
+
+        Example:
+            ```python
+            with ensemble.vectorized_network() as network:
+                responses = network.simulate(movie_input, dt)
+                # responses.shape == (n_models, batch_size, n_frames, n_nodes)
+            ```
+        """
+        assert self.check_configs_match(), "configurations do not match"
+        network, state_dicts = self._state_dicts()
+        with network.stacked_parameters(state_dicts):
+            yield network
+
     def simulate(
-        self, movie_input: torch.Tensor, dt: float, fade_in: bool = True
+        self,
+        movie_input: torch.Tensor,
+        dt: float,
+        fade_in: bool = True,
+        vectorized: bool = False,
     ) -> Generator[np.ndarray, None, None]:
         """Simulate the ensemble activity from movie input.
 
@@ -295,14 +455,35 @@ class Ensemble(dict):
             fade_in: Whether to use `network.fade_in_state` to compute the initial
                 state. Defaults to True. If False, uses the
                 `network.steady_state` after 1s of grey input.
+            vectorized: Whether to simulate all networks at once in one vectorized
+                pass (see `vectorized_network`). Defaults to False.
 
         Yields:
             np.ndarray: Response of each individual network.
 
         Note:
             Simulates across batch_size in parallel, which can easily lead to OOM for
-            large batch sizes.
+            large batch sizes. With `vectorized`, the responses of all networks are
+            held in memory at once.
         """
+        if vectorized:
+            with self.vectorized_network() as network:
+                responses = (
+                    network.simulate(
+                        movie_input,
+                        dt,
+                        initial_state=(
+                            network.fade_in_state(1.0, dt, movie_input[:, 0])
+                            if fade_in
+                            else "auto"
+                        ),
+                    )
+                    .cpu()
+                    .numpy()
+                )
+            yield from responses
+            return
+
         for network in tqdm(
             self.yield_networks(),
             desc="Simulating network",
@@ -322,6 +503,61 @@ class Ensemble(dict):
                 .numpy()
             )
 
+    def simulate_chunks(
+        self,
+        movie_chunks: Iterable[torch.Tensor],
+        dt: float,
+        fade_in: bool = True,
+        cell_types: Optional[Iterable[str]] = None,
+        central_cells_only: bool = False,
+    ) -> Generator[np.ndarray, None, None]:
+        """Simulate the ensemble activity from a stream of movie chunks.
+
+        The state of each network is carried over across chunk boundaries, so that
+        arbitrarily long recordings or live stimulus feeds can be processed with
+        bounded memory. Each chunk is consumed once and simulated with all
+        networks.
+
+        Args:
+            movie_chunks: Iterable of tensors of shape
+                (batch_size, n_frames_chunk, 1, hexals).
+            dt: Integration time constant.
+            fade_in: Whether to use `network.fade_in_state` on the first frame of
+                the first chunk to compute the initial state. Defaults to True. If
+                False, uses the `network.steady_state` after 1s of grey input.
+            cell_types: Optional cell types to reduce the responses to.
+            central_cells_only: If True, reduce the responses to the central cell
+                of each (selected) cell type.
+
+        Yields:
+            np.ndarray: Responses of all networks for each chunk, of shape
+                (n_networks, batch_size, n_frames_chunk, #selected neurons).
+        """
+        # keep the parameters of all networks in memory to switch between them
+        # for each chunk without reloading checkpoints
+        network, state_dicts = self._state_dicts()
+
+        index = network._response_index(cell_types, central_cells_only)
+        states = [None] * len(state_dicts)
+
+        for i, movie_input in enumerate(movie_chunks):
+            if len(movie_input.shape) != 4:
+                raise ValueError("requires shape (sample, frame, 1, hexals)")
+            responses = []
+            for j, state_dict in enumerate(state_dicts):
+                network.load_state_dict(state_dict)
+                if i == 0:
+                    states[j] = (
+                        network.fade_in_state(1.0, dt, movie_input[:, 0])
+                        if fade_in
+                        else network.steady_state(1.0, dt, movie_input.shape[0])
+                    )
+                response, states[j] = network._simulate_chunk(movie_input, dt, states[j])
+                if index is not None:
+                    response = response[:, :, index]
+                responses.append(response.cpu().numpy())
+            yield np.stack(responses)
+
     def simulate_from_dataset(
         self,
         dataset,
@@ -332,6 +568,7 @@ class Ensemble(dict):
         default_stim_key: str = "lum",
         batch_size: int = 1,
         central_cell_only: bool = True,
+        vectorized: bool = False,
     ) -> Generator[np.ndarray, None, None]:
         """Simulate the ensemble activity from a dataset.
 
@@ -344,6 +581,8 @@ class Ensemble(dict):
             default_stim_key: Default stimulus key. Defaults to "lum".
             batch_size: Batch size for simulation. Defaults to 1.
             central_cell_only: Whether to return only central cells. Defaults to True.
+            vectorized: Whether to simulate all networks at once in one vectorized
+                pass (see `vectorized_network`). Defaults to False.
 
         Yields:
             np.ndarray: Simulated responses for each network.
@@ -351,27 +590,33 @@ class Ensemble(dict):
         if central_cell_only:
             central_cells_index = self[0].connectome.central_cells_index[:]
 
+        def handle_network(network: Network):
+            for _, resp in network.stimulus_response(
+                dataset,
+                dt=dt,
+                indices=indices,
+                t_pre=t_pre,
+                t_fade_in=t_fade_in,
+                default_stim_key=default_stim_key,
+                batch_size=batch_size,
+            ):
+                if central_cell_only:
+                    yield resp[..., central_cells_index]
+                else:
+                    yield resp
+
+        if vectorized:
+            with self.vectorized_network() as network:
+                # (n_models, n_samples, n_frames, n_cells)
+                responses = np.concatenate(list(handle_network(network)), axis=1)
+            yield from responses
+            return
+
         progress_bar = tqdm(desc="Simulating network", total=len(self.names))
 
         for network in self.yield_networks():
-
-            def handle_network(network: Network):
-                for _, resp in network.stimulus_response(
-                    dataset,
-                    dt=dt,
-                    indices=indices,
-                    t_pre=t_pre,
-                    t_fade_in=t_fade_in,
-                    default_stim_key=default_stim_key,
-                    batch_size=batch_size,
-                ):
-                    if central_cell_only:
-                        yield resp[:, :, central_cells_index]
-                    else:
-                        yield resp
-
-            r = np.stack(list(handle_network(network)))
-            yield r.reshape(-1, r.shape[-2], r.shape[-1])
+            # (n_samples, n_frames, n_cells)
+            yield np.concatenate(list(handle_network(network)))
 
             progress_bar.update(1)
         progress_bar.close()
@@ -478,7 +723,7 @@ class Ensemble(dict):
         """
         return len(self) - self.argsort(validation_subdir, loss_file_name).argsort()
 
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def validation_losses(
         self, subdir: Optional[str] = None, file: Optional[str] = None
     ) -> np.ndarray:
@@ -726,43 +971,43 @@ class Ensemble(dict):
         return parameter_keys
 
     @wraps(stimulus_responses.flash_responses)
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def flash_responses(self, *args, **kwargs) -> xr.Dataset:
         """Generate flash responses."""
         return stimulus_responses.flash_responses(self, *args, **kwargs)
 
     @wraps(stimulus_responses.moving_edge_responses)
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def moving_edge_responses(self, *args, **kwargs) -> xr.Dataset:
         """Generate moving edge responses."""
         return stimulus_responses.moving_edge_responses(self, *args, **kwargs)
 
     @wraps(stimulus_responses.moving_bar_responses)
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def moving_bar_responses(self, *args, **kwargs) -> xr.Dataset:
         """Generate moving bar responses."""
         return stimulus_responses.moving_bar_responses(self, *args, **kwargs)
 
     @wraps(stimulus_responses.naturalistic_stimuli_responses)
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def naturalistic_stimuli_responses(self, *args, **kwargs) -> xr.Dataset:
         """Generate naturalistic stimuli responses."""
         return stimulus_responses.naturalistic_stimuli_responses(self, *args, **kwargs)
 
     @wraps(stimulus_responses.central_impulses_responses)
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def central_impulses_responses(self, *args, **kwargs) -> xr.Dataset:
         """Generate central ommatidium impulses responses."""
         return stimulus_responses.central_impulses_responses(self, *args, **kwargs)
 
     @wraps(stimulus_responses.spatial_impulses_responses)
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def spatial_impulses_responses(self, *args, **kwargs) -> xr.Dataset:
         """Generate spatial ommatidium impulses responses."""
         return stimulus_responses.spatial_impulses_responses(self, *args, **kwargs)
 
     @wraps(stimulus_responses_currents.moving_edge_currents)
-    @context_aware_cache(context=lambda self: (self.names))
+    @context_aware_cache(context=lambda self: self.names)
     def moving_edge_currents(
         self, *args, **kwargs
     ) -> List[stimulus_responses_currents.ExperimentData]:
@@ -871,6 +1116,58 @@ class Ensemble(dict):
         )
 
 
+def _qualname(fn: Callable) -> str:
+    """Return the qualified name of a function."""
+    return f"{fn.__module__}.{fn.__qualname__}"
+
+
+def _set_datamate_context(state: dict) -> None:
+    """Set the thread-local datamate context, e.g., of a worker thread."""
+    vars(datamate_context.context).update(state)
+
+
+def _model_mtime(path: Path, validation_subdir: str) -> float:
+    """Return the last modification time of the checkpoints and validation files."""
+    paths = [path, path / "chkpts", *(path / validation_subdir).glob("*")]
+    return max(p.stat().st_mtime for p in paths if p.exists())
+
+
+def _scan_model(
+    path: Path,
+    mtime: float,
+    checkpoint_mapper: Callable,
+    best_checkpoint_fn: Callable,
+    best_checkpoint_fn_kwargs: dict,
+) -> dict:
+    """Resolve the connectome configuration and checkpoints of a model directory.
+
+    Args:
+        path: Path to the model directory.
+        mtime: Last modification time of the model directory.
+        checkpoint_mapper: Function to map checkpoints.
+        best_checkpoint_fn: Function to determine best checkpoint.
+        best_checkpoint_fn_kwargs: Kwargs for best_checkpoint_fn.
+
+    Returns:
+        Index entry of the model.
+    """
+    network_dir = NetworkDir(path)
+    connectome = network_dir.config.network.connectome.to_dict()
+    checkpoints = checkpoint_mapper(network_dir)
+    try:
+        best_checkpoint = best_checkpoint_fn(path, **best_checkpoint_fn_kwargs)
+    except Exception:
+        # Defer to NetworkView.get_checkpoint which handles missing checkpoints.
+        best_checkpoint = None
+    return dict(
+        path=path,
+        mtime=mtime,
+        connectome=connectome,
+        checkpoints=checkpoints,
+        best_checkpoint=best_checkpoint,
+    )
+
+
 def model_path_names(model_paths: List[Path]) -> Tuple[List[str], str]:
     """Return a list of model names and an ensemble name from a list of model paths.
 
@@ -50,6 +50,8 @@ class EnsembleView(Ensemble):
         best_checkpoint_fn_kwargs: Keyword arguments for best_checkpoint_fn.
         recover_fn: Function to recover the network.
         try_sort: Whether to try sorting the ensemble.
+        n_workers: Number of threads to scan the model directories with.
+        persist_index: Whether to store and reuse an index of the model directories.
 
     Attributes:
         Inherits all attributes from the Ensemble class.
@@ -69,6 +71,8 @@ class EnsembleView(Ensemble):
         },
         recover_fn: Callable = recover_network,
         try_sort: bool = False,
+        n_workers: int = 8,
+        persist_index: bool = False,
     ):
         init_args = (
             path,
@@ -80,6 +84,8 @@ class EnsembleView(Ensemble):
             best_checkpoint_fn_kwargs,
             recover_fn,
             try_sort,
+            n_workers,
+            persist_index,
         )
         if isinstance(path, Ensemble):
             init_args = path._init_args
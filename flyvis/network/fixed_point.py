@@ -0,0 +1,95 @@
+"""Fixed-point solvers for steady states of the network dynamics."""
+
+from dataclasses import dataclass
+from typing import Callable
+
+import torch
+from torch import Tensor
+
+__all__ = ["FixedPointResult", "anderson"]
+
+
+@dataclass
+class FixedPointResult:
+    """Result of a fixed-point iteration.
+
+    Attributes:
+        x: Approximate fixed point. Shape is (batch_size, n).
+        residual: Maximum absolute residual |f(x) - x| of each sample.
+            Shape is (batch_size).
+        n_iter: Number of evaluations of f.
+        converged: Whether the residual of all samples is below the tolerance.
+    """
+
+    x: Tensor
+    residual: Tensor
+    n_iter: int
+    converged: bool
+
+
+def anderson(
+    f: Callable[[Tensor], Tensor],
+    x0: Tensor,
+    tol: float = 1e-5,
+    max_iter: int = 100,
+    history: int = 5,
+    regularization: float = 1e-8,
+) -> FixedPointResult:
+    """Anderson-accelerated fixed-point iteration x = f(x).
+
+    Each iterate is the combination of the last `history` evaluations of f that
+    minimizes the norm of the combined residuals f(x) - x, which converges in far
+    fewer iterations than the plain iteration x <- f(x).
+
+    Args:
+        f: Map of shape (batch_size, n) to (batch_size, n).
+        x0: Initial guess. Shape is (batch_size, n).
+        tol: Tolerance of the maximum absolute residual.
+        max_iter: Maximum number of evaluations of f.
+        history: Number of previous iterates to combine.
+        regularization: Tikhonov regularization of the least-squares problem.
+
+    Returns:
+        Fixed-point result with the iterate of smallest residual.
+    """
+    batch_size, n = x0.shape
+    history = max(1, min(history, max_iter))
+    X = x0.new_zeros(batch_size, history, n)
+    F = x0.new_zeros(batch_size, history, n)
+
+    x, fx = x0, f(x0)
+    best_x, best_residual = x, (fx - x).abs().amax(dim=-1)
+    n_iter = 1
+
+    # bordered system of the constrained least-squares problem
+    # min_alpha |G alpha| s.t. sum(alpha) = 1
+    H = x0.new_zeros(batch_size, history + 1, history + 1)
+    H[:, 0, 1:] = H[:, 1:, 0] = 1
+    y = x0.new_zeros(batch_size, history + 1, 1)
+    y[:, 0] = 1
+
+    for k in range(max_iter - 1):
+        if best_residual.max() < tol:
+            break
+        X[:, k % history], F[:, k % history] = x, fx
+        m = min(k + 1, history)
+        G = F[:, :m] - X[:, :m]
+        H[:, 1 : m + 1, 1 : m + 1] = G @ G.transpose(1, 2) + regularization * torch.eye(
+            m, dtype=x0.dtype, device=x0.device
+        )
+        alpha = torch.linalg.solve(H[:, : m + 1, : m + 1], y[:, : m + 1])[:, 1:, 0]
+        x = (alpha[:, None] @ F[:, :m])[:, 0]
+        fx = f(x)
+        n_iter += 1
+
+        residual = (fx - x).abs().amax(dim=-1)
+        improved = residual < best_residual
+        best_x = torch.where(improved[:, None], x, best_x)
+        best_residual = torch.where(improved, residual, best_residual)
+
+    return FixedPointResult(
+        x=best_x,
+        residual=best_residual,
+        n_iter=n_iter,
+        converged=bool(best_residual.max() < tol),
+    )
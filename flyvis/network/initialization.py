@@ -7,15 +7,19 @@ types.
 """
 
 import functools
+import hashlib
 import logging
+import os
+from contextlib import suppress
 from copy import deepcopy
-from typing import Any, Dict, Iterable, List
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
 
 import numpy as np
 import pandas as pd
 import torch
 import torch.nn as nn
-from datamate import Namespace
+from datamate import Directory, Namespace
 from torch import Tensor
 
 from flyvis import device
@@ -250,7 +254,8 @@ class Parameter:
            matching the desired `InitialDistribution`.
         4. Store `parameter` from `InitialDistribution(param_config)`, which constructs
            and holds the `nn.Parameter`.
-        5. Store `indices` for parameter sharing using
+        5. Store `indices` for parameter sharing, e.g. from
+           `scatter_groups(table, groupby)` or
            `get_scatter_indices(dataframe, grouped_dataframe, groupby)`.
         6. Store `keys` to access individual parameter values associated with certain
            identifiers.
@@ -269,7 +274,8 @@ class Parameter:
             self.parameter = InitialDistribution(param_config)
 
             # Set up indices, keys, and symmetry masks
-            self.indices = get_scatter_indices(...)
+            first, indices = scatter_groups(...)
+            self.indices = torch.tensor(indices)
             self.keys = ...
             self.symmetry_masks = symmetry_masks(...)
         ```
@@ -339,21 +345,19 @@ class RestingPotential(Parameter):
     def __init__(self, param_config: Namespace, connectome: ConnectomeFromAvgFilters):
         nodes_dir = connectome.nodes
 
-        nodes = pd.DataFrame({
-            k: byte_to_str(nodes_dir[k][:]) for k in param_config.groupby
-        })
-        grouped_nodes = nodes.groupby(
-            param_config.groupby, as_index=False, sort=False
-        ).first()
+        first, indices = scatter_groups(nodes_dir, param_config.groupby)
+        grouped_nodes = {
+            k: byte_to_str(nodes_dir[k][:][first]) for k in param_config.groupby
+        }
 
-        param_config["type"] = grouped_nodes["type"].values
-        param_config["mean"] = np.repeat(param_config["mean"], len(grouped_nodes))
-        param_config["std"] = np.repeat(param_config["std"], len(grouped_nodes))
+        param_config["type"] = grouped_nodes["type"]
+        param_config["mean"] = np.repeat(param_config["mean"], len(first))
+        param_config["std"] = np.repeat(param_config["std"], len(first))
 
         self.parameter = forward_subclass(
             InitialDistribution, param_config, subclass_key="initial_dist"
         )
-        self.indices = get_scatter_indices(nodes, grouped_nodes, param_config.groupby)
+        self.indices = torch.tensor(indices)
         self.keys = param_config["type"].tolist()
         self.symmetry_masks = symmetry_masks(param_config.get("symmetric", []), self.keys)
 
@@ -365,17 +369,15 @@ class TimeConstant(Parameter):
     def __init__(self, param_config: Namespace, connectome: ConnectomeFromAvgFilters):
         nodes_dir = connectome.nodes
 
-        nodes = pd.DataFrame({
-            k: byte_to_str(nodes_dir[k][:]) for k in param_config.groupby
-        })
-        grouped_nodes = nodes.groupby(
-            param_config.groupby, as_index=False, sort=False
-        ).first()
+        first, indices = scatter_groups(nodes_dir, param_config.groupby)
+        grouped_nodes = {
+            k: byte_to_str(nodes_dir[k][:][first]) for k in param_config.groupby
+        }
 
-        param_config["type"] = grouped_nodes["type"].values
-        param_config["value"] = np.repeat(param_config["value"], len(grouped_nodes))
+        param_config["type"] = grouped_nodes["type"]
+        param_config["value"] = np.repeat(param_config["value"], len(first))
 
-        self.indices = get_scatter_indices(nodes, grouped_nodes, param_config.groupby)
+        self.indices = torch.tensor(indices)
         self.parameter = forward_subclass(
             InitialDistribution, param_config, subclass_key="initial_dist"
         )
@@ -395,18 +397,16 @@ class SynapseSign(Parameter):
     ) -> None:
         edges_dir = connectome.edges
 
-        edges = pd.DataFrame({
-            k: byte_to_str(edges_dir[k][:]) for k in [*param_config.groupby, "sign"]
-        })
-        grouped_edges = edges.groupby(
-            param_config.groupby, as_index=False, sort=False
-        ).first()
+        first, indices = scatter_groups(edges_dir, param_config.groupby)
+        grouped_edges = {
+            k: byte_to_str(edges_dir[k][:][first]) for k in param_config.groupby
+        }
 
-        param_config.source_type = grouped_edges.source_type.values
-        param_config.target_type = grouped_edges.target_type.values
-        param_config.value = grouped_edges.sign.values
+        param_config.source_type = grouped_edges["source_type"]
+        param_config.target_type = grouped_edges["target_type"]
+        param_config.value = edges_dir.sign[:][first]
 
-        self.indices = get_scatter_indices(edges, grouped_edges, param_config.groupby)
+        self.indices = torch.tensor(indices)
         self.parameter = forward_subclass(
             InitialDistribution, param_config, subclass_key="initial_dist"
         )
@@ -435,22 +435,21 @@ class SynapseCount(Parameter):
 
         edges_dir = connectome.edges
 
-        edges = pd.DataFrame({
-            k: byte_to_str(edges_dir[k][:]) for k in [*param_config.groupby, "n_syn"]
-        })
-        grouped_edges = edges.groupby(
-            param_config.groupby, as_index=False, sort=False
-        ).mean()
+        first, indices = scatter_groups(edges_dir, param_config.groupby)
+        grouped_edges = {
+            k: byte_to_str(edges_dir[k][:][first]) for k in param_config.groupby
+        }
+        n_syn = group_mean(edges_dir.n_syn[:], indices)
 
-        param_config.source_type = grouped_edges.source_type.values
-        param_config.target_type = grouped_edges.target_type.values
-        param_config.du = grouped_edges.du.values
-        param_config.dv = grouped_edges.dv.values
+        param_config.source_type = grouped_edges["source_type"]
+        param_config.target_type = grouped_edges["target_type"]
+        param_config.du = grouped_edges["du"]
+        param_config.dv = grouped_edges["dv"]
 
         param_config.mode = "mean"
-        param_config.mean = np.log(grouped_edges.n_syn.values)
+        param_config.mean = np.log(n_syn)
 
-        self.indices = get_scatter_indices(edges, grouped_edges, param_config.groupby)
+        self.indices = torch.tensor(indices)
         self.parameter = forward_subclass(
             InitialDistribution, param_config, subclass_key="initial_dist"
         )
@@ -490,21 +489,20 @@ class SynapseCountScaling(Parameter):
     ) -> None:
         edges_dir = connectome.edges
 
-        edges = pd.DataFrame({
-            k: byte_to_str(edges_dir[k][:]) for k in [*param_config.groupby, "n_syn"]
-        })
-        grouped_edges = edges.groupby(
-            param_config.groupby, as_index=False, sort=False
-        ).mean()
+        first, indices = scatter_groups(edges_dir, param_config.groupby)
+        grouped_edges = {
+            k: byte_to_str(edges_dir[k][:][first]) for k in param_config.groupby
+        }
+        n_syn = group_mean(edges_dir.n_syn[:], indices)
 
         # to initialize synapse strengths with scale/<N>_rf
-        syn_strength = param_config.get("scale", 0.01) / grouped_edges.n_syn.values
+        syn_strength = param_config.get("scale", 0.01) / n_syn
 
-        param_config.target_type = grouped_edges.target_type.values
-        param_config.source_type = grouped_edges.source_type.values
+        param_config.target_type = grouped_edges["target_type"]
+        param_config.source_type = grouped_edges["source_type"]
         param_config.value = syn_strength
 
-        self.indices = get_scatter_indices(edges, grouped_edges, param_config.groupby)
+        self.indices = torch.tensor(indices)
         self.parameter = forward_subclass(
             InitialDistribution, param_config, subclass_key="initial_dist"
         )
@@ -548,10 +546,112 @@ def get_scatter_indices(
         scattered_parameters == [1, 1, 1, 2, 2, 3, 4, 4, 5]
         ```
     """
-    ungrouped_elements = zip(*[dataframe[k][:] for k in groupby])
-    grouped_elements = zip(*[grouped_dataframe[k][:] for k in groupby])
-    to_index = {k: i for i, k in enumerate(grouped_elements)}
-    return torch.tensor([to_index[k] for k in ungrouped_elements])
+    n_groups = len(grouped_dataframe)
+    # The grouped rows come first and are unique, so they are groups 0..M-1.
+    _, indices = factorize_rows(
+        {
+            k: np.concatenate([
+                np.asarray(grouped_dataframe[k][:]),
+                np.asarray(dataframe[k][:]),
+            ])
+            for k in groupby
+        },
+        groupby,
+    )
+    indices = indices[n_groups:]
+    if (indices >= n_groups).any():
+        raise KeyError("dataframe contains elements that are not in grouped_dataframe")
+    return torch.tensor(indices)
+
+
+def factorize_rows(
+    columns: Dict[str, np.ndarray], groupby: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Group rows by the values of the `groupby` columns.
+
+    Each column is factorized into integer codes, which are combined into a single
+    integer key per row. Groups are numbered in order of first appearance, like
+    `pd.DataFrame.groupby(groupby, sort=False)`.
+
+    Args:
+        columns: Mapping from column names to arrays of equal length.
+        groupby: Names of the columns to group by.
+
+    Returns:
+        A tuple containing:
+            first: Index of the first row of each group.
+            indices: Group index of each row.
+    """
+    codes, n_codes = [], []
+    for k in groupby:
+        uniques, code = np.unique(columns[k], return_inverse=True)
+        codes.append(code.ravel())
+        n_codes.append(len(uniques))
+    keys = np.ravel_multi_index(codes, n_codes)
+    _, first, indices = np.unique(keys, return_index=True, return_inverse=True)
+
+    # Renumber the sorted groups by first appearance.
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[indices.ravel()]
+
+
+def scatter_groups(table: Directory, groupby: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Group the rows of a node or edge table, cached in the table directory.
+
+    Args:
+        table: Node or edge table of the connectome.
+        groupby: Names of the columns to group by.
+
+    Returns:
+        First row and group index of each row, see `factorize_rows`.
+
+    Note:
+        The groups are stored in a private subdirectory of the table and reused by
+        every network constructed from the same connectome. The cache key hashes
+        the names and contents of the grouped columns, so that groups of a
+        rewritten table are not reused.
+    """
+    columns = {k: np.asarray(table[k][:]) for k in groupby}
+    path = getattr(table, "path", None)
+    if path is not None:
+        key = hashlib.sha1(repr(list(groupby)).encode())
+        for column in columns.values():
+            key.update(f"{column.dtype.str}{column.shape}".encode())
+            key.update(np.ascontiguousarray(column).tobytes())
+        path = Path(path) / "_scatter_groups" / f"{key.hexdigest()}.npz"
+        with suppress(OSError, ValueError, KeyError), np.load(path) as groups:
+            return groups["first"], groups["indices"]
+
+    first, indices = factorize_rows(columns, groupby)
+
+    if path is not None:
+        # read-only connectome directories are just not cached
+        with suppress(OSError):
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, first=first, indices=indices)
+            os.replace(tmp_path, path)
+    return first, indices
+
+
+def group_mean(values: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Mean of `values` per group.
+
+    Args:
+        values: Values of each row.
+        indices: Group index of each row, covering 0..M-1.
+
+    Returns:
+        Array of the M group means, in the dtype of `values`.
+
+    Note:
+        Reduces with pandas on the integer group indices, to keep its
+        compensated summation in the dtype of `values`.
+    """
+    return pd.Series(values).groupby(indices, sort=True).mean().to_numpy()
 
 
 def symmetry_masks(
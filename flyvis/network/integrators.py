@@ -0,0 +1,244 @@
+"""Explicit Runge-Kutta integrators for the network dynamics."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from torch import Tensor
+
+from flyvis.utils.tensor_utils import AutoDeref
+
+if TYPE_CHECKING:
+    from .network import Network
+
+__all__ = [
+    "ButcherTableau",
+    "integrators",
+    "register_integrator",
+    "rk_step",
+    "adaptive_rk_step",
+    "compare_integrators",
+]
+
+
+@dataclass(frozen=True)
+class ButcherTableau:
+    """Coefficients of an explicit Runge-Kutta method.
+
+    Attributes:
+        a: Lower triangular stage coefficients, one row per stage.
+        b: Weights of the stages for the solution.
+        b_err: Weights of the stages for the error estimate, i.e., the difference
+            of the weights of the embedded lower-order solution. Only for adaptive
+            methods.
+        order: Order of the solution, used for step size control.
+    """
+
+    a: Tuple[Tuple[float, ...], ...]
+    b: Tuple[float, ...]
+    b_err: Optional[Tuple[float, ...]] = None
+    order: int = 1
+
+    @property
+    def adaptive(self) -> bool:
+        return self.b_err is not None
+
+
+integrators: Dict[str, ButcherTableau] = {}
+
+
+def register_integrator(name: str, tableau: ButcherTableau) -> ButcherTableau:
+    """Register an integrator to be selectable by name.
+
+    Args:
+        name: Name of the integrator, e.g., for `integration_config.method`.
+        tableau: Coefficients of the method.
+
+    Returns:
+        The registered tableau.
+    """
+    integrators[name] = tableau
+    return tableau
+
+
+register_integrator("euler", ButcherTableau(a=((),), b=(1.0,), order=1))
+register_integrator("heun", ButcherTableau(a=((), (1.0,)), b=(1 / 2, 1 / 2), order=2))
+register_integrator(
+    "rk4",
+    ButcherTableau(
+        a=((), (1 / 2,), (0.0, 1 / 2), (0.0, 0.0, 1.0)),
+        b=(1 / 6, 1 / 3, 1 / 3, 1 / 6),
+        order=4,
+    ),
+)
+# Bogacki-Shampine 3(2) pair with error control
+register_integrator(
+    "rk23",
+    ButcherTableau(
+        a=((), (1 / 2,), (0.0, 3 / 4), (2 / 9, 1 / 3, 4 / 9)),
+        b=(2 / 9, 1 / 3, 4 / 9, 0.0),
+        b_err=(2 / 9 - 7 / 24, 1 / 3 - 1 / 4, 4 / 9 - 1 / 3, -1 / 8),
+        order=3,
+    ),
+)
+
+State = AutoDeref[str, AutoDeref[str, Tensor]]
+
+
+def _combine(state: State, velocities: Iterable[State], weights, h: float) -> State:
+    """Return state + h * sum(weight * velocity) for node and edge states."""
+    terms = [(w, v) for w, v in zip(weights, velocities) if w != 0]
+
+    def combine(group):
+        return AutoDeref(**{
+            k: sum((v[group][k] * (h * w) for w, v in terms), state[group][k])
+            for k in state[group]
+        })
+
+    return AutoDeref(nodes=combine("nodes"), edges=combine("edges"))
+
+
+def rk_step(
+    velocity: Callable[[State], State],
+    state: State,
+    h: float,
+    tableau: ButcherTableau,
+) -> Tuple[State, Optional[State]]:
+    """One explicit Runge-Kutta step of size h.
+
+    Args:
+        velocity: Maps node and edge states to their velocities.
+        state: Node and edge states.
+        h: Step size.
+        tableau: Coefficients of the method.
+
+    Returns:
+        Tuple of the next node and edge states and, for adaptive methods, the
+        local error estimate.
+    """
+    k = []
+    for a in tableau.a:
+        k.append(velocity(_combine(state, k, a, h) if k else state))
+    next_state = _combine(state, k, tableau.b, h)
+    if not tableau.adaptive:
+        return next_state, None
+    zero = AutoDeref(
+        nodes=AutoDeref(**{key: 0 for key in state.nodes}),
+        edges=AutoDeref(**{key: 0 for key in state.edges}),
+    )
+    return next_state, _combine(zero, k, tableau.b_err, h)
+
+
+def adaptive_rk_step(
+    velocity: Callable[[State], State],
+    state: State,
+    dt: float,
+    tableau: ButcherTableau,
+    rtol: float = 1e-3,
+    atol: float = 1e-6,
+    min_step: float = 1e-6,
+) -> State:
+    """Integrate over dt with substeps of adaptive size.
+
+    Each substep is accepted if the maximum local error estimate relative to
+    `atol + rtol * |state|` is below one. Starts with a single step of size dt
+    so that smooth intervals cost one step.
+
+    Args:
+        velocity: Maps node and edge states to their velocities.
+        state: Node and edge states.
+        dt: Interval to integrate.
+        tableau: Coefficients of an adaptive method.
+        rtol: Relative tolerance.
+        atol: Absolute tolerance.
+        min_step: Minimal substep size, accepted regardless of the error.
+
+    Returns:
+        Node and edge states after dt.
+    """
+    t, h = 0.0, dt
+    while t < dt:
+        h = min(h, dt - t)
+        next_state, error = rk_step(velocity, state, h, tableau)
+        norm = max(
+            (
+                (error[group][k] / (atol + rtol * next_state[group][k].abs()))
+                .abs()
+                .max()
+                .item()
+                for group in ("nodes", "edges")
+                for k in state[group]
+            ),
+            default=0.0,
+        )
+        if norm <= 1 or h <= min_step:
+            t, state = t + h, next_state
+        factor = 0.9 * norm ** (-1 / tableau.order) if norm > 0 else 5.0
+        h = max(h * min(5.0, max(0.2, factor)), min_step)
+    return state
+
+
+def compare_integrators(
+    network: Network,
+    movie_input: Tensor,
+    dt: float,
+    methods: Iterable[str] = ("euler", "heun", "rk4", "rk23"),
+    reference_dt: Optional[float] = None,
+) -> pd.DataFrame:
+    """Benchmark accuracy and wall time of integrators against fine-dt Euler.
+
+    Args:
+        network: Network to simulate.
+        movie_input: Movie of shape (batch_size, n_frames, 1, hexals) at the
+            frame duration dt.
+        dt: Integration time step of the methods.
+        methods: Names of registered integrators.
+        reference_dt: Time step of the Euler reference. Defaults to dt / 10.
+            Must divide dt.
+
+    Returns:
+        Table with the method, time step, wall time in seconds, and the maximum
+        and mean absolute deviation of the responses at the frame times from the
+        reference.
+    """
+    reference_dt = reference_dt or dt / 10
+    substeps = int(round(dt / reference_dt))
+    initial_state = network.steady_state(1.0, reference_dt, movie_input.shape[0])
+
+    def simulate(movie_input, dt, method):
+        start = time.perf_counter()
+        responses = network.simulate(
+            movie_input, dt, initial_state=initial_state, method=method
+        )
+        return responses, time.perf_counter() - start
+
+    reference, reference_time = simulate(
+        movie_input.repeat_interleave(substeps, dim=1), reference_dt, "euler"
+    )
+    reference = reference[:, substeps - 1 :: substeps]
+
+    rows = [
+        dict(
+            method="euler",
+            dt=reference_dt,
+            time=reference_time,
+            max_error=0.0,
+            mean_error=0.0,
+        )
+    ]
+    for method in methods:
+        responses, wall_time = simulate(movie_input, dt, method)
+        error = (responses - reference).abs()
+        rows.append(
+            dict(
+                method=method,
+                dt=dt,
+                time=wall_time,
+                max_error=error.max().item(),
+                mean_error=error.mean().item(),
+            )
+        )
+    return pd.DataFrame(rows)
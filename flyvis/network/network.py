@@ -5,17 +5,33 @@ Deep mechanistic network module.
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import os
+import pickle
 import warnings
-from contextlib import contextmanager
-from typing import Any, Callable, Dict, Iterable, Literal, Optional, Union
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import torch
 import torch.nn as nn
+from cachetools import FIFOCache
 from datamate import Namespace, namespacify
 from toolz import valmap
 from torch import Tensor
+from torch.utils.checkpoint import checkpoint
 from torch.utils.data import DataLoader
 from tqdm.auto import tqdm
 
@@ -30,8 +46,11 @@ from flyvis.utils.nn_utils import n_params, simulation
 from flyvis.utils.tensor_utils import AutoDeref, RefTensor
 
 from .dynamics import NetworkDynamics
+from .fixed_point import FixedPointResult, anderson
 from .initialization import Parameter
-from .stimulus import init_stimulus
+from .integrators import adaptive_rk_step, integrators, rk_step
+from .sparse import SynapticMatrix
+from .stimulus import CompactStimulus, init_stimulus
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +65,16 @@ class Network(nn.Module):
         dynamics: Network dynamics configuration.
         node_config: Node parameter configuration.
         edge_config: Edge parameter configuration.
+        stimulus_config: Stimulus configuration.
+        integration_config: Integration configuration. The `backend` is either
+            `scatter` (default), which gathers source states and scatters edge
+            currents to target nodes at every step, or `sparse`, which precomputes
+            a sparse weight matrix once per forward call and computes the synaptic
+            input with a single sparse matrix product per step. The sparse backend
+            requires the dynamics to implement `write_state_velocity_sparse`. The
+            `method` selects the integrator, `euler` (default), `heun`, `rk4`, or
+            the adaptive `rk23` with tolerances `rtol` and `atol` (see
+            `flyvis.network.integrators`).
 
     Attributes:
         connectome (Connectome): Connectome directory.
@@ -61,6 +90,15 @@ class Network(nn.Module):
         symmetry_config (Namespace): Symmetry config.
         clamp_config (Namespace): Clamp config.
         stimulus (Stimulus): Stimulus object.
+        integration_config (Namespace): Integration config.
+        _synaptic_matrix (SynapticMatrix): Sparse connectivity layout, only for the
+            sparse backend.
+        _stacked_values (Dict[str, Tensor]): Semantic parameter values of several
+            parameter sets stacked along a leading model dimension, only within
+            `stacked_parameters`.
+        steady_state_dir (Path): Optional directory to store steady states on disk,
+            e.g., set by the NetworkView to the cache of the network directory.
+        _steady_states (FIFOCache): In-memory cache of steady states.
         _state_hooks (tuple): State hooks.
     """
 
@@ -120,14 +158,26 @@ class Network(nn.Module):
             ),
         ),
         stimulus_config: Dict[str, Any] = Namespace(type="Stimulus", init_buffer=False),
+        integration_config: Dict[str, Any] = Namespace(backend="scatter", method="euler"),
     ):
         super().__init__()
 
         # Prepare configs.
-        connectome, dynamics, node_config, edge_config, stimulus_config, self.config = (
-            self.prepare_configs(
-                connectome, dynamics, node_config, edge_config, stimulus_config
-            )
+        (
+            connectome,
+            dynamics,
+            node_config,
+            edge_config,
+            stimulus_config,
+            integration_config,
+            self.config,
+        ) = self.prepare_configs(
+            connectome,
+            dynamics,
+            node_config,
+            edge_config,
+            stimulus_config,
+            integration_config,
         )
 
         # Store the connectome, dynamics, and parameters.
@@ -216,16 +266,44 @@ class Network(nn.Module):
 
         self.num_parameters = n_params(self)
         self._state_hooks = tuple()
+        self._stacked_values = None
+        self.steady_state_dir = None
+        self._steady_states = FIFOCache(maxsize=16)
 
         self.stimulus = init_stimulus(self.connectome, **stimulus_config)
 
+        self.integration_config = integration_config
+        self._synaptic_matrix = None
+        backend = integration_config.get("backend", "scatter")
+        if backend == "sparse":
+            if (
+                type(self.dynamics).write_state_velocity_sparse
+                is NetworkDynamics.write_state_velocity_sparse
+            ):
+                raise ValueError(
+                    f"{self.dynamics.__class__.__name__} does not implement "
+                    "write_state_velocity_sparse required by the sparse backend."
+                )
+            self._synaptic_matrix = SynapticMatrix(
+                self._source_indices, self._target_indices, self.n_nodes
+            )
+        elif backend != "scatter":
+            raise ValueError(f"Unknown integration backend {backend}.")
+        self._integration_method()
+
         logger.info("Initialized network with %s parameters.", self.num_parameters)
 
     def __repr__(self):
         return self.config.__repr__().replace("Namespace", "Network", 1)
 
     def prepare_configs(
-        self, connectome, dynamics, node_config, edge_config, stimulus_config
+        self,
+        connectome,
+        dynamics,
+        node_config,
+        edge_config,
+        stimulus_config,
+        integration_config,
     ):
         """Prepare configs for network initialization."""
         connectome = namespacify(connectome).deepcopy()
@@ -233,14 +311,24 @@ class Network(nn.Module):
         node_config = namespacify(node_config).deepcopy()
         edge_config = namespacify(edge_config).deepcopy()
         stimulus_config = namespacify(stimulus_config).deepcopy()
+        integration_config = namespacify(integration_config).deepcopy()
         config = Namespace(
             connectome=connectome,
             dynamics=dynamics,
             node_config=node_config,
             edge_config=edge_config,
             stimulus_config=stimulus_config,
+            integration_config=integration_config,
         ).deepcopy()
-        return connectome, dynamics, node_config, edge_config, stimulus_config, config
+        return (
+            connectome,
+            dynamics,
+            node_config,
+            edge_config,
+            stimulus_config,
+            integration_config,
+            config,
+        )
 
     def param_api(self) -> Dict[str, Dict[str, Tensor]]:
         """Param api for inspection.
@@ -287,7 +375,11 @@ class Network(nn.Module):
             **self.node_params,
             **self.edge_params,
         }.items():
-            values = parameter.semantic_values
+            values = (
+                parameter.semantic_values
+                if self._stacked_values is None
+                else self._stacked_values[param_name]
+            )
             for route, indices in parameter.readers.items():
                 # route one of ("nodes", "sources", "target", "edges")
                 params[route][param_name] = RefTensor(values, indices)
@@ -350,6 +442,26 @@ class Network(nn.Module):
         )
         return result
 
+    def _synaptic_sum(
+        self, params: AutoDeref[str, AutoDeref[str, RefTensor]]
+    ) -> Optional[Callable]:
+        """Fused synaptic sum over the sparse weight matrix.
+
+        Args:
+            params: Parameter namespace with derived `edges.weight`.
+
+        Returns:
+            Function mapping node-level presynaptic signals of shape
+            (batch_size, n_nodes) to the weighted synaptic input of shape
+            (batch_size, n_nodes), or None for the scatter backend.
+
+        Note:
+            Called once per forward pass for the sparse backend.
+        """
+        if self._synaptic_matrix is None:
+            return None
+        return self._synaptic_matrix.weighted_source_sum(params.edges.weight)
+
     def _initial_state(
         self, params: AutoDeref[str, AutoDeref[str, RefTensor]], batch_size: int
     ) -> AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]:
@@ -368,18 +480,30 @@ class Network(nn.Module):
 
         # Expand over batch dimension.
         for k, v in state.nodes.items():
-            state.nodes[k] = v.expand(batch_size, *v.shape)
+            state.nodes[k] = self._expand_batch(v, batch_size)
         for k, v in state.edges.items():
-            state.edges[k] = v.expand(batch_size, *v.shape)
+            state.edges[k] = self._expand_batch(v, batch_size)
 
         return self._state_api(state)
 
+    def _expand_batch(self, x: Tensor, batch_size: int) -> Tensor:
+        """Expand a state variable of shape (n) over the batch dimension.
+
+        With stacked parameters, state variables have shape (n_models, 1, n) and
+        are expanded to (n_models, batch_size, n).
+        """
+        if self._stacked_values is None:
+            return x.expand(batch_size, *x.shape)
+        return x.expand(*x.shape[:-2], batch_size, x.shape[-1])
+
     def _next_state(
         self,
         params: AutoDeref[str, AutoDeref[str, RefTensor]],
         state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]],
         x_t: Tensor,
         dt: float,
+        synaptic_sum: Optional[Callable] = None,
+        method: Optional[str] = None,
     ) -> AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]:
         """Compute the next state, given the current `state` and stimulus `x_t`.
 
@@ -388,18 +512,23 @@ class Network(nn.Module):
             state: Current state.
             x_t: Stimulus at time t. Shape is (batch_size, n_nodes).
             dt: Time step.
+            synaptic_sum: Fused synaptic sum for the sparse backend. Computed from
+                `params` if not given.
+            method: Integrator, defaults to `integration_config.method`.
 
         Returns:
             Next state namespace of node, edge, source, and target states.
 
         Note:
-            Uses simple, elementwise Euler integration.
+            Uses simple, elementwise Euler integration unless another integrator
+            is selected (see `_rk_state`).
         """
-        vel = AutoDeref(nodes=AutoDeref(), edges=AutoDeref())
+        if self._integration_method(method) != "euler":
+            return self._state_api(
+                self._rk_state(params, state, x_t, dt, synaptic_sum, method)
+            )
 
-        self.dynamics.write_state_velocity(
-            vel, state, params, self.target_sum, x_t, dt=dt
-        )
+        vel = self._state_velocity(params, state, x_t, dt, synaptic_sum)
 
         next_state = AutoDeref(
             nodes=AutoDeref(**{
@@ -412,13 +541,161 @@ class Network(nn.Module):
 
         return self._state_api(next_state)
 
+    def _next_state_(
+        self,
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]],
+        x_t: Tensor,
+        dt: float,
+        synaptic_sum: Optional[Callable] = None,
+        method: Optional[str] = None,
+    ) -> AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]:
+        """In-place variant of `_next_state` for inference without gradients.
+
+        Args:
+            params: Parameters.
+            state: Current state. Node and edge states must be writable tensors,
+                i.e., not expanded views. They are updated in place.
+            x_t: Stimulus at time t. Shape is (batch_size, n_nodes).
+            dt: Time step.
+            synaptic_sum: Fused synaptic sum for the sparse backend.
+            method: Integrator, defaults to `integration_config.method`.
+
+        Returns:
+            Next state namespace of node, edge, source, and target states.
+
+        Note:
+            Uses simple, elementwise Euler integration unless another integrator
+            is selected (see `_rk_state`).
+        """
+        if self._integration_method(method) != "euler":
+            next_state = self._rk_state(params, state, x_t, dt, synaptic_sum, method)
+            for k in state.nodes:
+                state.nodes[k].copy_(next_state.nodes[k])
+            for k in state.edges:
+                state.edges[k].copy_(next_state.edges[k])
+            return self._state_api(AutoDeref(nodes=state.nodes, edges=state.edges))
+
+        vel = self._state_velocity(params, state, x_t, dt, synaptic_sum)
+
+        for k in state.nodes:
+            state.nodes[k].add_(vel.nodes[k], alpha=dt)
+        for k in state.edges:
+            state.edges[k].add_(vel.edges[k], alpha=dt)
+
+        return self._state_api(AutoDeref(nodes=state.nodes, edges=state.edges))
+
+    def _integration_method(self, method: Optional[str] = None) -> str:
+        """Name of the integrator, defaults to `integration_config.method`."""
+        method = method or self.integration_config.get("method", "euler")
+        if method not in integrators:
+            raise ValueError(
+                f"Unknown integrator {method}. Choose from {list(integrators)}."
+            )
+        return method
+
+    def _rk_state(
+        self,
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]],
+        x_t: Tensor,
+        dt: float,
+        synaptic_sum: Optional[Callable] = None,
+        method: Optional[str] = None,
+    ) -> AutoDeref[str, AutoDeref[str, Tensor]]:
+        """Compute the next node and edge states with a Runge-Kutta integrator.
+
+        Args:
+            params: Parameters.
+            state: Current state.
+            x_t: Stimulus at time t. Shape is (batch_size, n_nodes).
+            dt: Time step.
+            synaptic_sum: Fused synaptic sum for the sparse backend.
+            method: Name of a registered integrator (see
+                `flyvis.network.integrators`).
+
+        Returns:
+            Next state namespace of node and edge states.
+
+        Note:
+            The stimulus is held constant over the time step, and all stages
+            evaluate the dynamics with the time step dt, so that the integrators
+            solve the same ODE as Euler integration. Adaptive integrators subdivide
+            dt with the tolerances `integration_config.rtol` and
+            `integration_config.atol`.
+        """
+        tableau = integrators[self._integration_method(method)]
+
+        def velocity(stage):
+            stage = AutoDeref(
+                nodes=stage.nodes,
+                edges=stage.edges,
+                sources=AutoDeref(**valmap(self._source_gather, stage.nodes)),
+                targets=AutoDeref(**valmap(self._target_gather, stage.nodes)),
+            )
+            return self._state_velocity(params, stage, x_t, dt, synaptic_sum)
+
+        state = AutoDeref(nodes=state.nodes, edges=state.edges)
+        if tableau.adaptive:
+            return adaptive_rk_step(
+                velocity,
+                state,
+                dt,
+                tableau,
+                rtol=self.integration_config.get("rtol", 1e-3),
+                atol=self.integration_config.get("atol", 1e-6),
+            )
+        return rk_step(velocity, state, dt, tableau)[0]
+
+    def _state_velocity(
+        self,
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]],
+        x_t: Tensor,
+        dt: float,
+        synaptic_sum: Optional[Callable] = None,
+    ) -> AutoDeref[str, AutoDeref[str, Tensor]]:
+        """Compute the velocity of all state variables from the dynamics.
+
+        Args:
+            params: Parameters.
+            state: Current state.
+            x_t: Stimulus at time t. Shape is (batch_size, n_nodes).
+            dt: Time step.
+            synaptic_sum: Fused synaptic sum for the sparse backend. Computed from
+                `params` if not given.
+
+        Returns:
+            Velocity namespace of node and edge states.
+        """
+        vel = AutoDeref(nodes=AutoDeref(), edges=AutoDeref())
+
+        if self._synaptic_matrix is not None:
+            self.dynamics.write_state_velocity_sparse(
+                vel,
+                state,
+                params,
+                synaptic_sum or self._synaptic_sum(params),
+                x_t,
+                dt=dt,
+            )
+        else:
+            self.dynamics.write_state_velocity(
+                vel, state, params, self.target_sum, x_t, dt=dt
+            )
+        return vel
+
     def _state_api(
-        self, state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]
+        self,
+        state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]],
+        run_hooks: bool = True,
     ) -> AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]:
         """Populate sources and targets states from nodes states.
 
         Args:
             state: Current state.
+            run_hooks: Whether to call the state hooks. False to rebuild the API
+                of a state that has already passed through the hooks.
 
         Returns:
             Updated state with populated sources and targets.
@@ -427,7 +704,7 @@ class Network(nn.Module):
             Optional state hooks are called here (in order of registration).
             This is returned by _initial_state and _next_state.
         """
-        for hook in self._state_hooks:
+        for hook in self._state_hooks if run_hooks else []:
             _state = hook(state)
             if _state is not None:
                 state = _state
@@ -507,43 +784,250 @@ class Network(nn.Module):
                     param.data[symmetry] = param.data[symmetry].mean()
 
     def forward(
-        self, x: Tensor, dt: float, state: AutoDeref = None, as_states: bool = False
+        self,
+        x: Union[Tensor, CompactStimulus],
+        dt: float,
+        state: AutoDeref = None,
+        as_states: bool = False,
+        method: Optional[str] = None,
+        checkpoint_chunk: Optional[int] = None,
+        tbptt_window: Optional[int] = None,
     ) -> Union[torch.Tensor, AutoDeref]:
         """Forward pass of the network.
 
         Args:
-            x: Whole-network stimulus of shape (batch_size, n_frames, n_cells).
+            x: Whole-network stimulus of shape (batch_size, n_frames, n_cells), or
+                a `CompactStimulus` that is assembled frame by frame.
             dt: Integration time constant.
             state: Initial state of the network. If not given, computed from
                 NetworksDynamics.write_initial_state. initial_state and fade_in_state
                 are convenience functions to compute initial steady states.
             as_states: If True, returns the states as List[AutoDeref], else concatenates
                 the activity of the nodes and returns a tensor.
+            method: Integrator, e.g., `euler`, `heun`, `rk4`, or the adaptive
+                `rk23`. Defaults to `integration_config.method`.
+            checkpoint_chunk: If given, the frames are integrated in chunks of this
+                many frames with gradient checkpointing. Only the states at the
+                chunk boundaries are kept for the backward pass and the states
+                within the chunks are recomputed, trading compute for memory that
+                otherwise scales with the number of frames.
+            tbptt_window: If given, the state is detached from the graph every
+                this many frames, i.e., gradients are truncated to windows of
+                this many frames (truncated backpropagation through time).
 
         Returns:
             Network activity or states.
+
+        Raises:
+            ValueError: If `checkpoint_chunk` is combined with as_states=True.
         """
+        if checkpoint_chunk and as_states:
+            raise ValueError("Gradient checkpointing only returns the activity.")
+
         # To keep the parameters within their valid domain, they get clamped.
         self.clamp()
         # Construct the parameter API.
         params = self._param_api()
 
+        # Precompute the sparse weight matrix for the sparse backend.
+        synaptic_sum = self._synaptic_sum(params)
+
         # Initialize the network state.
         if state is None:
             state = self._initial_state(params, x.shape[0])
 
         def handle(state):
             # loop over the temporal dimension for integration of dynamics
-            for i in range(x.shape[1]):
-                state = self._next_state(params, state, x[:, i], dt)
-                if as_states is False:
-                    yield state.nodes.activity
-                else:
-                    yield state
+            for start, stop in _segments(x.shape[1], checkpoint_chunk, tbptt_window):
+                if tbptt_window and start > 0 and start % tbptt_window == 0:
+                    state = self._detach_state(state)
+                if checkpoint_chunk:
+                    activity, state = self._checkpointed_chunk(
+                        params, state, x, start, stop, dt, synaptic_sum, method
+                    )
+                    yield from activity.unbind(dim=-2)
+                    continue
+                for i in range(start, stop):
+                    state = self._next_state(
+                        params, state, _frame(x, i), dt, synaptic_sum, method
+                    )
+                    if as_states is False:
+                        yield state.nodes.activity
+                    else:
+                        yield state
 
         if as_states is True:
             return list(handle(state))
-        return torch.stack(list(handle(state)), dim=1)
+        return torch.stack(list(handle(state)), dim=-2)
+
+    def _detach_state(
+        self, state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]
+    ) -> AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]:
+        """Detach node and edge states from the graph to truncate gradients."""
+        return self._state_api(
+            AutoDeref(
+                nodes=AutoDeref(**valmap(Tensor.detach, state.nodes)),
+                edges=AutoDeref(**valmap(Tensor.detach, state.edges)),
+            ),
+            run_hooks=False,
+        )
+
+    def _checkpointed_chunk(
+        self,
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]],
+        x: Union[Tensor, CompactStimulus],
+        start: int,
+        stop: int,
+        dt: float,
+        synaptic_sum: Optional[Callable] = None,
+        method: Optional[str] = None,
+    ) -> Tuple[Tensor, AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]]]:
+        """Integrate a chunk of frames with gradient checkpointing.
+
+        Args:
+            params: Parameters.
+            state: State before the chunk.
+            x: Whole-network stimulus of shape (batch_size, n_frames, n_nodes), or
+                a `CompactStimulus`.
+            start: First frame of the chunk.
+            stop: Stop frame of the chunk.
+            dt: Time step.
+            synaptic_sum: Fused synaptic sum for the sparse backend.
+            method: Integrator, defaults to `integration_config.method`.
+
+        Returns:
+            Activity of shape (batch_size, n_frames, n_nodes) and the state after
+            the chunk.
+        """
+        node_keys, edge_keys = list(state.nodes), list(state.edges)
+        # Dereference once, so that the recomputation does not differ from the
+        # forward pass by the dereferencing cache of the parameter namespace.
+        params = AutoDeref(**{
+            route: AutoDeref(**{k: group[k] for k in group})
+            for route, group in params.items()
+        })
+
+        def chunk(*tensors):
+            state = self._state_api(
+                AutoDeref(
+                    nodes=AutoDeref(**dict(zip(node_keys, tensors))),
+                    edges=AutoDeref(**dict(zip(edge_keys, tensors[len(node_keys) :]))),
+                ),
+                run_hooks=False,
+            )
+            activity = []
+            for i in range(start, stop):
+                state = self._next_state(
+                    params, state, _frame(x, i), dt, synaptic_sum, method
+                )
+                activity.append(state.nodes.activity)
+            return (
+                torch.stack(activity, dim=-2),
+                *(state.nodes[k] for k in node_keys),
+                *(state.edges[k] for k in edge_keys),
+            )
+
+        activity, *tensors = checkpoint(
+            chunk,
+            *(state.nodes[k] for k in node_keys),
+            *(state.edges[k] for k in edge_keys),
+            use_reentrant=False,
+        )
+        state = self._state_api(
+            AutoDeref(
+                nodes=AutoDeref(**dict(zip(node_keys, tensors))),
+                edges=AutoDeref(**dict(zip(edge_keys, tensors[len(node_keys) :]))),
+            ),
+            run_hooks=False,
+        )
+        return activity, state
+
+    @torch.no_grad()
+    def inference(
+        self,
+        x: Union[Tensor, CompactStimulus],
+        dt: float,
+        state: AutoDeref = None,
+        out: Optional[Tensor] = None,
+        dtype: Optional[torch.dtype] = None,
+        return_state: bool = False,
+        method: Optional[str] = None,
+    ) -> Union[Tensor, Tuple[Tensor, AutoDeref]]:
+        """Memory-efficient forward pass without gradients.
+
+        Writes the activity of each step into a preallocated output buffer instead
+        of stacking a list of per-step tensors and updates the node and edge states
+        in place.
+
+        Args:
+            x: Whole-network stimulus of shape (batch_size, n_frames, n_cells), or
+                a `CompactStimulus` that is assembled frame by frame.
+            dt: Integration time constant.
+            state: Initial state of the network. If not given, computed from
+                NetworksDynamics.write_initial_state. Not modified.
+            out: Optional output buffer of shape (batch_size, n_frames, n_cells),
+                e.g. to reuse memory across calls.
+            dtype: Data type of the output buffer if `out` is not given, e.g.
+                torch.float16 to halve the memory of the responses. Integration is
+                always performed in the precision of the parameters.
+            return_state: If True, also return the final state.
+            method: Integrator, defaults to `integration_config.method`.
+
+        Returns:
+            Network activity of shape (batch_size, n_frames, n_cells), and the
+            final state if `return_state` is True. Within `stacked_parameters`, the
+            activity has shape (n_models, batch_size, n_frames, n_cells).
+
+        Raises:
+            ValueError: If `out` has the wrong shape.
+        """
+        self.clamp()
+        params = self._param_api()
+        synaptic_sum = self._synaptic_sum(params)
+
+        batch_size, n_frames = x.shape[:2]
+        if state is None:
+            state = self._initial_state(params, batch_size)
+
+        shape = (*state.nodes.activity.shape[:-2], batch_size, n_frames, self.n_nodes)
+        if out is None:
+            out = torch.empty(
+                shape, dtype=dtype or torch.get_default_dtype(), device=x.device
+            )
+        elif out.shape != shape:
+            raise ValueError(f"out has shape {tuple(out.shape)} but must have {shape}")
+        # Copy the initial state to writable memory to not modify the caller's
+        # state and to materialize expanded views, e.g., of a state computed for
+        # a batch size of one.
+        nodes = AutoDeref({
+            k: v.expand(*v.shape[:-2], batch_size, v.shape[-1]).clone(
+                memory_format=torch.contiguous_format
+            )
+            for k, v in state.nodes.items()
+        })
+        edges = AutoDeref({
+            k: v.expand(*v.shape[:-2], batch_size, v.shape[-1]).clone(
+                memory_format=torch.contiguous_format
+            )
+            for k, v in state.edges.items()
+        })
+        state = AutoDeref(
+            nodes=nodes,
+            edges=edges,
+            sources=AutoDeref(**valmap(self._source_gather, nodes)),
+            targets=AutoDeref(**valmap(self._target_gather, nodes)),
+        )
+
+        for i in range(n_frames):
+            state = self._next_state_(
+                params, state, _frame(x, i), dt, synaptic_sum, method
+            )
+            out[..., i, :] = state.nodes.activity
+
+        if return_state:
+            return out, state
+        return out
 
     def steady_state(
         self,
@@ -554,6 +1038,7 @@ class Network(nn.Module):
         state: Optional[AutoDeref] = None,
         grad: bool = False,
         return_last: bool = True,
+        solver: Literal["integrate", "fixed_point"] = "integrate",
     ) -> AutoDeref:
         """Compute state after grey-scale stimulus.
 
@@ -567,16 +1052,44 @@ class Network(nn.Module):
                 are convenience functions to compute initial steady states.
             grad: If True, the state is computed with gradient.
             return_last: If True, return only the last state.
+            solver: Either `integrate` to integrate the grey-scale stimulus for
+                t_pre, or `fixed_point` to solve for the fixed point of the
+                dynamics directly (see `fixed_point_state`). Falls back to
+                integration if the fixed-point solver does not converge.
 
         Returns:
             Steady state of the network after a grey-scale stimulus.
+
+        Raises:
+            ValueError: If the solver is unknown or `fixed_point` is requested
+                with return_last=False.
+
+        Note:
+            Without initial state, gradient, and state hooks, the last state is
+            computed once for a batch size of one and cached by the parameters,
+            t_pre, dt, value, and solver (see `cached_steady_state`).
         """
+        if solver not in ("integrate", "fixed_point"):
+            raise ValueError(f"Unknown steady state solver {solver}.")
+        if solver == "fixed_point" and not return_last:
+            raise ValueError("The fixed-point solver only returns the last state.")
+
         if t_pre is None or t_pre <= 0.0:
             return state
 
         if value is None:
             return state
 
+        if state is None and not grad and return_last and not self._state_hooks:
+            return self.cached_steady_state(t_pre, dt, batch_size, value, solver)
+
+        if solver == "fixed_point":
+            fixed_point_state = self._fixed_point_state_or_none(
+                batch_size, value, state, grad
+            )
+            if fixed_point_state is not None:
+                return fixed_point_state
+
         self.stimulus.zero(batch_size, int(t_pre / dt))
         self.stimulus.add_pre_stim(value)
 
@@ -585,6 +1098,253 @@ class Network(nn.Module):
                 return self(self.stimulus(), dt, as_states=True, state=state)[-1]
             return self(self.stimulus(), dt, as_states=True, state=state)
 
+    def cached_steady_state(
+        self,
+        t_pre: float,
+        dt: float,
+        batch_size: int,
+        value: float = 0.5,
+        solver: Literal["integrate", "fixed_point"] = "integrate",
+    ) -> AutoDeref:
+        """Compute or load the state after grey-scale stimulus.
+
+        The state is integrated once for a batch size of one and broadcast to
+        `batch_size`, because the grey-scale stimulus is the same for all samples.
+        Steady states are cached in memory and, if `steady_state_dir` is set, on
+        disk, keyed by a hash of the parameters, t_pre, dt, and value.
+
+        Args:
+            t_pre: Time of the grey-scale stimulus.
+            dt: Integration time constant.
+            batch_size: Batch size.
+            value: Value of the grey-scale stimulus.
+            solver: Either `integrate` or `fixed_point`, see `steady_state`.
+
+        Returns:
+            Steady state of the network after a grey-scale stimulus. Node and edge
+            states are expanded views over the batch dimension.
+        """
+        self.clamp()
+        key = self._steady_state_key(t_pre, dt, value, solver)
+        device = next(self.parameters()).device
+
+        if key not in self._steady_states:
+            path = (
+                Path(self.steady_state_dir) / f"{key}.pt"
+                if self.steady_state_dir is not None
+                else None
+            )
+            state = None
+            if path is not None:
+                # missing or unreadable files are a cache miss
+                with suppress(OSError, RuntimeError, EOFError, pickle.UnpicklingError):
+                    state = torch.load(path, map_location=device)
+            if state is None:
+                last = None
+                if solver == "fixed_point":
+                    last = self._fixed_point_state_or_none(1, value)
+                if last is None:
+                    self.stimulus.zero(1, int(t_pre / dt))
+                    self.stimulus.add_pre_stim(value)
+                    _, last = self.inference(self.stimulus(), dt, return_state=True)
+                state = dict(nodes=dict(last.nodes), edges=dict(last.edges))
+                if path is not None:
+                    # atomic renames let processes share the directory, and
+                    # read-only network directories are just not cached
+                    with suppress(OSError):
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+                        torch.save(state, tmp_path)
+                        os.replace(tmp_path, path)
+            self._steady_states[key] = state
+
+        state = self._steady_states[key]
+        return self._state_api(
+            AutoDeref(
+                nodes=AutoDeref({
+                    k: v.to(device).expand(*v.shape[:-2], batch_size, v.shape[-1])
+                    for k, v in state["nodes"].items()
+                }),
+                edges=AutoDeref({
+                    k: v.to(device).expand(*v.shape[:-2], batch_size, v.shape[-1])
+                    for k, v in state["edges"].items()
+                }),
+            )
+        )
+
+    def _steady_state_key(
+        self, t_pre: float, dt: float, value: float, solver: str = "integrate"
+    ) -> str:
+        """Hash of the parameters and the grey-scale stimulus."""
+        hasher = hashlib.sha1()
+        parameters = {
+            **self.state_dict(),
+            **{
+                f"stacked_{name}": values
+                for name, values in (self._stacked_values or {}).items()
+            },
+        }
+        for name, tensor in parameters.items():
+            hasher.update(name.encode())
+            hasher.update(tensor.detach().cpu().numpy().tobytes())
+        hasher.update(repr((t_pre, dt, value, solver, self.integration_config)).encode())
+        return hasher.hexdigest()
+
+    def clear_steady_state_cache(self) -> None:
+        """Clear the in-memory cache of steady states."""
+        self._steady_states.clear()
+
+    def fixed_point_state(
+        self,
+        batch_size: int = 1,
+        value: float = 0.5,
+        state: Optional[AutoDeref] = None,
+        grad: bool = False,
+        tol: float = 1e-5,
+        max_iter: int = 100,
+        history: int = 5,
+    ) -> Tuple[AutoDeref, FixedPointResult]:
+        """Solve for the steady state under grey-scale stimulus directly.
+
+        Instead of integrating the grey-scale stimulus until convergence, finds the
+        fixed point of `NetworkDynamics.write_fixed_point_state` with
+        Anderson-accelerated fixed-point iteration.
+
+        Args:
+            batch_size: Batch size.
+            value: Value of the grey-scale stimulus.
+            state: Initial guess. If not given, computed from
+                NetworksDynamics.write_initial_state.
+            grad: If True, the state is computed with gradient through the
+                iterations.
+            tol: Tolerance of the maximum absolute residual of the state.
+            max_iter: Maximum number of iterations.
+            history: Number of previous iterates combined by Anderson acceleration.
+
+        Returns:
+            Tuple of the steady state and the fixed-point result, which reports
+            the residual, the number of iterations, and whether the solver
+            converged.
+
+        Raises:
+            NotImplementedError: If the dynamics do not implement
+                `write_fixed_point_state`.
+        """
+        self.clamp()
+        with self.enable_grad(grad):
+            params = self._param_api()
+            if state is None:
+                state = self._initial_state(params, batch_size)
+            fixed_point_map, pack, unpack = self._fixed_point_map(params, state, value)
+            result = anderson(
+                fixed_point_map, pack(state), tol=tol, max_iter=max_iter, history=history
+            )
+        return self._state_api(unpack(result.x)), result
+
+    def equilibrium_residual(self, state: AutoDeref, value: float = 0.5) -> Tensor:
+        """Distance of a state from the equilibrium under grey-scale stimulus.
+
+        Args:
+            state: State of the network, e.g., from `steady_state`.
+            value: Value of the grey-scale stimulus.
+
+        Returns:
+            Maximum absolute difference between the state and the state it
+            relaxes to (see `NetworkDynamics.write_fixed_point_state`) of each
+            sample. Shape is (batch_size), or (n_models, batch_size) with stacked
+            parameters.
+
+        Raises:
+            NotImplementedError: If the dynamics do not implement
+                `write_fixed_point_state`.
+        """
+        with torch.no_grad():
+            params = self._param_api()
+            fixed_point_map, pack, _ = self._fixed_point_map(params, state, value)
+            x = pack(state)
+            residual = (fixed_point_map(x) - x).abs().amax(dim=-1)
+        return residual.reshape(state.nodes.activity.shape[:-1])
+
+    def _fixed_point_map(
+        self,
+        params: AutoDeref[str, AutoDeref[str, RefTensor]],
+        state: AutoDeref[str, AutoDeref[str, Union[Tensor, RefTensor]]],
+        value: float,
+    ) -> Tuple[Callable, Callable, Callable]:
+        """Fixed-point map of the dynamics on flattened node and edge states.
+
+        Args:
+            params: Parameters.
+            state: State defining the shapes of the state variables.
+            value: Value of the grey-scale stimulus.
+
+        Returns:
+            Tuple of the fixed-point map of shape (n_samples, n_states) to
+            (n_samples, n_states), and functions to flatten a state to and
+            restore a state from shape (n_samples, n_states).
+        """
+        keys = [("nodes", k) for k in state.nodes] + [("edges", k) for k in state.edges]
+        sizes = [state[group][k].shape[-1] for group, k in keys]
+        leading_shape = state.nodes.activity.shape[:-1]
+
+        self.stimulus.zero(leading_shape[-1], 1)
+        self.stimulus.add_pre_stim(value)
+        x_t = _frame(self.stimulus(), 0)
+
+        def pack(state):
+            return torch.cat(
+                [state[group][k].expand(*leading_shape, -1) for group, k in keys],
+                dim=-1,
+            ).reshape(-1, sum(sizes))
+
+        def unpack(x):
+            state = AutoDeref(nodes=AutoDeref(), edges=AutoDeref())
+            values = x.reshape(*leading_shape, -1).split(sizes, dim=-1)
+            for (group, k), v in zip(keys, values):
+                state[group][k] = v
+            return state
+
+        def fixed_point_map(x):
+            state = unpack(x)
+            state = AutoDeref(
+                nodes=state.nodes,
+                edges=state.edges,
+                sources=AutoDeref(**valmap(self._source_gather, state.nodes)),
+                targets=AutoDeref(**valmap(self._target_gather, state.nodes)),
+            )
+            next_state = AutoDeref(nodes=AutoDeref(), edges=AutoDeref())
+            self.dynamics.write_fixed_point_state(
+                next_state, state, params, self.target_sum, x_t
+            )
+            return pack(next_state)
+
+        return fixed_point_map, pack, unpack
+
+    def _fixed_point_state_or_none(
+        self,
+        batch_size: int,
+        value: float,
+        state: Optional[AutoDeref] = None,
+        grad: bool = False,
+    ) -> Optional[AutoDeref]:
+        """Fixed-point state or None if the solver is not applicable or diverged."""
+        try:
+            fixed_point_state, result = self.fixed_point_state(
+                batch_size, value, state, grad
+            )
+        except NotImplementedError as e:
+            logger.warning("%s Falling back to integration.", e)
+            return None
+        if not result.converged:
+            logger.warning(
+                "Fixed-point solver did not converge after %s iterations "
+                "(residual %.2e). Falling back to integration.",
+                result.n_iter,
+                result.residual.max().item(),
+            )
+            return None
+        return fixed_point_state
+
     def fade_in_state(
         self,
         t_fade_in: float,
@@ -632,12 +1392,16 @@ class Network(nn.Module):
         initial_state: Union[AutoDeref, None, Literal["auto"]] = "auto",
         as_states: bool = False,
         as_layer_activity: bool = False,
+        out: Optional[Tensor] = None,
+        dtype: Optional[torch.dtype] = None,
+        method: Optional[str] = None,
     ) -> Union[torch.Tensor, AutoDeref, LayerActivity]:
         """Simulate the network activity from movie input.
 
         Args:
             movie_input: Tensor of shape (batch_size, n_frames, 1, hexals).
-            dt: Integration time constant. Warns if dt > 1/50.
+            dt: Integration time constant. Warns if dt > 1/50 for Euler
+                integration.
             initial_state: Network activity at the beginning of the simulation.
                 Use fade_in_state or steady_state to compute the initial state from grey
                 input or from ramping up the contrast of the first movie frame.
@@ -646,6 +1410,13 @@ class Network(nn.Module):
                 a tensor. Defaults to False.
             as_layer_activity: If True, return a LayerActivity object. Defaults to False.
                 Currently only supported for ConnectomeFromAvgFilters.
+            out: Optional preallocated output buffer of shape
+                (batch_size, n_frames, #neurons). Ignored if `as_states` is True.
+            dtype: Data type of the output buffer if `out` is not given, e.g.
+                torch.float16. Ignored if `as_states` is True.
+            method: Integrator, e.g., `euler`, `heun`, `rk4`, or the adaptive
+                `rk23`. Higher-order integrators allow larger dt at equal
+                accuracy. Defaults to `integration_config.method`.
 
         Returns:
             Activity tensor of shape (batch_size, n_frames, #neurons),
@@ -670,7 +1441,7 @@ class Network(nn.Module):
                 "ConnectomeFromAvgFilters"
             )
 
-        if dt > 1 / 50:
+        if dt > 1 / 50 and self._integration_method(method) == "euler":
             warnings.warn(
                 f"dt={dt} is very large for integration. "
                 "Better choose a smaller dt (<= 1/50 to avoid this warning)",
@@ -687,13 +1458,169 @@ class Network(nn.Module):
             )
             self.stimulus.zero(batch_size, n_frames)
             self.stimulus.add_input(movie_input)
-            if as_layer_activity:
-                return LayerActivity(
-                    self.forward(self.stimulus(), dt, initial_state, as_states).cpu(),
-                    self.connectome,
-                    keepref=True,
+            if as_states:
+                responses = self.forward(
+                    self.stimulus(), dt, initial_state, as_states, method
+                )
+            else:
+                responses = self.inference(
+                    self.stimulus(),
+                    dt,
+                    initial_state,
+                    out=out,
+                    dtype=dtype,
+                    method=method,
                 )
-            return self.forward(self.stimulus(), dt, initial_state, as_states)
+            if as_layer_activity:
+                return LayerActivity(responses.cpu(), self.connectome, keepref=True)
+            return responses
+
+    def simulate_chunks(
+        self,
+        movie_chunks: Iterable[torch.Tensor],
+        dt: float,
+        initial_state: Union[AutoDeref, None, Literal["auto"]] = "auto",
+        cell_types: Optional[Iterable[str]] = None,
+        central_cells_only: bool = False,
+        dtype: Optional[torch.dtype] = None,
+        method: Optional[str] = None,
+    ) -> Generator[torch.Tensor, None, AutoDeref]:
+        """Simulate the network activity from a stream of movie chunks.
+
+        The network state is carried over across chunk boundaries, so that the
+        concatenated responses are identical to simulating the concatenated movie
+        at once, while only one chunk is kept in memory.
+
+        Args:
+            movie_chunks: Iterable of tensors of shape
+                (batch_size, n_frames_chunk, 1, hexals), e.g. a generator reading
+                a long recording or a live stimulus feed. The number of frames can
+                vary across chunks.
+            dt: Integration time constant. Warns if dt > 1/50 for Euler
+                integration.
+            initial_state: Network activity at the beginning of the simulation.
+                Defaults to "auto", which uses the steady_state after 1s of grey
+                input.
+            cell_types: Optional cell types to reduce the responses to. Responses
+                are concatenated along the last dimension in the given order.
+            central_cells_only: If True, reduce the responses to the central cell
+                of each (selected) cell type.
+            dtype: Data type of the yielded responses, e.g. torch.float16.
+            method: Integrator, see `simulate`. Defaults to
+                `integration_config.method`.
+
+        Yields:
+            Activity tensor of shape (batch_size, n_frames_chunk, #selected neurons)
+            for each chunk.
+
+        Returns:
+            The final state of the network (as value of the StopIteration).
+
+        Raises:
+            ValueError: If a chunk is not four-dimensional.
+        """
+        if dt > 1 / 50 and self._integration_method(method) == "euler":
+            warnings.warn(
+                f"dt={dt} is very large for integration. "
+                "Better choose a smaller dt (<= 1/50 to avoid this warning)",
+                IntegrationWarning,
+                stacklevel=2,
+            )
+
+        index = self._response_index(cell_types, central_cells_only)
+        state = initial_state
+        buffer = None
+
+        for movie_input in movie_chunks:
+            if len(movie_input.shape) != 4:
+                raise ValueError("requires shape (sample, frame, 1, hexals)")
+            batch_size, n_frames = movie_input.shape[:2]
+            if state == "auto":
+                state = self.steady_state(1.0, dt, batch_size)
+
+            # the full response buffer is reused across chunks if responses are
+            # reduced, because the reduced responses are copies
+            if buffer is not None and buffer.shape[:2] != (batch_size, n_frames):
+                buffer = None
+
+            responses, state = self._simulate_chunk(
+                movie_input, dt, state, out=buffer, dtype=dtype, method=method
+            )
+
+            if index is None:
+                yield responses
+            else:
+                buffer = responses
+                yield responses[:, :, index]
+
+        return state
+
+    def _simulate_chunk(
+        self,
+        movie_input: torch.Tensor,
+        dt: float,
+        state: Optional[AutoDeref],
+        out: Optional[Tensor] = None,
+        dtype: Optional[torch.dtype] = None,
+        method: Optional[str] = None,
+    ) -> Tuple[torch.Tensor, AutoDeref]:
+        """Simulate one chunk of movie input starting from `state`.
+
+        Args:
+            movie_input: Tensor of shape (batch_size, n_frames, 1, hexals).
+            dt: Integration time constant.
+            state: State at the beginning of the chunk.
+            out: Optional output buffer of shape (batch_size, n_frames, #neurons).
+            dtype: Data type of the output buffer if `out` is not given.
+            method: Integrator, defaults to `integration_config.method`.
+
+        Returns:
+            Activity tensor of shape (batch_size, n_frames, #neurons) and the state
+            at the end of the chunk.
+        """
+        batch_size, n_frames = movie_input.shape[:2]
+        with simulation(self):
+            self.stimulus.zero(batch_size, n_frames)
+            self.stimulus.add_input(movie_input)
+            return self.inference(
+                self.stimulus(),
+                dt,
+                state,
+                out=out,
+                dtype=dtype,
+                return_state=True,
+                method=method,
+            )
+
+    def _response_index(
+        self,
+        cell_types: Optional[Iterable[str]] = None,
+        central_cells_only: bool = False,
+    ) -> Optional[torch.Tensor]:
+        """Node index to reduce responses to cell types and/or central cells.
+
+        Args:
+            cell_types: Cell types to select. All if None.
+            central_cells_only: If True, select only the central cell of each type.
+
+        Returns:
+            Node index or None if no reduction is required.
+        """
+        if cell_types is None and not central_cells_only:
+            return None
+        unique_cell_types = self.connectome.unique_cell_types[:].astype(str)
+        if cell_types is None:
+            cell_types = unique_cell_types
+        if central_cells_only:
+            central_cells_index = dict(
+                zip(unique_cell_types, self.connectome.central_cells_index[:])
+            )
+            index = np.array([central_cells_index[t] for t in cell_types])
+        else:
+            index = np.concatenate([
+                self.connectome.nodes.layer_index[t][:] for t in cell_types
+            ])
+        return torch.tensor(index, dtype=torch.long)
 
     @contextmanager
     def enable_grad(self, grad: bool = True):
@@ -709,6 +1636,53 @@ class Network(nn.Module):
         finally:
             torch.set_grad_enabled(prev)
 
+    @contextmanager
+    def stacked_parameters(self, state_dicts: Iterable[Dict[str, Tensor]]):
+        """Context manager to integrate several parameter sets at once.
+
+        Within the context, the parameters passed to the dynamics are the semantic
+        values of all state dicts stacked along a leading model dimension. Since
+        the parameter sets share the connectome, all models are integrated in one
+        vectorized pass and network activity gains a leading model dimension,
+        e.g., `simulate` returns activity of shape
+        (n_models, batch_size, n_frames, n_cells).
+
+        Args:
+            state_dicts: Network state dicts, e.g., of the models of an ensemble.
+
+        Note:
+            Only for inference. Parameters are not trainable within the context.
+            After the context, the network holds the parameters of the last state
+            dict.
+
+        Example:
+            ```python
+            with network.stacked_parameters(state_dicts):
+                responses = network.simulate(movie_input, dt)
+            ```
+        """
+        values = {}
+        with torch.no_grad():
+            for state_dict in state_dicts:
+                self.load_state_dict(state_dict)
+                self.clamp()
+                for param_name, parameter in {
+                    **self.node_params,
+                    **self.edge_params,
+                }.items():
+                    values.setdefault(param_name, []).append(
+                        parameter.semantic_values.detach().clone()
+                    )
+        # (n_models, 1, n_values) to broadcast over the batch dimension
+        self._stacked_values = {
+            param_name: torch.stack(value)[:, None]
+            for param_name, value in values.items()
+        }
+        try:
+            yield self
+        finally:
+            self._stacked_values = None
+
     def stimulus_response(
         self,
         stim_dataset: SequenceDataset,
@@ -785,8 +1759,7 @@ class Network(nn.Module):
                     if grad is False:
                         return (
                             stim.cpu().numpy(),
-                            self(stimulus(), dt, state=fade_in_state)
-                            .detach()
+                            self.inference(stimulus(), dt, state=fade_in_state)
                             .cpu()
                             .numpy(),
                         )
@@ -865,13 +1838,13 @@ class Network(nn.Module):
                         stim.cpu().numpy().squeeze(),
                         torch.stack(
                             [s.nodes.activity.cpu() for s in states],
-                            dim=1,
+                            dim=-2,
                         )
                         .numpy()
                         .squeeze(),
                         torch.stack(
                             [self.dynamics.currents(s, params).cpu() for s in states],
-                            dim=1,
+                            dim=-2,
                         )
                         .numpy()
                         .squeeze(),
@@ -883,3 +1856,22 @@ class Network(nn.Module):
 
 class IntegrationWarning(Warning):
     """Warning for integration-related issues."""
+
+
+def _segments(
+    n_frames: int, chunk: Optional[int] = None, window: Optional[int] = None
+) -> Iterable[Tuple[int, int]]:
+    """Split frames into segments at multiples of the chunk and window sizes."""
+    starts = [
+        i
+        for i in range(n_frames)
+        if i == 0 or (chunk and i % chunk == 0) or (window and i % window == 0)
+    ]
+    return zip(starts, [*starts[1:], n_frames])
+
+
+def _frame(x: Union[Tensor, CompactStimulus], t: int) -> Tensor:
+    """Whole-network stimulus of shape (batch_size, n_nodes) at frame t."""
+    if isinstance(x, CompactStimulus):
+        return x.frame(t)
+    return x[:, t]
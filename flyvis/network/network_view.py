@@ -10,6 +10,7 @@ import os
 from dataclasses import dataclass
 from functools import wraps
 from os import PathLike
+from pathlib import Path
 from pprint import pformat
 from typing import Any, Callable, Dict, List, Optional, Union
 
@@ -61,6 +62,10 @@ class NetworkView:
         best_checkpoint_fn_kwargs: Keyword arguments for best_checkpoint_fn. Defaults to
             {"validation_subdir": "validation", "loss_file_name": "loss"}.
         recover_fn: Function to recover the network. Defaults to recover_network.
+        connectome_view: Connectome view, e.g., to share between networks with the
+            same connectome. Defaults to the one from connectome_getter.
+        checkpoints: Result of checkpoint_mapper, if already resolved.
+        best_checkpoint: Result of best_checkpoint_fn, if already resolved.
 
     Attributes:
         network_class (nn.Module): Network class.
@@ -95,17 +100,22 @@ class NetworkView:
             "loss_file_name": "epe",
         },
         recover_fn: Callable = recover_network,
+        connectome_view: Optional[ConnectomeView] = None,
+        checkpoints: Optional[Any] = None,
+        best_checkpoint: Optional[Path] = None,
     ):
         self.network_class = network_class
         self.dir, self.name = self._resolve_dir(network_dir, root_dir)
         self.root_dir = root_dir
         self.connectome_getter = connectome_getter
         self.checkpoint_mapper = checkpoint_mapper
-        self.connectome_view: ConnectomeView = connectome_getter(
+        self.connectome_view: ConnectomeView = connectome_view or connectome_getter(
             self.dir.config.network.connectome
         )
         self.connectome = self.connectome_view.dir
-        self.checkpoints = checkpoint_mapper(self.dir)
+        self.checkpoints = (
+            checkpoints if checkpoints is not None else checkpoint_mapper(self.dir)
+        )
         self.memory = Memory(
             location=self.dir.path / "__cache__",
             backend="xarray_dataset_h5",
@@ -115,6 +125,7 @@ class NetworkView:
         self.best_checkpoint_fn = best_checkpoint_fn
         self.best_checkpoint_fn_kwargs = best_checkpoint_fn_kwargs
         self.recover_fn = recover_fn
+        self._best_checkpoint = best_checkpoint
         self._network_instance = None
         self.decoder = None
         self._initialized = {"network": None, "decoder": None}
@@ -140,6 +151,11 @@ class NetworkView:
         """Setter for _network property."""
         self._network_instance = value
 
+    @property
+    def steady_state_dir(self) -> Path:
+        """Directory of the steady states cached by `Network.cached_steady_state`."""
+        return self.dir.path / "__cache__" / "steady_states"
+
     def _clear_cache(self):
         """Clear the FIFO cache."""
         self.cache = self.cache.__class__(maxsize=self.cache.maxsize)
@@ -252,6 +268,8 @@ class NetworkView:
             str: Path to the checkpoint.
         """
         try:
+            if checkpoint == "best" and self._best_checkpoint is not None:
+                return self._best_checkpoint
             if checkpoint == "best":
                 return self.best_checkpoint_fn(
                     self.dir.path,
@@ -283,6 +301,9 @@ class NetworkView:
             self.recover_fn,
             network=network or self._network.network,
         )
+        if self._network.network is not None:
+            # store steady states alongside the network directory
+            self._network.network.steady_state_dir = self.steady_state_dir
         if self._network.network is not None and not lazy:
             self._network.recover()
         return self._network
@@ -301,7 +322,7 @@ class NetworkView:
 
         if checkpointed_network.network is not None:
             return checkpointed_network.network
-        checkpointed_network.init()
+        checkpointed_network.init().steady_state_dir = self.steady_state_dir
         return checkpointed_network.recover()
 
     def init_decoder(self, checkpoint="best", decoder=None):
@@ -0,0 +1,210 @@
+"""Sparse connectivity matrices for fused synaptic input computation."""
+
+import warnings
+from typing import Callable
+
+import torch
+from torch import Tensor
+
+__all__ = ["SynapticMatrix"]
+
+
+class SynapticMatrix:
+    """Static CSR layout of the target-by-source connectivity of a network.
+
+    The layout is computed once from the edge indices. At every forward call,
+    `weighted_source_sum` binds the current edge weights to the layout to replace
+    the per-edge gather over sources and the scatter over targets by a single
+    sparse matrix product per integration step.
+
+    Args:
+        source_indices: Source node index of each edge. Shape is (n_edges).
+        target_indices: Target node index of each edge. Shape is (n_edges).
+        n_nodes: Number of nodes.
+
+    Attributes:
+        n_nodes (int): Number of nodes.
+        n_edges (int): Number of edges.
+        order (Tensor): Permutation sorting edges by target, then source.
+        crow_indices (Tensor): CSR row pointers of the target-by-source matrix.
+        col_indices (Tensor): CSR column (source) indices.
+        row_indices (Tensor): Row (target) index of each sorted edge.
+        order_t (Tensor): Permutation sorting the sorted edges by source, then
+            target, for the transposed matrix.
+        crow_indices_t (Tensor): CSR row pointers of the source-by-target matrix.
+        col_indices_t (Tensor): CSR column (target) indices of the transpose.
+
+    Raises:
+        ValueError: If the edges contain duplicate (source, target) pairs.
+
+    Example:
+        ```python
+        matrix = SynapticMatrix(network._source_indices, network._target_indices,
+                                network.n_nodes)
+        synaptic_sum = matrix.weighted_source_sum(params.edges.weight)
+        input_current = synaptic_sum(activation(state.nodes.activity))
+        ```
+    """
+
+    def __init__(self, source_indices: Tensor, target_indices: Tensor, n_nodes: int):
+        source_indices = source_indices.long()
+        target_indices = target_indices.long()
+        self.n_nodes = n_nodes
+        self.n_edges = len(source_indices)
+
+        keys = target_indices * n_nodes + source_indices
+        if len(torch.unique(keys)) != self.n_edges:
+            raise ValueError("edges must be unique (source, target) pairs")
+
+        self.order = torch.argsort(keys)
+        self.row_indices = target_indices[self.order]
+        self.col_indices = source_indices[self.order]
+        self.crow_indices = _crow_indices(self.row_indices, n_nodes)
+
+        self.order_t = torch.argsort(self.col_indices * n_nodes + self.row_indices)
+        self.col_indices_t = self.row_indices[self.order_t]
+        self.crow_indices_t = _crow_indices(self.col_indices[self.order_t], n_nodes)
+        self._block_diagonal = None
+
+    def weighted_source_sum(self, weight: Tensor) -> Callable[[Tensor], Tensor]:
+        """Bind edge weights to the layout.
+
+        Args:
+            weight: Edge weights. Shape is (n_edges), or (n_models, 1, n_edges) for
+                stacked parameters of several models.
+
+        Returns:
+            Function mapping a node-level presynaptic signal of shape
+            (..., n_nodes), or (n_models, ..., n_nodes) for stacked parameters, to
+            the weighted sum over the sources of each target node of the same
+            shape.
+
+        Note:
+            Stacked weights are bound to a block-diagonal matrix, so that all models
+            are computed with a single sparse matrix product.
+        """
+        if weight.dim() == 1:
+            values = weight.index_select(-1, self.order)
+
+            def synaptic_sum(x: Tensor) -> Tensor:
+                shape = x.shape
+                y = _CSRMatmul.apply(values, x.reshape(-1, self.n_nodes), self)
+                return y.reshape(shape)
+
+            return synaptic_sum
+
+        n_models = weight.shape[0]
+        matrix = self.block_diagonal(n_models)
+        values = weight.reshape(n_models, self.n_edges).index_select(-1, self.order)
+        values = values.reshape(-1)
+
+        def stacked_synaptic_sum(x: Tensor) -> Tensor:
+            shape = x.shape
+            # (n_models, batch, n_nodes) -> (batch, n_models * n_nodes)
+            x = x.reshape(n_models, -1, self.n_nodes).transpose(0, 1)
+            y = _CSRMatmul.apply(values, x.reshape(x.shape[0], -1), matrix)
+            return y.reshape(-1, n_models, self.n_nodes).transpose(0, 1).reshape(shape)
+
+        return stacked_synaptic_sum
+
+    def block_diagonal(self, n_blocks: int) -> "SynapticMatrix":
+        """Layout of `n_blocks` independent copies of the connectivity.
+
+        Args:
+            n_blocks: Number of diagonal blocks, e.g., models of an ensemble.
+
+        Returns:
+            Layout of shape (n_blocks * n_nodes, n_blocks * n_nodes). Values are
+            expected as the blockwise concatenation of the sorted edge values of
+            each block.
+        """
+        if (
+            self._block_diagonal is not None
+            and self._block_diagonal.n_nodes == n_blocks * self.n_nodes
+        ):
+            return self._block_diagonal
+
+        node_offsets = torch.arange(n_blocks)[:, None] * self.n_nodes
+        edge_offsets = torch.arange(n_blocks)[:, None] * self.n_edges
+
+        matrix = object.__new__(SynapticMatrix)
+        matrix.n_nodes = n_blocks * self.n_nodes
+        matrix.n_edges = n_blocks * self.n_edges
+        matrix.order = (self.order[None] + edge_offsets).reshape(-1)
+        matrix.row_indices = (self.row_indices[None] + node_offsets).reshape(-1)
+        matrix.col_indices = (self.col_indices[None] + node_offsets).reshape(-1)
+        matrix.crow_indices = _crow_indices(matrix.row_indices, matrix.n_nodes)
+        matrix.order_t = (self.order_t[None] + edge_offsets).reshape(-1)
+        matrix.col_indices_t = (self.col_indices_t[None] + node_offsets).reshape(-1)
+        matrix.crow_indices_t = _crow_indices(
+            matrix.col_indices[matrix.order_t], matrix.n_nodes
+        )
+        matrix._block_diagonal = None
+        self._block_diagonal = matrix
+        return matrix
+
+    def csr(self, values: Tensor) -> Tensor:
+        """Return the target-by-source CSR matrix for sorted edge values."""
+        return _sparse_csr(self.crow_indices, self.col_indices, values, self.n_nodes)
+
+    def csr_t(self, values: Tensor) -> Tensor:
+        """Return the source-by-target CSR matrix for sorted edge values."""
+        return _sparse_csr(
+            self.crow_indices_t,
+            self.col_indices_t,
+            values.index_select(-1, self.order_t),
+            self.n_nodes,
+        )
+
+
+class _CSRMatmul(torch.autograd.Function):
+    """Sparse matrix product with a sparse gradient for the edge values.
+
+    Note:
+        The default autograd of sparse CSR products materializes a dense
+        (n_nodes, n_nodes) gradient for the matrix, which is prohibitive for
+        the full connectome.
+    """
+
+    @staticmethod
+    def forward(ctx, values: Tensor, x: Tensor, matrix: SynapticMatrix) -> Tensor:
+        ctx.matrix = matrix
+        ctx.save_for_backward(values, x)
+        with torch.no_grad():
+            return (matrix.csr(values) @ x.T).T
+
+    @staticmethod
+    def backward(ctx, grad_output: Tensor):
+        values, x = ctx.saved_tensors
+        matrix = ctx.matrix
+        grad_values = grad_x = None
+        if ctx.needs_input_grad[0]:
+            grad_values = (
+                grad_output.index_select(-1, matrix.row_indices)
+                * x.index_select(-1, matrix.col_indices)
+            ).sum(dim=0)
+        if ctx.needs_input_grad[1]:
+            grad_x = (matrix.csr_t(values) @ grad_output.T).T
+        return grad_values, grad_x, None
+
+
+def _crow_indices(row_indices: Tensor, n_rows: int) -> Tensor:
+    """Compressed row pointers from sorted row indices."""
+    crow_indices = torch.zeros(n_rows + 1, dtype=torch.long)
+    crow_indices[1:] = torch.bincount(row_indices, minlength=n_rows).cumsum(0)
+    return crow_indices
+
+
+def _sparse_csr(
+    crow_indices: Tensor, col_indices: Tensor, values: Tensor, n_nodes: int
+) -> Tensor:
+    with warnings.catch_warnings():
+        # torch warns that CSR support is in beta state
+        warnings.simplefilter("ignore", UserWarning)
+        return torch.sparse_csr_tensor(
+            crow_indices,
+            col_indices,
+            values,
+            size=(n_nodes, n_nodes),
+            check_invariants=False,
+        )
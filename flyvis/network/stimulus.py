@@ -1,6 +1,17 @@
 """Interface to control the cell-specific stimulus buffer for the network."""
 
-from typing import Any, Callable, Dict, Optional, Protocol, Type, Union, runtime_checkable
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Type,
+    Union,
+    runtime_checkable,
+)
 
 import numpy as np
 import torch
@@ -9,7 +20,7 @@ from torch import Tensor
 
 from flyvis.connectome import ConnectomeFromAvgFilters
 
-__all__ = ["Stimulus"]
+__all__ = ["Stimulus", "CompactStimulus"]
 
 
 @runtime_checkable
@@ -255,6 +266,264 @@ class Stimulus:
         return self.buffer
 
 
+@register_stimulus
+class CompactStimulus:
+    """Stimulus buffer that only stores the input/photoreceptor cells.
+
+    Unlike `Stimulus`, the buffer does not hold all cells but only the input
+    cells, which shrinks the memory of the stimulus and of resetting it by the
+    ratio of all cells to input cells. Other cells are stimulated by a sparse
+    list of perturbations. Calling the stimulus returns itself and the network
+    assembles the stimulus of all cells frame by frame (see `frame`).
+
+    Args:
+        connectome: Connectome directory to retrieve indexes for the stimulus
+            buffer at the respective cell positions.
+        n_samples: Number of samples to initialize the buffer with.
+        n_frames: Number of frames to initialize the buffer with.
+        init_buffer: If False, do not initialize the stimulus buffer.
+
+    Attributes:
+        layer_index (Dict[str, NDArray]): Dictionary of cell type to index array.
+        central_cells_index (Dict[str, int]): Dictionary of cell type to
+            central cell index.
+        input_index (NDArray): Index array of photoreceptors.
+        n_frames (int): Number of frames in the stimulus buffer.
+        n_samples (int): Number of samples in the stimulus buffer.
+        n_nodes (int): Number of nodes of the network.
+        n_input_elements (int): Number of input elements.
+        buffer (Tensor): Input buffer of shape
+            (n_samples, n_frames, n_input_types, n_input_elements).
+        perturbations (List[Tuple[int, int, Tensor, Tensor]]): Start frame, stop
+            frame, node index, and values of shape (n_samples, stop - start,
+            len(node index)) of each perturbation of non-input cells.
+
+    Example:
+        ```python
+        network = Network(
+            stimulus_config=dict(type="CompactStimulus", init_buffer=False)
+        )
+        network.stimulus.add_input(x)
+        response = network(network.stimulus(), dt)
+        ```
+    """
+
+    layer_index: Dict[str, NDArray]
+    central_cells_index: Dict[str, int]
+    input_index: NDArray
+    n_frames: int
+    n_samples: int
+    n_nodes: int
+    n_input_elements: int
+    buffer: Tensor
+    perturbations: List[Tuple[int, int, Tensor, Tensor]]
+
+    def __init__(
+        self,
+        connectome: ConnectomeFromAvgFilters,
+        n_samples: int = 1,
+        n_frames: int = 1,
+        init_buffer: bool = True,
+    ):
+        self.layer_index = {
+            cell_type: index[:]
+            for cell_type, index in connectome.nodes.layer_index.items()
+        }
+        self.central_cells_index = dict(
+            zip(
+                connectome.unique_cell_types[:].astype(str),
+                connectome.central_cells_index[:],
+            )
+        )
+        self.input_index = np.array([
+            self.layer_index[cell_type.decode()]
+            for cell_type in connectome.input_cell_types[:]
+        ])
+        self.n_input_elements = self.input_index.shape[1]
+        self.n_samples, self.n_frames, self.n_nodes = (
+            n_samples,
+            n_frames,
+            len(connectome.nodes.type),
+        )
+        self.connectome = connectome
+        self._input_index = torch.tensor(self.input_index.reshape(-1), dtype=torch.long)
+        self.perturbations = []
+        if init_buffer:
+            self.zero()
+
+    def zero(
+        self,
+        n_samples: Optional[int] = None,
+        n_frames: Optional[int] = None,
+    ) -> None:
+        """Reset the stimulus buffer to zero and remove all perturbations.
+
+        Args:
+            n_samples: Number of samples. If provided, the buffer will be resized.
+            n_frames: Number of frames. If provided, the buffer will be resized.
+        """
+        self.n_samples = n_samples or self.n_samples
+        self.n_frames = n_frames or self.n_frames
+        self.perturbations = []
+        self._nonzero = False
+        if hasattr(self, "buffer") and self.buffer.shape[:2] == (
+            self.n_samples,
+            self.n_frames,
+        ):
+            self.buffer.zero_()
+            return
+        self.buffer = torch.zeros((
+            self.n_samples,
+            self.n_frames,
+            *self.input_index.shape,
+        ))
+
+    @property
+    def nonzero(self) -> bool:
+        """Check if elements have been added to the stimulus buffer.
+
+        Returns:
+            bool: True if elements have been added, even if those elements were all zero.
+        """
+        return self._nonzero
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """Shape (n_samples, n_frames, n_nodes) of the stimulus of all cells."""
+        return (self.n_samples, self.n_frames, self.n_nodes)
+
+    @property
+    def device(self) -> torch.device:
+        return self.buffer.device
+
+    def add_input(
+        self,
+        x: torch.Tensor,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        n_frames_buffer: Optional[int] = None,
+        cumulate: bool = False,
+    ) -> None:
+        """Add input to the input/photoreceptor cells.
+
+        Args:
+            x: Input video of shape (n_samples, n_frames, 1, n_input_elements).
+            start: Temporal start index of the stimulus.
+            stop: Temporal stop index of the stimulus.
+            n_frames_buffer: Number of frames to resize the buffer to.
+            cumulate: If True, add input to the existing buffer.
+
+        Raises:
+            ValueError: If input shape is incorrect.
+            RuntimeError: If input shape doesn't match buffer shape.
+        """
+        shape = x.shape
+        if len(shape) != 4:
+            raise ValueError(
+                f"input has shape {x.shape} but must have "
+                "(n_samples, n_frames, 1, n_input_elements)"
+            )
+        n_samples, n_frames_input = shape[:2]
+
+        if not hasattr(self, "buffer") or not cumulate and self.nonzero:
+            self.zero(n_samples, n_frames_buffer or n_frames_input)
+
+        try:
+            self.buffer[:, slice(start, stop)] += x.to(self.buffer.device)
+        except RuntimeError as e:
+            raise RuntimeError(
+                f"input has shape {x.shape} but buffer has shape {self.buffer.shape}"
+            ) from e
+        self._nonzero = True
+
+    def add_pre_stim(
+        self,
+        x: torch.Tensor,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        n_frames_buffer: Optional[int] = None,
+    ) -> None:
+        """Add a constant or sequence of constants to the input/photoreceptor cells.
+
+        Args:
+            x: Grey value(s). If Tensor, must have length `n_frames` or `stop - start`.
+            start: Start index in time.
+            stop: Stop index in time.
+            n_frames_buffer: Number of frames to resize the buffer to.
+
+        Raises:
+            RuntimeError: If input shape doesn't match buffer shape.
+        """
+        if not hasattr(self, "buffer") or self.nonzero:
+            self.zero(None, n_frames_buffer)
+
+        try:
+            if isinstance(x, torch.Tensor) and x.ndim == 1:
+                self.buffer[:, slice(start, stop)] += x.view(1, len(x), 1, 1)
+            else:
+                self.buffer[:, slice(start, stop)] += x
+        except RuntimeError as e:
+            raise RuntimeError(
+                f"input has shape {x.shape} but buffer has shape {self.buffer.shape}"
+            ) from e
+        self._nonzero = True
+
+    def add_perturbation(
+        self,
+        index: Union[NDArray, Tensor],
+        x: Union[float, Tensor],
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> None:
+        """Add a perturbation to arbitrary cells, e.g., non-input cells.
+
+        Args:
+            index: Node index of the perturbed cells.
+            x: Perturbation, broadcastable to (n_samples, stop - start, len(index)).
+            start: Start index in time.
+            stop: Stop index in time.
+        """
+        if not hasattr(self, "buffer"):
+            self.zero()
+        start, stop, _ = slice(start, stop).indices(self.n_frames)
+        index = torch.as_tensor(index, dtype=torch.long, device=self.buffer.device)
+        x = torch.as_tensor(x, dtype=self.buffer.dtype, device=self.buffer.device)
+        x = x.expand(self.n_samples, stop - start, len(index))
+        self.perturbations.append((start, stop, index, x))
+        self._nonzero = True
+
+    def frame(self, t: int) -> Tensor:
+        """Return the stimulus of all cells at frame t.
+
+        Args:
+            t: Frame index.
+
+        Returns:
+            Stimulus of shape (n_samples, n_nodes).
+        """
+        frame = self.buffer.new_zeros(self.n_samples, self.n_nodes).index_copy(
+            -1,
+            self._input_index.to(self.buffer.device),
+            self.buffer[:, t].reshape(self.n_samples, -1),
+        )
+        for start, stop, index, x in self.perturbations:
+            if start <= t < stop:
+                frame = frame.index_add(-1, index, x[:, t - start])
+        return frame
+
+    def dense(self) -> Tensor:
+        """Return the stimulus of all cells of shape (n_samples, n_frames, n_nodes)."""
+        return torch.stack([self.frame(t) for t in range(self.n_frames)], dim=1)
+
+    def __call__(self) -> "CompactStimulus":
+        """Return the stimulus, consumed frame by frame by the network.
+
+        Returns:
+            CompactStimulus: The stimulus itself.
+        """
+        return self
+
+
 def is_stimulus_protocol(obj: Any) -> bool:
     return isinstance(obj, StimulusProtocol)
 
@@ -15,12 +15,15 @@ from flyvis.network.directories import NetworkDir
 from flyvis.network.network import Network
 from flyvis.task.tasks import Task
 from flyvis.utils.chkpt_utils import (
+    CheckpointWriter,
+    cpu_snapshot,
     recover_decoder,
     recover_network,
     recover_optimizer,
     recover_penalty_optimizers,
     resolve_checkpoints,
 )
+from flyvis.utils.dataset_utils import batch_to_device
 from flyvis.utils.tensor_utils import asymmetric_weighting
 
 logging = logging.getLogger(__name__)
@@ -121,6 +124,12 @@ class MultiTaskSolver:
         self.checkpoints = checkpoints.indices
         self._last_chkpt_ind = -1
         self._curr_chkpt_ind = -1
+        # Serializes checkpoints in the background if enabled.
+        self._checkpoint_writer = (
+            CheckpointWriter()
+            if self.config.get("checkpointing", {}).get("async_save", False)
+            else None
+        )
 
         self._initialized = self._init_solver(
             init_network=init_network,
@@ -245,6 +254,12 @@ class MultiTaskSolver:
             OverflowError: If the activity or loss reports NaN values for more
                 than 100 iterations.
 
+        Note:
+            The memory of backpropagation through time scales with the number of
+            frames. Set `bptt.checkpoint_chunk` in the config to recompute the
+            states within chunks of frames during the backward pass, and
+            `bptt.tbptt_window` to truncate gradients to windows of frames.
+
         Stores:
             ```bash
             dir / loss.h5
@@ -280,6 +295,12 @@ class MultiTaskSolver:
         # This is after how many epochs the training states are checkpointed.
         chkpt_every_epoch = self.config.scheduler.chkpt_every_epoch
 
+        # Gradient checkpointing and truncation of backpropagation through time.
+        bptt = self.config.get("bptt", Namespace())
+
+        # The dataset returns CPU tensors, batches are moved to the network.
+        device = next(self.network.parameters()).device
+
         logging.info("Training for %s epochs.", n_epochs)
         logging.info("Checkpointing every %s epochs.", chkpt_every_epoch)
 
@@ -324,6 +345,8 @@ class MultiTaskSolver:
                             self.network.stimulus(),
                             self.task.dataset.dt,
                             state=steady_state,
+                            checkpoint_chunk=bptt.get("checkpoint_chunk", None),
+                            tbptt_window=bptt.get("tbptt_window", None),
                         )
 
                         losses = {task: 0 for task in self.task.dataset.tasks}
@@ -341,8 +364,9 @@ class MultiTaskSolver:
                         # loss function.
                         loss = sum(losses.values())
 
-                        # Compute gradients.
-                        loss.backward(retain_graph=True)
+                        # Compute gradients. The graph is only retained for the
+                        # activity penalty that backpropagates through it again.
+                        loss.backward(retain_graph=self.penalty.penalizes_activity)
                         # Update parameters.
                         self.optimizer.step()
 
@@ -364,7 +388,9 @@ class MultiTaskSolver:
                         return loss, mean_activity
 
                     # Call closure.
-                    loss, mean_activity = handle_batch(data, steady_state)
+                    loss, mean_activity = handle_batch(
+                        batch_to_device(data, device), steady_state
+                    )
 
                     # Increment iteration count.
                     self.iteration += 1
@@ -390,16 +416,20 @@ class MultiTaskSolver:
                     for task in self.task.dataset.tasks:
                         self.dir[f"loss_{task}"] = loss_per_task[f"loss_{task}"]
 
-                    self.checkpoint()
+                    # The last checkpoint is always fully evaluated.
+                    self.checkpoint(
+                        full_evaluation=True if epoch + 1 == n_epochs else None
+                    )
 
                 logging.info("Finished epoch.")
 
+        self.wait_for_checkpoints()
         time_elapsed = time.time() - start_time
         time_trained = self.dir.time_trained[()] if "time_trained" in self.dir else 0
         self.dir.time_trained = time_elapsed + time_trained
         logging.info("Finished training.")
 
-    def checkpoint(self) -> None:
+    def checkpoint(self, full_evaluation: Optional[bool] = None) -> None:
         """Creates a checkpoint.
 
         Validates on the validation data calling ~self.test.
@@ -407,6 +437,18 @@ class MultiTaskSolver:
         Stores a checkpoint of the network, decoder and optimizer parameters using
         pytorch's pickle function.
 
+        Args:
+            full_evaluation: Whether to test on the full validation and training
+                data. Defaults to every `checkpointing.full_eval_every`-th
+                checkpoint. Otherwise, only the validation and training batch are
+                tested and NaN losses are stored for the full data.
+
+        Note:
+            With `checkpointing.async_save`, the state dicts are copied to the CPU
+            and serialized in a background thread while training continues. The
+            checkpoint index is stored after the checkpoint file is written. Call
+            `wait_for_checkpoints` to block until then.
+
         Stores:
             ```bash
             dir / chkpt_index.h5  # (List): numerical identifier of the checkpoint.
@@ -422,17 +464,31 @@ class MultiTaskSolver:
         self._last_chkpt_ind += 1
         self._curr_chkpt_ind += 1
 
+        if full_evaluation is None:
+            full_eval_every = self.config.get("checkpointing", {}).get(
+                "full_eval_every", 1
+            )
+            full_evaluation = self._last_chkpt_ind % full_eval_every == 0
+
         # Tracking of validation loss and training batch loss.
-        logging.info("Test on validation data.")
-        val_loss = self.test(
-            dataloader=self.task.val_data, subdir="validation", track_loss=True
-        )
+        if full_evaluation:
+            logging.info("Test on validation data.")
+            val_loss = self.test(
+                dataloader=self.task.val_data, subdir="validation", track_loss=True
+            )
+        else:
+            val_loss = self._skip_test(subdir="validation")
         logging.info("Test on validation batch.")
         _ = self.test(
             dataloader=self.task.val_batch, subdir="validation_batch", track_loss=True
         )
-        logging.info("Test on training data.")
-        _ = self.test(dataloader=self.task.train_data, subdir="training", track_loss=True)
+        if full_evaluation:
+            logging.info("Test on training data.")
+            _ = self.test(
+                dataloader=self.task.train_data, subdir="training", track_loss=True
+            )
+        else:
+            _ = self._skip_test(subdir="training")
         logging.info("Test on training batch.")
         _ = self.test(
             dataloader=self.task.train_batch, subdir="training_batch", track_loss=True
@@ -455,21 +511,47 @@ class MultiTaskSolver:
         }
         if hasattr(self, "penalty"):
             chkpt.update(self.penalty._chkpt())
-        torch.save(chkpt, self.checkpoint_path / f"chkpt_{self._last_chkpt_ind:05}")
-
-        # Append chkpt index.
-        self.checkpoints.append(self._last_chkpt_ind)
-        self.dir.extend("chkpt_index", [self._last_chkpt_ind])
-        self.dir.extend("chkpt_iter", [self.iteration - 1])
-        self.dir.dt = self.task.dataset.dt
 
         # Overwrite best val loss.
-        if val_loss < self._val_loss:
-            self.dir.best_chkpt_index = self._last_chkpt_ind
+        is_best = val_loss < self._val_loss
+        if is_best:
             self._val_loss = val_loss
 
+        self.checkpoints.append(self._last_chkpt_ind)
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.submit(
+                self._write_checkpoint,
+                cpu_snapshot(chkpt),
+                self._last_chkpt_ind,
+                is_best,
+            )
+        else:
+            self._write_checkpoint(chkpt, self._last_chkpt_ind, is_best)
+
         logging.info("Checkpointed.")
 
+    def _write_checkpoint(self, chkpt: dict, index: int, is_best: bool) -> None:
+        """Stores the checkpoint and appends its index."""
+        torch.save(chkpt, self.checkpoint_path / f"chkpt_{index:05}")
+        self.dir.extend("chkpt_index", [index])
+        self.dir.extend("chkpt_iter", [chkpt["iteration"]])
+        self.dir.dt = chkpt["dt"]
+        if is_best:
+            self.dir.best_chkpt_index = index
+
+    def wait_for_checkpoints(self) -> None:
+        """Blocks until checkpoints written in the background are stored."""
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.wait()
+
+    def _skip_test(self, subdir: str) -> float:
+        """Stores NaN losses for a checkpoint without test on the subdir data."""
+        for task in self.task.dataset.tasks:
+            self.dir[subdir].extend("loss" + "_" + task, [np.nan])
+        self.dir[subdir].extend("iteration", [self.iteration])
+        self.dir[subdir].extend("loss", [np.nan])
+        return np.nan
+
     @torch.no_grad()
     def test(
         self,
@@ -503,17 +585,21 @@ class MultiTaskSolver:
         # Update hypterparams.
         self.scheduler(self.iteration)
 
-        initial_state = self.network.steady_state(
-            t_pre=t_pre,
-            dt=self.task.dataset.dt,
-            batch_size=dataloader.batch_size,
-            value=0.5,
-        )
         losses = {task: () for task in self.task.dataset.tasks}  # type: Dict[str, Tuple]
+        device = next(self.network.parameters()).device
 
         with self.task.dataset.augmentation(False):
             for _, data in enumerate(dataloader):
+                data = batch_to_device(data, device)
                 n_samples, n_frames, _, _ = data["lum"].shape
+                # The steady state is cached and broadcast to the batch size, which
+                # can be smaller for the last batch.
+                initial_state = self.network.steady_state(
+                    t_pre=t_pre,
+                    dt=self.task.dataset.dt,
+                    batch_size=n_samples,
+                    value=0.5,
+                )
                 self.network.stimulus.zero(n_samples, n_frames)
 
                 self.network.stimulus.add_input(data["lum"])
@@ -528,11 +614,19 @@ class MultiTaskSolver:
                     y = data[task]
                     y_est = self.decoder[task](activity)
 
-                    losses[task] += (
-                        self.task.loss(y_est, y, task, **data.get("loss_kwargs", {}))
+                    # Loss per sample to average over samples of padded batches.
+                    losses[task] += tuple(
+                        self.task.loss(
+                            y_est,
+                            y,
+                            task,
+                            reduction="none",
+                            **data.get("loss_kwargs", {}),
+                        )
                         .detach()
                         .cpu()
-                        .item(),
+                        .reshape(-1)
+                        .tolist()
                     )
 
         # track loss per task.
@@ -625,6 +719,9 @@ class MultiTaskSolver:
         # The _val_loss variable is used to keep track of the best checkpoint according
         # to the evaluation routine during training.
         self._val_loss = state_dict.pop("val_loss", float("inf"))
+        if np.isnan(self._val_loss):
+            # Checkpoints without full evaluation have no validation loss.
+            self._val_loss = float("inf")
 
         if network and "network" in self._initialized:
             recover_network(self.network, state_dict)
@@ -792,8 +889,7 @@ class Penalty:
             and self.param_list_act_pen
         ):
             raise ValueError(
-                "Activity penalty is enabled but no activity penalty parameters are "
-                "set."
+                "Activity penalty is enabled but no activity penalty parameters are set."
             )
 
     def __repr__(self):
@@ -827,6 +923,11 @@ class Penalty:
             else:
                 self.activity_optim = None
 
+    @property
+    def penalizes_activity(self) -> bool:
+        """Whether the next call backpropagates the activity penalty."""
+        return self.activity_optim is not None
+
     def _chkpt(self) -> dict:
         """Returns a dictionary of all state dicts of all optimizer instances."""
         _chkpt = {}
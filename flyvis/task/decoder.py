@@ -1,6 +1,7 @@
 """Modules for decoding the DMN activity."""
 
 import logging
+from functools import partial
 from typing import Dict, List, Optional, Union
 
 import numpy as np
@@ -187,6 +188,94 @@ class Conv2dHexSpace(Conv2dConstWeight):
         return super().forward(x)
 
 
+class ConvHexSpace(Conv2dHexSpace):
+    """
+    Convolution with hexagonal filters directly on the hexals of a regular lattice.
+
+    Equivalent to Conv2dHexSpace with 'same' padding on hexals stored in the square
+    map, without allocating the map. Inputs are gathered from precomputed neighbor
+    index tables with zeros outside of the lattice. Parameters are stored like in
+    Conv2dHexSpace so that state dicts are interchangeable.
+
+    Info:
+        kernel_size must be odd!
+
+    Args:
+        in_channels: Number of input channels.
+        out_channels: Number of output channels.
+        kernel_size: Size of the convolutional kernel.
+        extent: Radius of the hexagonal lattice.
+        const_weight: Optional constant value for weight initialization.
+            If None, the standard PyTorch initialization is used.
+        **kwargs: Additional keyword arguments for Conv2d.
+
+    Attributes:
+        ku: Row indices of the hexagonal filter taps in the weight.
+        kv: Column indices of the hexagonal filter taps in the weight.
+        neighbor_index: Flat index of the input hexal and tap for each output hexal
+            and tap, of shape (n_hexals * n_taps). Taps outside the lattice point
+            to a zero padding.
+    """
+
+    def __init__(
+        self,
+        in_channels: int,
+        out_channels: int,
+        kernel_size: int,
+        extent: int,
+        const_weight: Optional[float] = 1e-3,
+        **kwargs,
+    ):
+        super().__init__(
+            in_channels,
+            out_channels,
+            kernel_size,
+            const_weight,
+            padding=kernel_size // 2,
+            **kwargs,
+        )
+        du, dv = get_hex_coords(kernel_size // 2)
+        u, v = get_hex_coords(extent)
+        index = {(_u, _v): i for i, (_u, _v) in enumerate(zip(u, v))}
+        n_hexals = len(u)
+        # (n_hexals, n_taps), n_hexals indexes the zero padding.
+        neighbors = np.array([
+            [index.get((_u + _du, _v + _dv), n_hexals) for _du, _dv in zip(du, dv)]
+            for _u, _v in zip(u, v)
+        ])
+        # Rows of the flattened (n_hexals + 1, n_taps, ...) input.
+        neighbor_index = neighbors * len(du) + np.arange(len(du))
+        self.register_buffer("ku", torch.tensor(du + kernel_size // 2), persistent=False)
+        self.register_buffer("kv", torch.tensor(dv + kernel_size // 2), persistent=False)
+        self.register_buffer(
+            "neighbor_index", torch.tensor(neighbor_index.flatten()), persistent=False
+        )
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Forward pass of the ConvHexSpace layer.
+
+        Args:
+            x: Input tensor of shape (N, in_channels, n_hexals).
+
+        Returns:
+            Output tensor of shape (N, out_channels, n_hexals).
+        """
+        n_samples, _, n_hexals = x.shape
+        # (out_channels, in_channels, n_taps), implicitly masked to the hexagon.
+        weight = self.weight[:, :, self.ku, self.kv]
+        # Mixing channels first is cheaper than gathering all input channels.
+        # Hexals lead such that the gather copies contiguous rows.
+        # (n_hexals + 1, n_taps, N, out_channels)
+        x = nnf.pad(torch.einsum("oct,nch->htno", weight, x), (0, 0, 0, 0, 0, 0, 0, 1))
+        # (n_hexals, N, out_channels)
+        x = x.flatten(0, 1).index_select(0, self.neighbor_index)
+        x = x.view(n_hexals, -1, n_samples, self.out_channels).sum(dim=1)
+        if self.bias is not None:
+            x = x + self.bias
+        return x.permute(1, 2, 0)
+
+
 class DecoderGAVP(ActivityDecoder):
     """
     Fully convolutional decoder with optional global average pooling.
@@ -201,6 +290,11 @@ class DecoderGAVP(ActivityDecoder):
         const_weight: Constant value for weight initialization.
         normalize_last: Whether to normalize the last layer.
         activation: Activation function to use.
+        hex_native: Whether to convolve directly on the hexals instead of in the
+            square map storage. Exactly equivalent for a single convolution. With
+            hidden layers, activity is only kept on the hexals, i.e., values that
+            the square map accumulates outside of the lattice are zero and batch
+            normalization statistics are computed over the hexals only.
 
     Attributes:
         _out_channels: Number of output channels before reshaping.
@@ -224,9 +318,18 @@ class DecoderGAVP(ActivityDecoder):
         const_weight: Optional[float] = None,
         normalize_last: bool = True,
         activation: str = "Softplus",
+        hex_native: bool = False,
     ):
         super().__init__(connectome)
         p = int((kernel_size - 1) / 2)
+        extent = connectome.config.extent
+        self.hex_native = hex_native
+        if hex_native:
+            conv = partial(ConvHexSpace, extent=extent)
+            batch_norm_fn = nn.BatchNorm1d
+        else:
+            conv = partial(Conv2dHexSpace, padding=p)
+            batch_norm_fn = nn.BatchNorm2d
         in_channels = len(connectome.output_cell_types)
         out_channels = shape[-1]
         self._out_channels = out_channels
@@ -240,16 +343,15 @@ class DecoderGAVP(ActivityDecoder):
             if c == 0:
                 continue
             self.base.append(
-                Conv2dHexSpace(
+                conv(
                     in_channels,
                     c,
                     kernel_size,
                     const_weight=const_weight,
-                    padding=p,
                 )
             )
             if batch_norm:
-                self.base.append(nn.BatchNorm2d(c))
+                self.base.append(batch_norm_fn(c))
             self.base.append(getattr(nn, activation)())
             if p_dropout:
                 self.base.append(nn.Dropout(p_dropout))
@@ -258,14 +360,13 @@ class DecoderGAVP(ActivityDecoder):
 
         self.decoder = []
         if len(self.base) == 0 and batch_norm:
-            self.decoder.append(nn.BatchNorm2d(in_channels))
+            self.decoder.append(batch_norm_fn(in_channels))
         self.decoder.append(
-            Conv2dHexSpace(
+            conv(
                 in_channels,
                 self.out_channels + 1 if normalize_last else self.out_channels,
                 kernel_size,
                 const_weight=const_weight,
-                padding=p,
             )
         )
         self.decoder = nn.Sequential(*self.decoder)
@@ -299,6 +400,16 @@ class DecoderGAVP(ActivityDecoder):
         # (n_frames, #samples, #outputneurons, n_hexals)
         n_samples, n_frames, in_channels, n_hexals = x.shape
 
+        if self.hex_native:
+            # (#samples*n_frames, out_channels + 1, n_hexals)
+            out = self.decoder(self.base(x.reshape(-1, in_channels, n_hexals)))
+            if self.normalize_last:
+                out = out[:, : self.out_channels] / (
+                    nnf.softplus(out[:, self.out_channels :]) + 1
+                )
+            out = out.view(n_samples, n_frames, self.out_channels, n_hexals)
+            return self._head(out, n_samples, n_frames)
+
         # Store hexals in square map.
         # (n_frames, #samples, #outputneurons, H, W)
         x_map = torch.zeros([n_samples, n_frames, in_channels, self.H, self.W])
@@ -324,11 +435,14 @@ class DecoderGAVP(ActivityDecoder):
             :, :, :, self.u, self.v
         ]
 
+        return self._head(out, n_samples, n_frames)
+
+    def _head(self, out: torch.Tensor, n_samples: int, n_frames: int) -> torch.Tensor:
+        """Applies the global average pooling head if n_out_features is set."""
         if self.n_out_features is not None:
             out = self.head(out).view(
                 n_samples, n_frames, self._out_channels, self.n_out_features
             )
-
         return out
 
 
@@ -1,38 +1,96 @@
 """Loss functions compatible with torch loss function API."""
 
-from typing import Any
+import inspect
+from typing import Any, Callable, Literal
 
 import torch
 
 __all__ = ["l2norm", "epe"]
 
 
-def l2norm(y_est: torch.Tensor, y_gt: torch.Tensor, **kwargs: Any) -> torch.Tensor:
+def l2norm(
+    y_est: torch.Tensor,
+    y_gt: torch.Tensor,
+    reduction: Literal["mean", "none"] = "mean",
+    **kwargs: Any,
+) -> torch.Tensor:
     """
     Calculate the mean root cumulative squared error across the last three dimensions.
 
     Args:
         y_est: The estimated tensor.
-        y_gt: The ground truth tensor.
+        y_gt: The ground truth tensor. NaN entries, e.g., padded frames, are ignored.
+        reduction: Either `mean` to average over samples or `none` to return the
+            error of each sample.
         **kwargs: Additional keyword arguments.
 
     Returns:
         The mean root cumulative squared error.
     """
-    return (((y_est - y_gt) ** 2).sum(dim=(1, 2, 3))).sqrt().mean()
+    # masked before the arithmetic, so NaN targets also have no gradient
+    error = torch.where(y_gt.isnan(), 0, y_est - torch.nan_to_num(y_gt))
+    loss = (error**2).sum(dim=(1, 2, 3)).sqrt()
+    return loss.mean() if reduction == "mean" else loss
 
 
-def epe(y_est: torch.Tensor, y_gt: torch.Tensor, **kwargs: Any) -> torch.Tensor:
+def epe(
+    y_est: torch.Tensor,
+    y_gt: torch.Tensor,
+    reduction: Literal["mean", "none"] = "mean",
+    **kwargs: Any,
+) -> torch.Tensor:
     """
     Calculate the average endpoint error, conventionally reported in optic flow tasks.
 
     Args:
         y_est: The estimated tensor with shape
             (samples, frames, ndim, hexals_or_features).
-        y_gt: The ground truth tensor with the same shape as y_est.
+        y_gt: The ground truth tensor with the same shape as y_est. NaN entries,
+            e.g., padded frames, are ignored and samples without valid entries
+            have zero error.
+        reduction: Either `mean` to average over samples or `none` to return the
+            error of each sample.
         **kwargs: Additional keyword arguments.
 
     Returns:
         The average endpoint error.
     """
-    return torch.sqrt(((y_est - y_gt) ** 2).sum(dim=2)).mean()
+    valid = ~y_gt.isnan().any(dim=2)
+    # masked before the arithmetic, so NaN targets also have no gradient
+    diff = torch.where(y_gt.isnan(), 0, y_est - torch.nan_to_num(y_gt))
+    squared_norm = torch.where(valid, (diff**2).sum(dim=2), 1)
+    error = torch.where(valid, squared_norm.sqrt(), 0)
+    loss = error.sum(dim=(1, 2)) / valid.sum(dim=(1, 2)).clamp(min=1)
+    return loss.mean() if reduction == "mean" else loss
+
+
+def sample_losses(
+    loss_fn: Callable[..., torch.Tensor],
+    y_est: torch.Tensor,
+    y_gt: torch.Tensor,
+    **kwargs: Any,
+) -> torch.Tensor:
+    """
+    Calculate the loss of each sample of a batch.
+
+    Loss functions with a `reduction` argument, like `l2norm` and `epe`, are called
+    once with `reduction="none"`. Other loss functions, e.g., with signature
+    `(y_est, y_gt, **kwargs)`, are called for each sample without its padded frames.
+
+    Args:
+        loss_fn: The loss function.
+        y_est: The estimated tensor with shape (samples, frames, ...).
+        y_gt: The ground truth tensor with the same shape as y_est. Frames that are
+            NaN entirely are padding.
+        **kwargs: Additional keyword arguments for the loss function.
+
+    Returns:
+        The loss of each sample with shape (samples,).
+    """
+    if "reduction" in inspect.signature(loss_fn).parameters:
+        return loss_fn(y_est, y_gt, reduction="none", **kwargs).reshape(-1)
+    losses = []
+    for est, gt in zip(y_est, y_gt):
+        frames = ~gt.isnan().flatten(start_dim=1).all(dim=1)
+        losses.append(loss_fn(est[None, frames], gt[None, frames], **kwargs).reshape(()))
+    return torch.stack(losses)
@@ -1,5 +1,5 @@
 import logging
-from typing import Dict
+from typing import Any, Dict, Optional
 
 import torch
 from datamate import Namespace
@@ -9,7 +9,7 @@ from torch.utils.data import DataLoader, sampler
 from flyvis.connectome import ConnectomeFromAvgFilters
 from flyvis.datasets.datasets import MultiTaskDataset
 from flyvis.utils.class_utils import forward_subclass
-from flyvis.utils.dataset_utils import IndexSampler
+from flyvis.utils.dataset_utils import IndexSampler, pad_collate, seed_worker
 
 from . import objectives
 from .decoder import ActivityDecoder
@@ -28,9 +28,20 @@ class Task:
         fold: Current fold number. Defaults to 1.
         seed: Random seed for reproducibility. Defaults to 0.
         original_split: Whether to use the original data split. Defaults to False.
+        num_workers: Number of worker processes that load and augment the
+            training and validation data in parallel. Defaults to 0, i.e., loading
+            in the main process. Workers load on the CPU, so batches must be
+            moved to the device of the network, e.g., with `batch_to_device`.
+        persistent_workers: Whether to keep the worker processes alive between
+            epochs. Defaults to False.
+        prefetch_factor: Number of batches loaded in advance by each worker.
+            Defaults to None, i.e., the default of torch.
+        val_batch_size: Size of each validation batch. Sequences of different
+            lengths are padded with NaNs. Defaults to 1.
 
     Attributes:
         batch_size: Size of each batch.
+        val_batch_size: Size of each validation batch.
         n_iters: Number of iterations.
         n_folds: Number of folds for cross-validation.
         fold: Current fold number.
@@ -45,6 +56,11 @@ class Task:
         val_data (DataLoader): DataLoader for validation data.
         val_batch (DataLoader): DataLoader for a single validation batch.
         overfit_data (DataLoader): DataLoader for overfitting on a single sample.
+
+    Note:
+        Worker processes hold copies of the dataset. Persistent workers do not see
+        changes to the dataset made after their first epoch, e.g., of dt by the
+        scheduler or of the augmentation state by the solver.
     """
 
     def __init__(
@@ -59,13 +75,21 @@ class Task:
         fold: int = 1,
         seed: int = 0,
         original_split: bool = False,
+        num_workers: int = 0,
+        persistent_workers: bool = False,
+        prefetch_factor: Optional[int] = None,
+        val_batch_size: int = 1,
     ):
         self.batch_size = batch_size
+        self.val_batch_size = val_batch_size
         self.n_iters = n_iters
         self.n_folds = n_folds
         self.fold = fold
         self.seed = seed
         self.decoder = decoder
+        self.num_workers = num_workers
+        self.persistent_workers = persistent_workers
+        self.prefetch_factor = prefetch_factor
 
         # Initialize dataset.
         self.dataset = forward_subclass(MultiTaskDataset, dataset)
@@ -90,6 +114,7 @@ class Task:
             batch_size=batch_size,
             sampler=sampler.SubsetRandomSampler(self.train_seq_index),
             drop_last=True,
+            **self.loader_kwargs(),
         )
         self.train_batch = DataLoader(
             self.dataset,
@@ -104,13 +129,16 @@ class Task:
 
         self.val_data = DataLoader(
             self.dataset,
-            batch_size=1,
+            batch_size=self.val_batch_size,
             sampler=IndexSampler(self.val_seq_index),
+            collate_fn=pad_collate,
+            **self.loader_kwargs(),
         )
         self.val_batch = DataLoader(
             self.dataset,
             batch_size=batch_size,
             sampler=IndexSampler(self.val_seq_index[:batch_size]),
+            **self.loader_kwargs(),
         )
         logging.info(
             "Initialized dataloader with validation sequence indices \n%s",
@@ -120,6 +148,22 @@ class Task:
         # Initialize overfitting loader.
         self.overfit_data = DataLoader(self.dataset, sampler=IndexSampler([0]))
 
+    def loader_kwargs(self) -> Dict[str, Any]:
+        """Returns the keyword arguments of DataLoaders for parallel loading.
+
+        Each loader draws the seeds of its workers from its own generator, such
+        that the augmentation in the workers is reproducible for a fixed seed.
+        """
+        if not self.num_workers:
+            return {}
+        return dict(
+            num_workers=self.num_workers,
+            persistent_workers=self.persistent_workers,
+            prefetch_factor=self.prefetch_factor,
+            worker_init_fn=seed_worker,
+            generator=torch.Generator().manual_seed(self.seed),
+        )
+
     def init_decoder(
         self, connectome: ConnectomeFromAvgFilters
     ) -> Dict[str, ActivityDecoder]:
@@ -134,7 +178,12 @@ class Task:
         return init_decoder(self.decoder, connectome)
 
     def loss(
-        self, input: torch.Tensor, target: torch.Tensor, task: str, **kwargs
+        self,
+        input: torch.Tensor,
+        target: torch.Tensor,
+        task: str,
+        reduction: str = "mean",
+        **kwargs,
     ) -> torch.Tensor:
         """Returns the task loss multiplied with the task weight.
 
@@ -142,16 +191,18 @@ class Task:
             input: Input tensor.
             target: Target tensor.
             task: Task name.
+            reduction: Either `mean` for the loss of the batch or `none` for the
+                loss of each sample, see `objectives.sample_losses`.
             **kwargs: Additional keyword arguments for the loss function.
 
         Returns:
             Weighted task loss.
         """
-        return (
-            self.task_weights[task]
-            * self.losses[task](input, target, **kwargs)
-            / self.task_weights_sum
-        )
+        if reduction == "none":
+            loss = objectives.sample_losses(self.losses[task], input, target, **kwargs)
+        else:
+            loss = self.losses[task](input, target, **kwargs)
+        return self.task_weights[task] * loss / self.task_weights_sum
 
     def init_task_weights(self, task_weights: Dict[str, float]) -> Dict[str, float]:
         """Returns the task weights.
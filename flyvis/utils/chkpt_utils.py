@@ -1,8 +1,9 @@
 import logging
 import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -235,7 +236,8 @@ def best_checkpoint_default_fn(
     checkpoint_dir = networkdir.chkpts.path
     indices, paths = checkpoint_index_to_path_map(checkpoint_dir, glob="chkpt_*")
     loss_file_name = check_loss_name(networkdir[validation_subdir], loss_file_name)
-    index = np.argmin(networkdir[validation_subdir][loss_file_name][()])
+    # checkpoints without evaluation have NaN losses
+    index = np.nanargmin(networkdir[validation_subdir][loss_file_name][()])
     index = indices[index]
     path = paths[index]
     return path
@@ -263,6 +265,66 @@ def check_loss_name(loss_folder, loss_file_name: str) -> str:
     return loss_file_name
 
 
+def cpu_snapshot(state: Any) -> Any:
+    """
+    Copy all tensors of a nested state, e.g., of state dicts, to the CPU.
+
+    Args:
+        state: Tensor or nested dicts, lists and tuples of tensors and other values.
+
+    Returns:
+        The state with copies of all tensors that do not share memory with the
+        original tensors, such that the original can be updated in place.
+    """
+    if isinstance(state, torch.Tensor):
+        return state.detach().to("cpu", copy=True)
+    if isinstance(state, dict):
+        return type(state)((key, cpu_snapshot(value)) for key, value in state.items())
+    if isinstance(state, (list, tuple)):
+        return type(state)(cpu_snapshot(value) for value in state)
+    return state
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints in a background thread.
+
+    Jobs run one after another in the order of submission. Submitting a job
+    waits for the previous one, such that at most one checkpoint is pending and
+    errors surface in the training process.
+
+    Attributes:
+        pending: Future of the last submitted job.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.pending: Optional[Future] = None
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """
+        Run fn(*args, **kwargs) in the background after the previous job.
+
+        Args:
+            fn: Function writing the checkpoint. Must not share mutable state with
+                the caller, e.g., receive a snapshot of the state dicts.
+            *args: Positional arguments to fn.
+            **kwargs: Keyword arguments to fn.
+
+        Returns:
+            Future of the job.
+        """
+        self.wait()
+        self.pending = self._executor.submit(fn, *args, **kwargs)
+        return self.pending
+
+    def wait(self) -> None:
+        """Block until the pending job is done and raise its exception if any."""
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            pending.result()
+
+
 if __name__ == "__main__":
     nv = flyvis.NetworkView("flow/9998/000")
     print(resolve_checkpoints(nv.dir))
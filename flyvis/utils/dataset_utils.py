@@ -1,10 +1,13 @@
 """Dataset utilities."""
 
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
+import torch
+import torch.nn.functional as nnf
 from numpy.random import RandomState
 from torch.hub import download_url_to_file
+from torch.utils.data import default_collate
 from torch.utils.data.sampler import Sampler
 
 import flyvis
@@ -229,3 +232,86 @@ class IndexSampler(Sampler):
 
     def __len__(self) -> int:
         return len(self.indices)
+
+
+def seed_worker(worker_id: int) -> None:
+    """Seeds numpy's global random state in a DataLoader worker process.
+
+    Note:
+        To be used as `worker_init_fn` of torch.utils.data.DataLoader. Torch seeds
+        each worker with the base seed of the loader plus the worker id. Without
+        this, all workers inherit the same numpy random state from the main
+        process and sample the same augmentation parameters.
+
+        Forked workers also inherit the default device of the main process,
+        e.g., cuda after `flyvis.device` is set. Workers load and augment on the
+        CPU instead, so batches must be moved to the device with `.to(device)`
+        or `batch_to_device`.
+
+    Args:
+        worker_id: Id of the worker process.
+    """
+    torch.set_default_device("cpu")
+    np.random.seed(torch.initial_seed() % 2**32)
+
+
+def pad_collate(batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Collates samples of different lengths by padding frames with NaNs.
+
+    Note:
+        To be used as `collate_fn` of torch.utils.data.DataLoader. Sequences of
+        shape (frames, ...) are padded at the end to the longest sequence of the
+        batch. Losses ignore the NaN frames of the targets.
+
+    Args:
+        batch: Samples as dictionaries of tensors.
+
+    Returns:
+        Dictionary of batched tensors of shape (samples, frames, ...).
+    """
+    n_frames = {
+        key: max(sample[key].shape[0] for sample in batch)
+        for key, value in batch[0].items()
+        if isinstance(value, torch.Tensor) and value.is_floating_point()
+    }
+    return default_collate([
+        {
+            key: nnf.pad(
+                value,
+                pad=(0, 0) * (value.ndim - 1) + (0, n_frames[key] - value.shape[0]),
+                value=np.nan,
+            )
+            if key in n_frames
+            else value
+            for key, value in sample.items()
+        }
+        for sample in batch
+    ])
+
+
+def batch_to_device(batch: Dict[str, Any], device: torch.device) -> Dict[str, Any]:
+    """Moves the tensors and arrays of a batch to a device.
+
+    Note:
+        Datasets like MultiTaskSintel return CPU tensors, also from DataLoader
+        worker processes. Batches are moved to the device of the network where
+        they are used.
+
+    Args:
+        batch: Dictionary of tensors, numpy arrays, and nested dictionaries.
+        device: Target device.
+
+    Returns:
+        Dictionary of the same structure with tensors on the device.
+    """
+
+    def to_device(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: to_device(val) for key, val in value.items()}
+        if isinstance(value, torch.Tensor):
+            return value.to(device)
+        if isinstance(value, np.ndarray):
+            return torch.tensor(value, device=device)
+        return value
+
+    return to_device(batch)
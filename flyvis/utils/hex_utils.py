@@ -5,7 +5,6 @@ from typing import Iterable, Literal, Tuple
 
 import numpy as np
 import torch
-from matplotlib import colormaps as cm
 from numpy.typing import NDArray
 
 import flyvis
@@ -664,6 +663,9 @@ class HexArray(np.ndarray):
 
         Meant for debugging.
         """
+        # to save time at library import
+        from matplotlib import colormaps as cm
+
         u = np.array([h.u for h in self])
         v = np.array([h.v for h in self])
         color = np.array([h.value for h in self])
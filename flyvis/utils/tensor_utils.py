@@ -22,6 +22,15 @@ class RefTensor:
 
     def deref(self) -> torch.Tensor:
         """Index the values with the given indices in the last dimension."""
+        if self.values.dim() > 2:
+            # index_select is considerably faster on two-dimensional inputs,
+            # e.g. for stacked parameters and states of shape (models, batch, n)
+            shape = self.values.shape[:-1]
+            return (
+                self.values.reshape(-1, self.values.shape[-1])
+                .index_select(-1, self.indices)
+                .reshape(*shape, -1)
+            )
         return self.values.index_select(-1, self.indices)
 
     def __len__(self) -> int:
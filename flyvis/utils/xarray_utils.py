@@ -4,12 +4,14 @@ import contextlib
 import operator
 import warnings
 from functools import wraps
-from typing import Iterable, List
+from typing import TYPE_CHECKING, Iterable, List
 
-import matplotlib.pyplot as plt
 import numpy as np
 import xarray as xr
 
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
 
 def where_xarray(
     dataset: xr.Dataset | xr.DataArray,
@@ -241,6 +243,9 @@ def plot_traces(
 
     traces.plot.line(x=x, hue="legend_info", **plot_kwargs)
 
+    # to save time at library import
+    import matplotlib.pyplot as plt
+
     ax = plt.gca()
 
     legend = ax.get_legend()
@@ -21,6 +21,11 @@ def main():
                     'task_name/ensemble_and_network_id.'
                 ),
             },
+            'n_workers': {
+                'type': int,
+                'required': False,
+                'help': 'Number of processes validating checkpoints in parallel.',
+            },
         },
         description=(
             "Validate a single network across all its checkpoints. "
@@ -41,6 +46,9 @@ Examples:
 
 2. Validate a network from a different task:
     flyvis val-single task_name=depth ensemble_and_network_id=0023/012
+
+3. Validate the checkpoints in 4 parallel processes:
+    flyvis val-single task_name=flow ensemble_and_network_id=0045/000 n_workers=4
 """,
     )
 
@@ -50,7 +58,7 @@ Examples:
     network_view = NetworkView(network_name)
 
     # TODO: add logic to pass different validation methods
-    validate_all_checkpoints(network_view)
+    validate_all_checkpoints(network_view, n_workers=args.n_workers or 1)
 
 
 if __name__ == "__main__":
@@ -9,6 +9,7 @@ from flyvis.datasets.augmentation.hex import (
     HexFlip,
     HexRotate,
     PixelNoise,
+    flip_and_rotate,
 )
 from flyvis.datasets.augmentation.temporal import (
     CropFrames,
@@ -114,6 +115,19 @@ def test_hex_flip():
     assert np.allclose(hexflip(flow).tolist(), flow.tolist())
 
 
+def test_flip_and_rotate():
+    hexflip = HexFlip(extent=2, axis=0)
+    hexrotate = HexRotate(extent=2, n_rot=0)
+    axes, n_rots = np.meshgrid(np.arange(4), np.arange(6))
+    axes, n_rots = axes.flatten(), n_rots.flatten()
+    for dims in [1, 2, 3]:
+        sequence = torch.rand(len(axes), 3, dims, 19)
+        transformed = flip_and_rotate(sequence, hexflip, hexrotate, axes, n_rots)
+        for i, (axis, n_rot) in enumerate(zip(axes, n_rots)):
+            expected = hexrotate(hexflip(sequence[i], axis), n_rot)
+            assert torch.allclose(transformed[i], expected, atol=1e-6)
+
+
 def test_jitter():
     jitter = ContrastBrightness(0.5, 0.5)
     sequence = torch.tensor(
@@ -0,0 +1,224 @@
+"""Performance benchmarks of fixed-seed workloads.
+
+Run with pytest-benchmark and store a machine-readable report to compare
+across versions:
+
+```
+pytest -m benchmark tests/test_benchmarks.py --benchmark-json=benchmark.json
+pytest -m benchmark tests/test_benchmarks.py --benchmark-autosave
+pytest -m benchmark tests/test_benchmarks.py --benchmark-compare
+```
+
+The benchmarks are deselected in the default test run.
+"""
+
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from datamate import Namespace, set_root_context
+
+import flyvis
+from flyvis import Network, NetworkDir
+from flyvis.analysis.stimulus_responses import generic_responses
+from flyvis.datasets.datasets import StimulusDataset
+from flyvis.datasets.rendering import BoxEye, HexEye
+from flyvis.network import Ensemble
+from flyvis.network.integrators import compare_integrators
+from flyvis.solver import MultiTaskSolver
+from flyvis.utils import hex_utils
+from flyvis.utils.config_utils import get_default_config
+from flyvis.utils.dataset_utils import batch_to_device
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    torch.manual_seed(0)
+    np.random.seed(0)
+
+
+def network_config(extent: int) -> Namespace:
+    config = get_default_config(
+        path="../../flyvis/config/solver.yaml",
+        overrides=[
+            "task_name=flow",
+            "ensemble_and_network_id=0",
+            f"network.connectome.extent={extent}",
+        ],
+    )
+    return config.network
+
+
+@pytest.fixture(scope="module")
+def networks():
+    return {extent: Network(**network_config(extent)) for extent in [1, 4]}
+
+
+@pytest.mark.parametrize("extent", [1, 4])
+@pytest.mark.parametrize("batch_size", [1, 8])
+def test_integration_step(benchmark, networks, extent, batch_size):
+    network = networks[extent]
+    n_frames = 10
+    x = torch.rand(batch_size, n_frames, network.n_nodes)
+    state = network.steady_state(0.1, 1 / 50, batch_size)
+    benchmark.extra_info.update(n_nodes=network.n_nodes, n_frames=n_frames)
+    benchmark(network.inference, x, 1 / 50, state=state)
+
+
+@pytest.mark.parametrize("method", ["euler", "heun", "rk4", "rk23"])
+def test_integrator(benchmark, networks, method):
+    network = networks[4]
+    dt = 1 / 25
+    x = torch.rand(1, 10, 1, hex_utils.get_num_hexals(4))
+    comparison = compare_integrators(network, x, dt, methods=[method])
+    benchmark.extra_info.update(
+        comparison.iloc[-1][["max_error", "mean_error"]].to_dict()
+    )
+    state = network.steady_state(1.0, dt / 10, 1)
+    benchmark(network.simulate, x, dt, initial_state=state, method=method)
+
+
+@pytest.fixture(scope="module")
+def solver(mock_sintel_data, tmp_path_factory) -> MultiTaskSolver:
+    config = get_default_config(
+        path="../../flyvis/config/solver.yaml",
+        overrides=[
+            "task_name=flow",
+            "ensemble_and_network_id=0",
+            f"+task.dataset.sintel_path={str(mock_sintel_data)}",
+            "task.original_split=false",
+            "task.dataset.boxfilter.extent=1",
+            "task.dataset.n_frames=4",
+            "task.dataset.dt=0.041",
+            "task.batch_size=2",
+            "network.connectome.extent=1",
+        ],
+    )
+    with set_root_context(str(tmp_path_factory.mktemp("tmp"))):
+        return MultiTaskSolver("benchmark", config)
+
+
+def test_training_step(benchmark, solver):
+    dataset = solver.task.dataset
+    data = batch_to_device(next(iter(solver.task.train_data)), flyvis.device)
+    steady_state = solver.network.steady_state(0.5, dataset.dt, data["lum"].shape[0])
+
+    def training_step():
+        solver.network.stimulus.zero(*data["lum"].shape[:2])
+        solver.network.stimulus.add_input(data["lum"])
+        solver.optimizer.zero_grad()
+        activity = solver.network(
+            solver.network.stimulus(), dataset.dt, state=steady_state
+        )
+        loss = sum(
+            solver.task.loss(solver.decoder[task](activity), data[task], task)
+            for task in dataset.tasks
+        )
+        loss.backward()
+        solver.optimizer.step()
+
+    benchmark.extra_info.update(n_frames=data["lum"].shape[1])
+    benchmark(training_step)
+
+
+def test_dataset_getitem(benchmark, solver):
+    dataset = solver.task.dataset
+    with dataset.augmentation(True):
+        benchmark(dataset.__getitem__, 0)
+
+
+def test_boxeye_rendering(benchmark):
+    boxeye = BoxEye(extent=15, kernel_size=13)
+    sequence = torch.rand(4, 10, 100, 100)
+    benchmark.extra_info.update(n_frames=40)
+    benchmark(boxeye, sequence, ftype="mean", hex_sample=True)
+
+
+def test_hexeye_rendering(benchmark):
+    hexeye = HexEye(n_ommatidia=91, ppo=10, dtype=torch.float32, device="cpu")
+    sequence = torch.rand(10, hexeye.monitor_height_px, hexeye.monitor_width_px)
+    benchmark.extra_info.update(n_frames=10)
+    benchmark(hexeye, sequence)
+
+
+class RandomStimuli(StimulusDataset):
+    """Random stimuli on the hex lattice of extent 1."""
+
+    augment = False
+    t_pre = 0.0
+    t_post = 0.0
+    dt = 1 / 50
+    framerate = 50
+
+    def __init__(self, n_sequences: int = 8, n_frames: int = 20, dt: float = 1 / 50):
+        self.config = Namespace(n_sequences=n_sequences, n_frames=n_frames, dt=dt)
+        self.dt = dt
+        self.data = torch.rand(
+            n_sequences, n_frames, 7, generator=torch.Generator().manual_seed(0)
+        )
+        self.arg_df = pd.DataFrame(dict(sequence=np.arange(n_sequences)))
+
+    def __len__(self):
+        return len(self.data)
+
+    def get_item(self, key):
+        return self.data[key]
+
+
+@pytest.fixture(scope="module")
+def ensemble(tmp_path_factory) -> Ensemble:
+    config = get_default_config(
+        path="../../flyvis/config/solver.yaml",
+        overrides=[
+            "task_name=flow",
+            "ensemble_and_network_id=0",
+            "network.connectome.extent=1",
+        ],
+    )
+    with set_root_context(str(tmp_path_factory.mktemp("results"))):
+        for i in range(3):
+            name = f"benchmark/{i:03}"
+            network_dir = NetworkDir(name, {**config, "network_name": name})
+            network = Network(**config.network)
+            (network_dir.path / "chkpts").mkdir()
+            torch.save(
+                {"network": network.state_dict()},
+                network_dir.path / "chkpts" / "chkpt_00000",
+            )
+            network_dir.validation.epe = np.array([1.0])
+        return Ensemble(network_dir.path.parent)
+
+
+def test_ensemble_responses(benchmark, ensemble):
+    def clear_cache():
+        for network_view in ensemble.values():
+            network_view._clear_memory()
+
+    benchmark.extra_info.update(n_models=len(ensemble))
+    benchmark.pedantic(
+        generic_responses,
+        args=(ensemble, RandomStimuli(), {}, RandomStimuli),
+        kwargs=dict(t_pre=0.1, t_fade_in=0.0, batch_size=4),
+        setup=clear_cache,
+        rounds=3,
+    )
+
+
+@pytest.mark.parametrize(
+    "statement", ["import flyvis", "from flyvis import Network", "from flyvis import *"]
+)
+def test_import(benchmark, statement):
+    benchmark.extra_info.update(statement=statement)
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", statement],),
+        kwargs=dict(check=True),
+        rounds=3,
+    )
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pytest
+
+from flyvis import connectome_file
+from flyvis.connectome import ConnectomeFromAvgFilters
+from flyvis.connectome.connectome import (
+    add_edges,
+    add_nodes,
+    compile_edges,
+    compile_nodes,
+)
+
+
+@pytest.mark.parametrize("extent", [0, 2])
+@pytest.mark.parametrize("n_syn_fill", [0, 1])
+def test_compile_graph(extent, n_syn_fill):
+    spec = json.loads(connectome_file.read_text())
+    nodes, edges = [], []
+    add_nodes(nodes, spec["nodes"], extent)
+    add_edges(edges, nodes, spec["edges"], n_syn_fill)
+
+    compiled_nodes = compile_nodes(spec, extent)
+    compiled_edges = compile_edges(compiled_nodes, spec["edges"], n_syn_fill)
+
+    expected_nodes = dict(
+        index=np.int64([n.id for n in nodes]),
+        type=np.bytes_([n.type for n in nodes]),
+        u=np.int32([n.u for n in nodes]),
+        v=np.int32([n.v for n in nodes]),
+    )
+    expected_edges = dict(
+        source_index=np.int64([e.source.id for e in edges]),
+        target_index=np.int64([e.target.id for e in edges]),
+        sign=np.float32([e.sign for e in edges]),
+        n_syn=np.float32([e.n_syn for e in edges]),
+        du=np.int32([e.target.u - e.source.u for e in edges]),
+        dv=np.int32([e.target.v - e.source.v for e in edges]),
+        n_syn_certainty=np.float32([e.n_syn_certainty for e in edges]),
+    )
+    for name, expected in expected_nodes.items():
+        np.testing.assert_array_equal(compiled_nodes[name], expected)
+    for name, expected in expected_edges.items():
+        np.testing.assert_array_equal(compiled_edges[name], expected)
+        assert compiled_edges[name].dtype == expected.dtype
+
+
+def test_compiled_cache(tmp_path, monkeypatch):
+    config = dict(file=connectome_file.name, extent=1, n_syn_fill=1)
+    connectome = ConnectomeFromAvgFilters(tmp_path / "first", config)
+    assert len(list((tmp_path / "_compiled").glob("*.npz"))) == 1
+
+    def compile_nodes(*args):
+        raise AssertionError("the compiled graph was not reused")
+
+    monkeypatch.setattr("flyvis.connectome.connectome.compile_nodes", compile_nodes)
+    copy = ConnectomeFromAvgFilters(tmp_path / "second", config)
+    for name in ["index", "type", "u", "v", "role"]:
+        np.testing.assert_array_equal(copy.nodes[name][:], connectome.nodes[name][:])
+    for name in ["source_index", "target_index", "n_syn", "source_type"]:
+        np.testing.assert_array_equal(copy.edges[name][:], connectome.edges[name][:])
@@ -0,0 +1,40 @@
+import pytest
+import torch
+
+from flyvis.task.decoder import Conv2dHexSpace, ConvHexSpace, DecoderGAVP
+from flyvis.utils.hex_utils import get_hex_coords
+
+
+@pytest.mark.parametrize("kernel_size", [1, 3, 5])
+@pytest.mark.parametrize("extent", [1, 4])
+def test_conv_hex_space(kernel_size, extent):
+    conv = Conv2dHexSpace(3, 2, kernel_size, const_weight=None, padding=kernel_size // 2)
+    hex_conv = ConvHexSpace(3, 2, kernel_size, extent, const_weight=None)
+    hex_conv.load_state_dict(conv.state_dict())
+
+    u, v = get_hex_coords(extent)
+    u, v = u - u.min(), v - v.min()
+    x = torch.rand(4, 3, len(u))
+    x_map = torch.zeros(4, 3, u.max() + 1, v.max() + 1)
+    x_map[:, :, u, v] = x
+
+    torch.testing.assert_close(hex_conv(x), conv(x_map)[:, :, u, v])
+
+
+@pytest.mark.parametrize("n_out_features", [None, 2])
+def test_hex_native_decoder(connectome, n_out_features):
+    kwargs = dict(
+        shape=[2], kernel_size=5, batch_norm=False, n_out_features=n_out_features
+    )
+    decoder = DecoderGAVP(connectome, **kwargs)
+    hex_decoder = DecoderGAVP(connectome, hex_native=True, **kwargs)
+    hex_decoder.load_state_dict(decoder.state_dict())
+
+    activity = torch.rand(2, 3, len(connectome.nodes.type))
+    torch.testing.assert_close(hex_decoder(activity), decoder(activity))
+
+
+def test_hex_native_decoder_shape(connectome):
+    decoder = DecoderGAVP(connectome, shape=[8, 2], kernel_size=5, hex_native=True)
+    activity = torch.rand(2, 3, len(connectome.nodes.type))
+    assert decoder(activity).shape == (2, 3, 2, len(get_hex_coords(1)[0]))
@@ -1,3 +1,4 @@
+import shutil
 from copy import deepcopy
 from pathlib import Path
 
@@ -55,6 +56,49 @@ def test_simulate(ensemble: Ensemble):
         activity = np.array(list(ensemble.simulate(torch.ones(1, 2, 721).random_(2), 1)))
 
 
+def test_simulate_chunks(ensemble: Ensemble):
+    x = torch.ones(1, 6, 1, 721).random_(2)
+    network = next(ensemble.yield_networks())
+    activity = np.array(list(ensemble.simulate(x, 1 / 50)))
+    chunks = list(ensemble.simulate_chunks(torch.split(x, 2, dim=1), 1 / 50))
+    assert len(chunks) == 3
+    assert chunks[0].shape == (len(ensemble), 1, 2, network.n_nodes)
+    assert np.allclose(np.concatenate(chunks, axis=2), activity, atol=1e-5)
+
+    chunks = list(
+        ensemble.simulate_chunks(
+            torch.split(x, 2, dim=1), 1 / 50, central_cells_only=True
+        )
+    )
+    assert chunks[0].shape == (len(ensemble), 1, 2, 65)
+
+
+def test_simulate_vectorized(ensemble: Ensemble):
+    x = torch.ones(1, 4, 1, 721).random_(2)
+    activity = np.array(list(ensemble.simulate(x, 1 / 50)))
+    vectorized = np.array(list(ensemble.simulate(x, 1 / 50, vectorized=True)))
+    assert vectorized.shape == activity.shape
+    assert np.allclose(vectorized, activity, atol=1e-5)
+
+
+@pytest.mark.slow
+def test_flash_responses_parallel(ensemble: Ensemble):
+    kwargs = dict(radius=[6], dt=1 / 50)
+    responses = ensemble.flash_responses(**kwargs)
+
+    # Recompute in the workers instead of loading the serial results.
+    for network_view in ensemble.values():
+        network_view._clear_memory()
+        shutil.rmtree(network_view.steady_state_dir, ignore_errors=True)
+    parallel_responses = ensemble.flash_responses(**kwargs, n_workers=2)
+    for network_view in ensemble.values():
+        assert any(network_view.steady_state_dir.glob("*.pt"))
+    assert (parallel_responses.network_name.values == responses.network_name.values).all()
+    assert np.allclose(
+        parallel_responses.responses.values, responses.responses.values, atol=1e-5
+    )
+
+
 def test_validation_losses(ensemble):
     losses = ensemble.validation_losses()
     assert len(losses) == len(ensemble)
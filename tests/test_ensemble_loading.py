@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+import torch
+from datamate import set_root_context
+
+from flyvis import Network, NetworkDir
+from flyvis.network import Ensemble
+from flyvis.utils.chkpt_utils import best_checkpoint_default_fn, resolve_checkpoints
+from flyvis.utils.config_utils import get_default_config
+
+scanned = []
+
+
+def counting_checkpoint_mapper(network_dir):
+    scanned.append(network_dir.path.name)
+    return resolve_checkpoints(network_dir)
+
+
+@pytest.fixture(scope="module")
+def ensemble_path(tmp_path_factory):
+    config = get_default_config(
+        path="../../flyvis/config/solver.yaml",
+        overrides=[
+            "task_name=flow",
+            "ensemble_and_network_id=0",
+            "network.connectome.extent=1",
+        ],
+    )
+    with set_root_context(str(tmp_path_factory.mktemp("results"))):
+        for i in range(3):
+            name = f"test/{i:03}"
+            network_dir = NetworkDir(name, {**config, "network_name": name})
+            network = Network(**config.network)
+            (network_dir.path / "chkpts").mkdir()
+            for chkpt in range(2):
+                torch.save(
+                    {"network": network.state_dict()},
+                    network_dir.path / "chkpts" / f"chkpt_{chkpt:05}",
+                )
+            network_dir.validation.epe = np.array([2.0, 1.0])
+        return network_dir.path.parent
+
+
+def test_lazy_network_views(ensemble_path):
+    ensemble = Ensemble(ensemble_path)
+    assert len(ensemble) == 3
+    assert dict.__getitem__(ensemble, ensemble.names[1]) is None
+
+    network_view = ensemble[1]
+    assert dict.__getitem__(ensemble, ensemble.names[1]) is network_view
+    assert ensemble[1] is network_view
+    assert network_view.connectome_view is ensemble[0].connectome_view
+    assert network_view.get_checkpoint("best") == best_checkpoint_default_fn(
+        network_view.dir.path, "validation", "epe"
+    )
+
+
+def test_persisted_index(ensemble_path):
+    scanned.clear()
+    Ensemble(
+        ensemble_path, checkpoint_mapper=counting_checkpoint_mapper, persist_index=True
+    )
+    assert sorted(scanned) == ["000", "001", "002"]
+    assert (ensemble_path / "_index.pkl").exists()
+
+    scanned.clear()
+    Ensemble(
+        ensemble_path, checkpoint_mapper=counting_checkpoint_mapper, persist_index=True
+    )
+    assert not scanned
+
+    # A new checkpoint invalidates the entry of its model.
+    chkpts = ensemble_path / "001" / "chkpts"
+    (chkpts / "chkpt_00002").write_bytes((chkpts / "chkpt_00001").read_bytes())
+    mtime = chkpts.stat().st_mtime + 1
+    os.utime(chkpts, (mtime, mtime))
+
+    scanned.clear()
+    ensemble = Ensemble(
+        ensemble_path, checkpoint_mapper=counting_checkpoint_mapper, persist_index=True
+    )
+    assert scanned == ["001"]
+    assert ensemble[1].checkpoints.indices == [0, 1, 2]
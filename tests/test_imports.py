@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+import flyvis
+
+
+def imported_modules(statement: str) -> set:
+    """Return the modules imported by a statement in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", f"{statement}; import sys; print(*sys.modules)"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize("statement", ["import flyvis", "from flyvis import Network"])
+def test_lazy_import(statement):
+    modules = imported_modules(statement)
+    for module in [
+        "matplotlib",
+        "torchvision",
+        "sklearn",
+        "umap",
+        "flyvis.analysis",
+        "flyvis.datasets.rendering",
+        "flyvis.solver",
+    ]:
+        assert module not in modules, module
+
+
+def test_public_names():
+    for name in dir(flyvis):
+        assert hasattr(flyvis, name), name
+    assert flyvis.MultiTaskSolver.__module__ == "flyvis.solver"
+    assert not hasattr(flyvis, "does_not_exist")
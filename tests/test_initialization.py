@@ -1,9 +1,16 @@
 import numpy as np
+import pandas as pd
 import pytest
 import torch
-from datamate import Namespace
-
-from flyvis.network.initialization import InitialDistribution, Parameter
+from datamate import Directory, Namespace
+
+from flyvis.network.initialization import (
+    InitialDistribution,
+    Parameter,
+    get_scatter_indices,
+    group_mean,
+    scatter_groups,
+)
 from flyvis.utils.class_utils import forward_subclass
 
 # -- Fixtures ------------------------------------------------------------------
@@ -141,3 +148,47 @@ def test_parameter(param_config, connectome):
     assert hasattr(param, "keys") and isinstance(param.keys, list)
     assert param.parameter.raw_values.requires_grad == param_config.requires_grad
     assert param[param.keys[0]]
+
+
+@pytest.mark.parametrize("param_type", list(groupby))
+def test_scatter_groups(connectome, param_type):
+    keys = groupby[param_type]
+    table = connectome.nodes if keys == ["type"] else connectome.edges
+    dataframe = pd.DataFrame({k: table[k][:] for k in keys})
+    grouped = dataframe.groupby(keys, sort=False)
+
+    first, indices = scatter_groups(table, keys)
+    np.testing.assert_array_equal(first, grouped.head(1).index)
+    np.testing.assert_array_equal(indices, grouped.ngroup())
+    torch.testing.assert_close(
+        get_scatter_indices(
+            dataframe, dataframe.groupby(keys, as_index=False, sort=False).first(), keys
+        ),
+        torch.tensor(indices),
+    )
+
+    # The groups are cached in the table directory.
+    for cached, expected in zip(scatter_groups(table, keys), (first, indices)):
+        np.testing.assert_array_equal(cached, expected)
+    assert any((table.path / "_scatter_groups").iterdir())
+
+    if keys != ["type"]:
+        n_syn = table.n_syn[:]
+        np.testing.assert_array_equal(
+            group_mean(n_syn, indices),
+            dataframe.assign(n_syn=n_syn).groupby(keys, sort=False).n_syn.mean(),
+        )
+
+
+def test_scatter_groups_rewritten_table(tmp_path):
+    table = Directory(tmp_path / "nodes")
+    table.type = np.array([b"L1", b"L2", b"L1"])
+    first, indices = scatter_groups(table, ["type"])
+    np.testing.assert_array_equal(indices, [0, 1, 0])
+
+    # The cached groups of the previous contents are not reused.
+    table.type = np.array([b"L1", b"L1", b"L2"])
+    first, indices = scatter_groups(table, ["type"])
+    np.testing.assert_array_equal(first, [0, 2])
+    np.testing.assert_array_equal(indices, [0, 0, 1])
+    assert len(list((table.path / "_scatter_groups").iterdir())) == 2
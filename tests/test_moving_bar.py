@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import torch
+from datamate import set_root_context
+
+from flyvis.datasets.moving_bar import MovingBar, MovingEdge
+from flyvis.datasets.rendering.utils import pad, resample, shuffle
+
+
+@pytest.fixture(scope="module")
+def root_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("renderings")
+
+
+def resampled_sequences(dataset: MovingBar, seed: int = 0) -> dict:
+    """Sequences per speed from resampling, shuffling and padding all offsets."""
+    randomstate = np.random.RandomState(seed=seed)
+    sequences = {}
+    for t, speed in zip(dataset.t_stim, dataset.speeds):
+        sequence = resample(dataset._offsets, t, dataset.dt, dim=1, device="cpu")
+        if dataset.shuffle_offsets:
+            sequence = shuffle(sequence, randomstate)
+        sequence = pad(
+            sequence,
+            t + dataset.t_pre,
+            dataset.dt,
+            mode="start",
+            fill=dataset.bg_intensity,
+        )
+        sequence = pad(
+            sequence,
+            t + dataset.t_pre + dataset.t_post,
+            dataset.dt,
+            mode="end",
+            pad_mode=dataset.post_pad_mode,
+            fill=dataset.bg_intensity,
+        )
+        sequences[speed] = pad(
+            sequence,
+            dataset.t_stim_max + dataset.t_pre + dataset.t_post,
+            dataset.dt,
+            mode="end",
+            fill=np.nan,
+        )
+    return sequences
+
+
+@pytest.mark.parametrize("post_pad_mode", ["continue", "value", "reflect"])
+@pytest.mark.parametrize("shuffle_offsets", [False, True])
+@pytest.mark.parametrize("cls", [MovingBar, MovingEdge])
+def test_lazy_sequences(root_dir, cls, shuffle_offsets, post_pad_mode):
+    kwargs = dict(
+        offsets=(-5, 5),
+        intensities=[0, 1],
+        speeds=[2.4, 9.7],
+        t_pre=0.1,
+        t_post=0.1,
+        dt=1 / 100,
+        device="cpu",
+        angles=[0, 90],
+        shuffle_offsets=shuffle_offsets,
+        post_pad_mode=post_pad_mode,
+    )
+    if cls is MovingBar:
+        kwargs.update(widths=[2])
+    with set_root_context(root_dir):
+        eager = cls(lazy=False, **kwargs)
+        lazy = cls(cache_size=2, **kwargs)
+
+    assert lazy.lazy
+    assert not lazy.sequences
+    assert len(lazy) == len(eager)
+    expected = resampled_sequences(eager)
+    for key in range(len(eager)):
+        angle, width, intensity, _, speed = eager._params(key)
+        sequence = expected[speed][eager._group_key(angle, width, intensity)]
+        torch.testing.assert_close(eager[key], sequence, rtol=0, atol=0, equal_nan=True)
+        torch.testing.assert_close(lazy[key], sequence, rtol=0, atol=0, equal_nan=True)
+    assert len(lazy._cache) == 2
@@ -1,3 +1,4 @@
+import warnings
 from dataclasses import dataclass
 
 import numpy as np
@@ -9,6 +10,7 @@ import flyvis
 from flyvis import Network
 from flyvis.connectome.connectome import init_connectome, register_connectome
 from flyvis.network.network import IntegrationWarning
+from flyvis.network.stimulus import CompactStimulus
 from flyvis.utils.tensor_utils import AutoDeref
 
 
@@ -170,6 +172,38 @@ def test_forward(network):
     assert activity.grad_fn.name() == "StackBackward0"
 
 
+def test_inference(network):
+    network.clear_state_hooks()
+    x = torch.ones(2, 20, network.n_nodes).random_(2)
+    state = network.steady_state(1, 1 / 50, 2)
+    initial_activity = state.nodes.activity.clone()
+
+    activity = network.forward(x, 1 / 50, state)
+    inferred = network.inference(x, 1 / 50, state)
+    assert inferred.shape == (2, 20, network.n_nodes)
+    assert inferred.grad_fn is None
+    assert torch.allclose(activity, inferred, atol=1e-5)
+    assert (state.nodes.activity == initial_activity).all()
+
+    out = torch.zeros(2, 20, network.n_nodes, dtype=torch.float16)
+    inferred, final_state = network.inference(
+        x, 1 / 50, state, out=out, return_state=True
+    )
+    assert inferred is out
+    assert torch.allclose(activity, out.float(), atol=1e-2)
+    assert torch.allclose(final_state.nodes.activity, activity[:, -1], atol=1e-5)
+
+    # initial state computed for a batch size of one
+    state = network.steady_state(1, 1 / 50, 1)
+    activity = network.forward(x, 1 / 50, state)
+    inferred = network.inference(x, 1 / 50, state)
+    assert inferred.shape == (2, 20, network.n_nodes)
+    assert torch.allclose(activity, inferred, atol=1e-5)
+
+    with pytest.raises(ValueError):
+        network.inference(x, 1 / 50, out=torch.zeros(2, 19, network.n_nodes))
+
+
 def test_simulate(network):
     x = torch.ones(2, 20, 1, 721).random_(2)
     activity = network.simulate(x, 1 / 50)
@@ -182,6 +216,120 @@ def test_simulate(network):
         network.simulate(x, 1 / 49)
 
 
+def test_compact_stimulus(network):
+    network.clear_state_hooks()
+    x = torch.ones(2, 10, 1, 721).random_(2)
+    state = network.steady_state(0.1, 1 / 50, 2)
+    activity = network.simulate(x, 1 / 50, initial_state=state)
+    network.stimulus.add_input(x)
+    trained_activity = network(network.stimulus(), 1 / 50, state, checkpoint_chunk=4)
+
+    stimulus = network.stimulus
+    network.stimulus = CompactStimulus(network.connectome, init_buffer=False)
+    try:
+        assert torch.allclose(
+            network.simulate(x, 1 / 50, initial_state=state), activity, atol=1e-6
+        )
+        network.stimulus.add_input(x)
+        assert torch.allclose(
+            network(network.stimulus(), 1 / 50, state, checkpoint_chunk=4),
+            trained_activity,
+            atol=1e-6,
+        )
+        fixed_point_state, _ = network.fixed_point_state(batch_size=1)
+        assert fixed_point_state.nodes.activity.shape == (1, network.n_nodes)
+    finally:
+        network.stimulus = stimulus
+
+
+def test_integrators(network):
+    network.clear_state_hooks()
+    x = torch.ones(1, 4, network.n_nodes).random_(2)
+    state = network.steady_state(1, 1 / 50, 1)
+    reference = network.forward(x.repeat_interleave(20, dim=1), 1 / 500, state)
+    reference = reference[:, 19::20]
+
+    errors = {}
+    for method in ["euler", "heun", "rk4", "rk23"]:
+        activity = network.forward(x, 1 / 25, state, method=method)
+        inferred = network.inference(x, 1 / 25, state, method=method)
+        assert torch.allclose(activity, inferred, atol=1e-5)
+        errors[method] = (activity - reference).abs().max()
+    assert errors["rk4"] < errors["heun"] < errors["euler"]
+    assert errors["rk23"] < errors["euler"]
+
+    with pytest.raises(ValueError):
+        network.forward(x, 1 / 25, state, method="unknown")
+
+
+def test_checkpointed_bptt(network):
+    network.clear_state_hooks()
+    x = torch.ones(2, 10, network.n_nodes).random_(2)
+
+    def gradients(**kwargs):
+        network.zero_grad()
+        activity = network(x, 1 / 50, **kwargs)
+        activity.square().mean().backward()
+        grads = [p.grad.clone() for p in network.parameters() if p.grad is not None]
+        return activity.detach(), grads
+
+    activity, grads = gradients()
+    chunked_activity, chunked_grads = gradients(checkpoint_chunk=3)
+    assert torch.allclose(activity, chunked_activity)
+    for grad, chunked_grad in zip(grads, chunked_grads):
+        assert torch.allclose(grad, chunked_grad, atol=1e-6)
+
+    truncated_activity, truncated_grads = gradients(tbptt_window=4)
+    assert torch.allclose(activity, truncated_activity)
+    _, chunked_truncated_grads = gradients(tbptt_window=4, checkpoint_chunk=3)
+    for grad, chunked_grad in zip(truncated_grads, chunked_truncated_grads):
+        assert torch.allclose(grad, chunked_grad, atol=1e-6)
+
+    with pytest.raises(ValueError):
+        network(x, 1 / 50, as_states=True, checkpoint_chunk=3)
+
+
+def test_simulate_chunks(network):
+    network.clear_state_hooks()
+    x = torch.ones(2, 20, 1, 721).random_(2)
+    activity = network.simulate(x, 1 / 50)
+
+    chunks = list(network.simulate_chunks(torch.split(x, [8, 8, 4], dim=1), 1 / 50))
+    assert [chunk.shape[1] for chunk in chunks] == [8, 8, 4]
+    assert torch.allclose(torch.cat(chunks, dim=1), activity, atol=1e-5)
+
+    chunks = list(
+        network.simulate_chunks(
+            iter(torch.split(x, 10, dim=1)),
+            1 / 50,
+            cell_types=["T4a", "T5a"],
+            central_cells_only=True,
+        )
+    )
+    assert chunks[0].shape == (2, 10, 2)
+    central_cells_index = network.stimulus.central_cells_index
+    assert torch.allclose(
+        chunks[0][:, :, 0], activity[:, :10, central_cells_index["T4a"]], atol=1e-5
+    )
+
+    chunks = list(network.simulate_chunks([x], 1 / 50, cell_types=["T4a"]))
+    assert chunks[0].shape == (2, 20, 721)
+
+    with pytest.raises(ValueError):
+        list(network.simulate_chunks([torch.ones(20, 1, 721)], 1 / 50))
+
+    with pytest.warns(IntegrationWarning):
+        list(network.simulate_chunks([x], 1 / 25))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", IntegrationWarning)
+        activity = network.simulate(x, 1 / 25, method="rk4")
+        chunks = list(
+            network.simulate_chunks(torch.split(x, 10, dim=1), 1 / 25, method="rk4")
+        )
+    assert torch.allclose(torch.cat(chunks, dim=1), activity, atol=1e-5)
+
+
 def test_steady_state(network: Network):
     steady_state = network.steady_state(1, 1 / 20, 2, 0.5, None, False)
 
@@ -196,6 +344,80 @@ def test_steady_state(network: Network):
     assert steady_state["targets"]["activity"].shape == (2, network.n_edges)
 
 
+def test_cached_steady_state(network, tmp_path):
+    network.clear_state_hooks()
+    network.clear_steady_state_cache()
+    steady_state = network.steady_state(1, 1 / 20, 2, 0.5)
+    reference = network.steady_state(1, 1 / 20, 2, 0.5, return_last=False)[-1]
+    assert torch.allclose(
+        steady_state.nodes.activity, reference.nodes.activity, atol=1e-5
+    )
+    assert steady_state.sources.activity.shape == (2, network.n_edges)
+
+    # broadcast from the cache
+    steady_state = network.steady_state(1, 1 / 20, 4, 0.5)
+    assert steady_state.nodes.activity.shape == (4, network.n_nodes)
+    assert len(network._steady_states) == 1
+
+    # keyed by the parameters
+    state_dict = {k: v.clone() for k, v in network.state_dict().items()}
+    with torch.no_grad():
+        network.nodes_bias.add_(0.1)
+    network.steady_state(1, 1 / 20, 4, 0.5)
+    assert len(network._steady_states) == 2
+    network.load_state_dict(state_dict)
+
+    # stored on disk
+    network.steady_state_dir = tmp_path
+    network.clear_steady_state_cache()
+    network.steady_state(1, 1 / 20, 1, 0.5)
+    assert len(list(tmp_path.glob("*.pt"))) == 1
+    network.clear_steady_state_cache()
+    loaded = network.steady_state(1, 1 / 20, 4, 0.5)
+    assert torch.equal(loaded.nodes.activity, steady_state.nodes.activity)
+
+    # partially written files are recomputed and replaced
+    (path,) = tmp_path.glob("*.pt")
+    path.write_bytes(path.read_bytes()[:100])
+    network.clear_steady_state_cache()
+    loaded = network.steady_state(1, 1 / 20, 4, 0.5)
+    assert torch.equal(loaded.nodes.activity, steady_state.nodes.activity)
+    assert list(tmp_path.iterdir()) == [path]
+    torch.load(path)
+
+    # directories that cannot be written are not cached
+    (tmp_path / "file").touch()
+    network.steady_state_dir = tmp_path / "file" / "steady_states"
+    network.clear_steady_state_cache()
+    loaded = network.steady_state(1, 1 / 20, 4, 0.5)
+    assert torch.equal(loaded.nodes.activity, steady_state.nodes.activity)
+    network.steady_state_dir = None
+
+
+def test_fixed_point_state(network):
+    network.clear_state_hooks()
+    reference = network.steady_state(5, 1 / 50, 2, 0.5)
+    steady_state, result = network.fixed_point_state(2, 0.5, tol=1e-6)
+    assert result.converged
+    assert result.residual.shape == (2,)
+    assert steady_state.nodes.activity.shape == (2, network.n_nodes)
+    assert torch.allclose(
+        steady_state.nodes.activity, reference.nodes.activity, atol=1e-4
+    )
+    assert (network.equilibrium_residual(steady_state) < 1e-5).all()
+
+    steady_state = network.steady_state(1, 1 / 50, 2, 0.5, solver="fixed_point")
+    assert torch.allclose(
+        steady_state.nodes.activity, reference.nodes.activity, atol=1e-4
+    )
+
+    _, result = network.fixed_point_state(1, 0.5, max_iter=2)
+    assert not result.converged
+
+    with pytest.raises(ValueError):
+        network.steady_state(1, 1 / 50, 2, solver="fixed_point", return_last=False)
+
+
 def test_fade_in_state(network):
     initial_frames = torch.ones(2, 1, 721).uniform_()
 
@@ -208,6 +430,50 @@ def test_fade_in_state(network):
     assert steady_state["targets"]["activity"].shape == (2, network.n_edges)
 
 
+def test_sparse_backend(network):
+    network.clear_state_hooks()
+    sparse_network = Network(**{
+        **network.config,
+        "integration_config": Namespace(backend="sparse"),
+    })
+    sparse_network.load_state_dict(network.state_dict())
+
+    x = torch.ones(2, 10, network.n_nodes).random_(2)
+    activity = network.forward(x, 1 / 50)
+    sparse_activity = sparse_network.forward(x, 1 / 50)
+    assert torch.allclose(activity, sparse_activity, atol=1e-5)
+
+    activity.sum().backward()
+    sparse_activity.sum().backward()
+    for name, param in network.named_parameters():
+        if param.grad is not None:
+            sparse_grad = getattr(sparse_network, name).grad
+            assert torch.allclose(param.grad, sparse_grad, rtol=1e-4, atol=1e-2)
+    network.zero_grad()
+
+
+def test_stacked_parameters(network):
+    network.clear_state_hooks()
+    state_dict = {k: v.clone() for k, v in network.state_dict().items()}
+    perturbed = {
+        k: v + 0.1 * torch.rand_like(v) if v.is_floating_point() else v
+        for k, v in state_dict.items()
+    }
+
+    x = torch.ones(2, 5, 1, 721).random_(2)
+    activity = []
+    for params in [state_dict, perturbed]:
+        network.load_state_dict(params)
+        activity.append(network.simulate(x, 1 / 50))
+
+    with network.stacked_parameters([state_dict, perturbed]):
+        stacked_activity = network.simulate(x, 1 / 50)
+    assert stacked_activity.shape == (2, 2, 5, network.n_nodes)
+    assert torch.allclose(stacked_activity, torch.stack(activity), atol=1e-5)
+    assert network._stacked_values is None
+    network.load_state_dict(state_dict)
+
+
 @register_connectome
 class DiagonalConnectome:
     @dataclass
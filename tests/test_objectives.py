@@ -1,7 +1,8 @@
 import pytest
 import torch
 
-from flyvis.task.objectives import epe, l2norm
+from flyvis.task.objectives import epe, l2norm, sample_losses
+from flyvis.utils.dataset_utils import pad_collate
 
 
 @pytest.mark.parametrize("objective", [l2norm, epe])
@@ -11,3 +12,49 @@ def test_objective(objective):
 
     assert objective(a, b) > 0
     assert objective(a, a) == 0
+
+
+@pytest.mark.parametrize("objective", [l2norm, epe])
+def test_padded_objective(objective):
+    y_est = [torch.rand(n_frames, 2, 5) for n_frames in [3, 5, 4]]
+    y_gt = [torch.rand(n_frames, 2, 5) for n_frames in [3, 5, 4]]
+    batch = pad_collate([dict(y_est=a, y_gt=b) for a, b in zip(y_est, y_gt)])
+    assert batch["y_gt"].shape == (3, 5, 2, 5)
+
+    loss = objective(batch["y_est"], batch["y_gt"], reduction="none")
+    expected = torch.stack([objective(a[None], b[None]) for a, b in zip(y_est, y_gt)])
+    assert torch.allclose(loss, expected)
+    assert torch.allclose(objective(batch["y_est"], batch["y_gt"]), expected.mean())
+
+
+@pytest.mark.parametrize("objective", [l2norm, epe])
+def test_sample_losses(objective):
+    y_est = [torch.rand(n_frames, 2, 5) for n_frames in [3, 5, 4]]
+    y_gt = [torch.rand(n_frames, 2, 5) for n_frames in [3, 5, 4]]
+    batch = pad_collate([dict(y_est=a, y_gt=b) for a, b in zip(y_est, y_gt)])
+
+    def custom(y_est, y_gt, **kwargs):
+        # a loss without reduction argument, which returns the batch average
+        assert not y_gt.isnan().any()
+        return objective(y_est, y_gt)
+
+    expected = objective(batch["y_est"], batch["y_gt"], reduction="none")
+    assert torch.allclose(
+        sample_losses(objective, batch["y_est"], batch["y_gt"]), expected
+    )
+    assert torch.allclose(sample_losses(custom, batch["y_est"], batch["y_gt"]), expected)
+
+
+@pytest.mark.parametrize("objective", [l2norm, epe])
+def test_padded_objective_gradient(objective):
+    y_est = torch.rand(3, 5, 2, 5, requires_grad=True)
+    y_gt = torch.rand(3, 5, 2, 5)
+    y_gt[0, 3:] = float("nan")
+    y_gt[1, 4:, 1] = float("nan")
+    y_gt[2] = float("nan")
+
+    loss = objective(y_est, y_gt, reduction="none")
+    assert loss.isfinite().all()
+    loss.sum().backward()
+    assert y_est.grad.isfinite().all()
+    assert not y_est.grad[y_gt.isnan()].any()
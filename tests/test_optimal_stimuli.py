@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from flyvis import Network
+from flyvis.analysis.optimal_stimuli import GenerateOptimalStimuli
+
+CELL_TYPES = ["T4c", "Mi1"]
+
+
+@pytest.fixture(scope="module")
+def generator() -> GenerateOptimalStimuli:
+    network = Network(
+        connectome=dict(
+            type="ConnectomeFromAvgFilters", file="fib25-fib19_v2.2.json", extent=1
+        )
+    )
+    return GenerateOptimalStimuli(SimpleNamespace(init_network=lambda: network))
+
+
+@pytest.mark.parametrize("batch_size", [None, 3])
+def test_batched_artificial_optimal_stimuli(generator, batch_size):
+    kwargs = dict(t_stim=0.05, n_iters=5)
+    batched = generator.batched_artificial_optimal_stimuli(
+        CELL_TYPES, n_restarts=2, batch_size=batch_size, **kwargs
+    )
+    for cell_type in CELL_TYPES:
+        assert batched[cell_type].losses.shape == (5, 2, 3)
+        for restart in range(2):
+            single = generator.artificial_optimal_stimuli(
+                cell_type, random_seed=restart, **kwargs
+            )
+            result = batched[cell_type]
+            np.testing.assert_allclose(
+                result.stimulus[restart : restart + 1], single.stimulus, atol=1e-5
+            )
+            np.testing.assert_allclose(
+                result.response[restart : restart + 1],
+                single.response,
+                rtol=1e-4,
+                atol=1e-5,
+            )
+            np.testing.assert_allclose(
+                result.losses[:, restart], single.losses, rtol=1e-4
+            )
+
+
+def test_batched_artificial_optimal_stimuli_early_stopping(generator):
+    result = generator.batched_artificial_optimal_stimuli(
+        CELL_TYPES, t_stim=0.05, n_iters=20, tol=np.inf, patience=2
+    )
+    for cell_type in CELL_TYPES:
+        losses = result[cell_type].losses
+        assert losses.shape == (3, 1, 3)
+        assert not np.isnan(losses).any()
@@ -1,8 +1,12 @@
+from itertools import product
+
 import numpy as np
 import pytest
 import torch
+from datamate import Directory, set_root_context
 
 from flyvis.datasets import rendering
+from flyvis.datasets.rendering.utils import hex_center_coordinates, is_inside_hex
 
 
 @pytest.fixture(scope="module")
@@ -47,3 +51,43 @@ def test_hex_render(boxeye: rendering.BoxEye):
     sequence = torch.ones((2, 2, 100, 100))
     rendered = boxeye.hex_render(sequence)
     assert rendered.shape == (2, 2, 1, boxeye.hexals)
+
+
+def test_hexeye(tmp_path):
+    with set_root_context(tmp_path):
+        hexeye = rendering.HexEye(91, 10, dtype=torch.float32, device="cpu")
+    assert hexeye.pixel_index.shape == hexeye.ommatidium_index.shape
+    assert (hexeye.ommatidium_index.diff() >= 0).all()
+    assert len(list(tmp_path.rglob("pixel_index.h5"))) == 1
+    assert hexeye.pixel_index.device.type == "cpu"
+    assert hexeye.kernel_sum.device.type == "cpu"
+    sampling_map = Directory(next(tmp_path.rglob("pixel_index.h5")).parent)
+    assert sampling_map.config.device == "cpu"
+
+    x_hc, y_hc, (dist_w, dist_h) = hex_center_coordinates(
+        91, hexeye.monitor_width_px, hexeye.monitor_height_px
+    )
+    x_img, y_img = np.array(
+        list(
+            product(
+                np.arange(hexeye.monitor_width_px), np.arange(hexeye.monitor_height_px)
+            )
+        )
+    ).T
+    _, is_inside = is_inside_hex(
+        torch.tensor(y_img, dtype=torch.float32),
+        torch.tensor(x_img, dtype=torch.float32),
+        torch.tensor(x_hc, dtype=torch.float32),
+        torch.tensor(y_hc, dtype=torch.float32),
+        torch.tensor((dist_w + dist_h) / 4, dtype=torch.float32),
+        torch.tensor(0.0, dtype=torch.float32),
+        dtype=torch.float32,
+    )
+    assert torch.equal(hexeye.is_inside, is_inside)
+
+    sequence = torch.rand(3, hexeye.monitor_height_px, hexeye.monitor_width_px)
+    rendered = hexeye(sequence, mode="sum")
+    assert rendered.shape == (3, 91)
+    expected = (sequence.reshape(3, -1, 1) * is_inside).sum(dim=1)
+    assert torch.allclose(rendered, expected, atol=1e-4)
+    assert torch.allclose(hexeye(sequence), expected / is_inside.sum(dim=0), atol=1e-5)
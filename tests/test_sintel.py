@@ -1,8 +1,13 @@
+import shutil
+
 import numpy as np
 import pytest
+import torch
 from datamate import set_root_context
+from torch.overrides import TorchFunctionMode
 
 from flyvis.datasets.sintel import MultiTaskSintel, RenderedSintel, sintel_meta
+from flyvis.utils.dataset_utils import batch_to_device
 
 
 def test_rendering(mock_sintel_data, tmp_path_factory):
@@ -228,6 +233,124 @@ def test_apply_augmentation(dataset):
     assert (data["flow"] != data1["flow"]).any()
 
 
+def test_memmap(dataset):
+    rendered = dataset.rendered
+    sequences = rendered.memmap()
+    assert len(sequences) == len(rendered)
+    assert (rendered.path / "_consolidated" / "lum.npy").exists()
+    assert len(rendered) == 3  # private files are not listed
+    for seq_id, sequence in enumerate(sequences):
+        expected = rendered(seq_id)
+        assert sequence.keys() == expected.keys()
+        for key in expected:
+            assert isinstance(sequence[key].base, np.memmap)
+            assert np.array_equal(sequence[key], expected[key])
+            assert np.array_equal(
+                dataset.cached_sequences[seq_id][key].numpy(), expected[key]
+            )
+
+
+def test_memmap_rerendered(dataset, tmp_path):
+    shutil.copytree(dataset.rendered.path, tmp_path / "rendered")
+    rendered = RenderedSintel(tmp_path / "rendered")
+    rendered.memmap()
+
+    # sequences rendered after consolidation are consolidated again
+    name = sorted(rendered)[1]
+    rendered[name].lum = rendered[name].lum[:] + 1
+    sequences = rendered.memmap()
+    for seq_id, sequence in enumerate(sequences):
+        expected = rendered(seq_id)
+        for key in expected:
+            assert np.array_equal(sequence[key], expected[key])
+
+
+class TensorDevices(TorchFunctionMode):
+    """Records the devices of all tensors returned by torch functions."""
+
+    def __init__(self):
+        super().__init__()
+        self.devices = set()
+
+    def __torch_function__(self, func, types, args=(), kwargs=None):
+        result = func(*args, **(kwargs or {}))
+        for value in result if isinstance(result, (tuple, list)) else [result]:
+            if isinstance(value, torch.Tensor):
+                self.devices.add(value.device.type)
+        return result
+
+
+def test_device(mock_sintel_data, tmp_path_factory):
+    config = dict(
+        tasks=["flow", "depth"],
+        boxfilter=dict(extent=1, kernel_size=13),
+        n_frames=2,
+        dt=1 / 50,
+        p_flip=1,
+        p_rot=1,
+        unittest=True,
+        flip_axes=[0, 1, 2, 3],
+        sintel_path=mock_sintel_data,
+    )
+    with set_root_context(tmp_path_factory.mktemp("tmp")):
+        MultiTaskSintel(**config)
+        # Samples stay on the CPU independent of the default device, e.g., in
+        # DataLoader workers while flyvis.device is a GPU.
+        default_device = torch.get_default_device()
+        torch.set_default_device("meta")
+        try:
+            with TensorDevices() as tensor_devices:
+                dataset = MultiTaskSintel(**config)
+                data = dataset[0]
+        finally:
+            torch.set_default_device(default_device)
+    assert tensor_devices.devices == {"cpu"}
+    assert data.keys() == {"lum", "flow", "depth"}
+    for value in data.values():
+        assert value.device == torch.device("cpu")
+
+    # The solver moves batches to the device of the network.
+    batch = batch_to_device({**data, "loss_kwargs": dict(weight=np.ones(2))}, "meta")
+    assert batch["lum"].device == batch["loss_kwargs"]["weight"].device
+    assert batch["lum"].device == torch.device("meta")
+
+
+def test_batch_augmentation(mock_sintel_data, tmp_path_factory, monkeypatch):
+    # deterministic noise pattern along the hexals, independent of the batch size
+    monkeypatch.setattr(
+        torch,
+        "randn_like",
+        lambda seq: torch.linspace(-1, 1, seq.shape[-1]).expand_as(seq),
+    )
+    with set_root_context(tmp_path_factory.mktemp("tmp")):
+        dataset = MultiTaskSintel(
+            tasks=["flow", "depth"],
+            boxfilter=dict(extent=1, kernel_size=13),
+            n_frames=2,
+            dt=1 / 50,
+            p_flip=1,
+            p_rot=1,
+            gaussian_white_noise=0.08,
+            unittest=True,
+            flip_axes=[0, 1, 2, 3],
+            sintel_path=mock_sintel_data,
+            batch_augmentation=True,
+        )
+    keys = [0, 1, 2, 1]
+    for augment in [False, True]:
+        dataset.augment = augment
+        np.random.seed(0)
+        batch = dataset.__getitems__(keys)
+        np.random.seed(0)
+        expected = [dataset[key] for key in keys]
+        assert len(batch) == len(expected)
+        for data, expected_data in zip(batch, expected):
+            assert data.keys() == expected_data.keys()
+            for key in data:
+                assert data[key].shape == expected_data[key].shape
+                assert torch.allclose(data[key], expected_data[key], atol=1e-6)
+
+
 def test_original_sequence_index(dataset):
     assert dataset.vertical_splits == 3
     assert dataset.original_sequence_index(0) == 0
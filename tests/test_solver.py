@@ -1,12 +1,20 @@
+import numpy as np
 import pytest
+import torch
 from datamate import set_root_context
+from torch.utils.data import DataLoader
 
 from flyvis.solver import MultiTaskSolver
 from flyvis.utils.config_utils import get_default_config
+from flyvis.utils.dataset_utils import IndexSampler, pad_collate
 
 
 @pytest.fixture(scope="module")
 def solver(mock_sintel_data, tmp_path_factory) -> MultiTaskSolver:
+    return init_solver(mock_sintel_data, tmp_path_factory)
+
+
+def init_solver(mock_sintel_data, tmp_path_factory, *overrides) -> MultiTaskSolver:
     config = get_default_config(
         path="../../flyvis/config/solver.yaml",
         overrides=[
@@ -20,6 +28,7 @@ def solver(mock_sintel_data, tmp_path_factory) -> MultiTaskSolver:
             "task.dataset.dt=0.041",
             "task.batch_size=2",
             "network.connectome.extent=1",
+            *overrides,
         ],
     )
     with set_root_context(str(tmp_path_factory.mktemp("tmp"))):
@@ -54,3 +63,45 @@ def test_solver_overfit(solver):
     solver.train(overfit=True)
     loss = solver.dir.loss[:]
     assert loss[-1] < loss[0]
+
+
+def test_batched_validation(solver):
+    dataset = solver.task.dataset
+
+    def validation_loss(batch_size):
+        loader = DataLoader(
+            dataset,
+            batch_size=batch_size,
+            sampler=IndexSampler(np.arange(len(dataset))),
+            collate_fn=pad_collate,
+        )
+        return solver.test(loader, track_loss=False)
+
+    assert np.isclose(validation_loss(1), validation_loss(2), rtol=1e-5)
+
+
+def test_async_checkpoint(mock_sintel_data, tmp_path_factory):
+    solver = init_solver(
+        mock_sintel_data,
+        tmp_path_factory,
+        "checkpointing.async_save=true",
+        "checkpointing.full_eval_every=2",
+    )
+    for _ in range(3):
+        solver.checkpoint()
+    solver.wait_for_checkpoints()
+
+    assert solver.checkpoints == [0, 1, 2]
+    assert list(solver.dir.chkpt_index[:]) == [0, 1, 2]
+    loss = solver.dir.validation.loss[:]
+    assert len(loss) == len(solver.dir.validation_batch.loss[:]) == 3
+    assert np.isnan(loss[1]) and not np.isnan(loss[[0, 2]]).any()
+    assert solver.dir.best_chkpt_index[()] == np.nanargmin(loss)
+    # skipped evaluations keep the iterations aligned with the losses
+    for subdir in ["validation", "training", "validation_batch"]:
+        assert len(solver.dir[subdir].iteration[:]) == 3
+        assert len(solver.dir[subdir].loss[:]) == 3
+
+    chkpt = torch.load(solver.checkpoint_path / "chkpt_00002", weights_only=False)
+    for key, param in solver.network.state_dict().items():
+        assert torch.equal(chkpt["network"][key], param)
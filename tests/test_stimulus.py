@@ -2,7 +2,7 @@ import numpy as np
 import pytest
 import torch
 
-from flyvis.network.stimulus import Stimulus
+from flyvis.network.stimulus import CompactStimulus, Stimulus
 
 
 @pytest.fixture
@@ -130,3 +130,29 @@ def test_add_pre_stim(stimulus: Stimulus):
     stimulus.add_pre_stim(x, start=0, stop=10, n_frames_buffer=20)
     assert stimulus.buffer.shape == (1, 20, stimulus.n_nodes)
     assert stimulus.buffer.sum() == 10 * np.prod(stimulus.input_index.shape)
+
+
+def test_compact_stimulus(connectome):
+    stimulus = Stimulus(connectome)
+    compact_stimulus = CompactStimulus(connectome)
+    assert compact_stimulus.buffer.shape == (1, 1, *stimulus.input_index.shape)
+
+    x = torch.rand((2, 10, 1, stimulus.n_input_elements))
+    for stim in [stimulus, compact_stimulus]:
+        stim.zero(2, 12)
+        stim.add_pre_stim(0.5, stop=2)
+        stim.add_input(x, start=2, cumulate=True)
+    assert compact_stimulus.shape == stimulus.buffer.shape
+    assert torch.equal(compact_stimulus.dense(), stimulus())
+    assert torch.equal(compact_stimulus.frame(5), stimulus()[:, 5])
+    assert stimulus()[:, 0].sum() > 0 and stimulus()[:, 5].sum() > 0
+
+    index = stimulus.layer_index["T4a"]
+    stimulus.buffer[:, 4:6, index] += 1.0
+    compact_stimulus.add_perturbation(index, 1.0, start=4, stop=6)
+    assert torch.equal(compact_stimulus.dense(), stimulus())
+
+    compact_stimulus.zero()
+    assert not compact_stimulus.nonzero
+    assert not compact_stimulus.perturbations
+    assert compact_stimulus.dense().sum() == 0
@@ -1,6 +1,31 @@
+import torch
 from datamate import Namespace, set_root_context
+from torch.utils.data import DataLoader, Dataset
 
 from flyvis.task.tasks import Task
+from flyvis.utils.dataset_utils import IndexSampler, seed_worker
+
+
+class AugmentationParams(Dataset):
+    """Augmentation parameters and default device of the loading process."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, key):
+        self.dataset.set_augmentation_params(
+            total_sequence_length=self.dataset.cached_sequences[key]["lum"].shape[0]
+        )
+        return dict(
+            params=torch.tensor([
+                self.dataset.jitter.contrast_factor,
+                self.dataset.jitter.brightness_factor,
+            ]),
+            device=str(torch.empty(()).device),
+        )
 
 
 def test_task(mock_sintel_data, connectome, tmp_path_factory):
@@ -66,3 +91,62 @@ def test_task(mock_sintel_data, connectome, tmp_path_factory):
 
         decoder = task.init_decoder(connectome)
         assert decoder is not None
+
+
+def test_parallel_loading(mock_sintel_data, tmp_path_factory):
+    dataset = Namespace(
+        type="MultiTaskSintel",
+        tasks=["flow"],
+        boxfilter=dict(extent=1, kernel_size=13),
+        n_frames=2,
+        dt=1 / 50,
+        unittest=True,
+        sintel_path=str(mock_sintel_data),
+    )
+
+    def batches(**kwargs):
+        task = Task(
+            dataset,
+            Namespace(),
+            Namespace(flow="l2norm"),
+            batch_size=1,
+            n_folds=3,
+            seed=0,
+            **kwargs,
+        )
+        torch.manual_seed(0)
+        with task.dataset.augmentation(True):
+            return [data["lum"] for data in task.train_data]
+
+    with set_root_context(tmp_path_factory.mktemp("tmp")):
+        first = batches(num_workers=2, prefetch_factor=1)
+        second = batches(num_workers=2, prefetch_factor=1)
+    assert len(first) == 2
+    assert all(torch.equal(a, b) for a, b in zip(first, second))
+
+    with set_root_context(tmp_path_factory.mktemp("tmp")):
+        task = Task(
+            dataset,
+            Namespace(),
+            Namespace(flow="l2norm"),
+            batch_size=1,
+            n_folds=3,
+            seed=0,
+            num_workers=2,
+        )
+
+    def inherit_device_and_seed(worker_id):
+        # as if forked from a main process with another default device
+        torch.set_default_device("meta")
+        seed_worker(worker_id)
+
+    # the same sample alternately from both workers
+    loader = DataLoader(
+        AugmentationParams(task.dataset),
+        sampler=IndexSampler([0, 0]),
+        **{**task.loader_kwargs(), "worker_init_fn": inherit_device_and_seed},
+    )
+    with task.dataset.augmentation(True):
+        params = list(loader)
+    assert [data["device"] for data in params] == [["cpu"], ["cpu"]]
+    assert not torch.equal(params[0]["params"], params[1]["params"])
@@ -0,0 +1,110 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from datamate import set_root_context
+
+from flyvis import NetworkView
+from flyvis.analysis import validation
+from flyvis.analysis.validation import validate_all_checkpoints
+from flyvis.datasets.sintel import MultiTaskSintel
+from flyvis.solver import MultiTaskSolver
+from flyvis.utils.chkpt_utils import recover_network
+from flyvis.utils.config_utils import get_default_config
+
+
+@pytest.fixture(scope="module")
+def network_view(mock_sintel_data, tmp_path_factory) -> NetworkView:
+    config = get_default_config(
+        path="../../flyvis/config/solver.yaml",
+        overrides=[
+            "task_name=flow",
+            "ensemble_and_network_id=0",
+            f"+task.dataset.sintel_path={str(mock_sintel_data)}",
+            "task.original_split=false",
+            "task.dataset.boxfilter.extent=1",
+            "task.dataset.n_frames=4",
+            "task.dataset.dt=0.041",
+            "network.connectome.extent=1",
+        ],
+    )
+    with set_root_context(str(tmp_path_factory.mktemp("tmp"))):
+        solver = MultiTaskSolver("test", config)
+        for _ in range(3):
+            solver.checkpoint()
+            for param in solver.network.parameters():
+                param.data.mul_(1.1)
+    return NetworkView(solver.dir)
+
+
+@pytest.fixture(autouse=True)
+def mock_validation_split(monkeypatch):
+    # the original split refers to the scenes of the full Sintel dataset
+    def original_train_and_validation_indices(self):
+        return np.arange(len(self)), np.arange(len(self))
+
+    monkeypatch.setattr(
+        MultiTaskSintel,
+        "original_train_and_validation_indices",
+        original_train_and_validation_indices,
+    )
+
+
+def test_validate_all_checkpoints(network_view, monkeypatch):
+    kwargs = dict(dt=0.041, t_pre=0.1, validation_subdir="test_validation")
+    loss = validate_all_checkpoints(network_view, **kwargs)
+    assert loss.shape == (3, 2)
+    assert len(np.unique(loss[:, 0])) == 3
+    np.testing.assert_array_equal(network_view.dir.test_validation.epe[:], loss[:, 1])
+
+    # Up-to-date checkpoints are not validated again.
+    validated = []
+    validate_checkpoint = validation._validate_checkpoint
+
+    def counting_validate_checkpoint(network_view, chkpt, *args):
+        validated.append(chkpt)
+        return validate_checkpoint(network_view, chkpt, *args)
+
+    monkeypatch.setattr(validation, "_validate_checkpoint", counting_validate_checkpoint)
+    np.testing.assert_array_equal(validate_all_checkpoints(network_view, **kwargs), loss)
+    assert not validated
+
+    # A changed checkpoint file is validated again.
+    path = network_view.checkpoints.paths[1]
+    mtime = path.stat().st_mtime + 1
+    os.utime(path, (mtime, mtime))
+    np.testing.assert_array_equal(validate_all_checkpoints(network_view, **kwargs), loss)
+    assert validated == [1]
+
+
+def test_validate_all_checkpoints_worker_view(network_view, monkeypatch):
+    # workers in the main process, with a network view from the same arguments
+    monkeypatch.setattr(validation, "Parallel", lambda n_jobs: joblib.Parallel(1))
+    monkeypatch.setattr(validation, "_worker_network_view", None)
+    recovered = []
+
+    def recording_recover_network(network, state_dict, **kwargs):
+        recovered.append(state_dict)
+        return recover_network(network, state_dict, **kwargs)
+
+    view = NetworkView(network_view.dir, recover_fn=recording_recover_network)
+    kwargs = dict(dt=0.041, t_pre=0.1)
+    serial = validate_all_checkpoints(network_view, validation_subdir="serial", **kwargs)
+    parallel = validate_all_checkpoints(
+        view, validation_subdir="worker", n_workers=2, **kwargs
+    )
+    np.testing.assert_allclose(parallel, serial, rtol=1e-5)
+    assert validation._worker_network_view[1].recover_fn is recording_recover_network
+    assert recovered
+
+
+@pytest.mark.slow
+def test_validate_all_checkpoints_parallel(network_view):
+    kwargs = dict(dt=0.041, t_pre=0.1)
+    serial = validate_all_checkpoints(network_view, validation_subdir="serial", **kwargs)
+    parallel = validate_all_checkpoints(
+        network_view, validation_subdir="parallel", n_workers=2, **kwargs
+    )
+    np.testing.assert_allclose(parallel, serial, rtol=1e-5)
+    assert len(list((network_view.dir.path / "parallel" / "_chkpts").iterdir())) == 3